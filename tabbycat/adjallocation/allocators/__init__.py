@@ -1,3 +1,4 @@
 from .base import registry
 from .dumb import DumbAllocator
 from .hungarian import ConsensusHungarianAllocator, VotingHungarianAllocator
+from .localsearch import ConsensusLocalSearchAllocator, VotingLocalSearchAllocator
@@ -0,0 +1,184 @@
+import logging
+import random
+from itertools import combinations
+from time import monotonic
+
+from .base import register
+from .hungarian import ConsensusHungarianAllocator, VotingHungarianAllocator
+
+logger = logging.getLogger(__name__)
+
+
+class LocalSearchAllocatorMixin:
+    """Mixin for Hungarian allocators that improves on the Hungarian allocation
+    by local search, for as long as a wall-clock time budget permits.
+
+    The Hungarian allocators solve chairs, panellists and trainees as separate
+    assignment problems, so they can't account for costs that depend on who
+    else is on the panel (for example, two panellists who conflict with each
+    other). This mixin takes the Hungarian allocation as a starting point and
+    repeatedly tries two kinds of changes:
+
+     - a *swap*, which exchanges two voting adjudicators (or two trainees)
+       between two debates, and
+     - a *move*, which replaces an allocated adjudicator with one who wasn't
+       allocated.
+
+    A change is kept only if it reduces the total cost. The cost of a panel is
+    the sum of `calc_cost()` over its members (the same cost function the
+    Hungarian allocators use, with the same per-position adjustments), plus the
+    conflict and history penalties between every pair of voting adjudicators.
+
+    The search stops when the time budget expires or when it has gone a while
+    without finding an improvement, and returns the best allocation found, so
+    the time taken is predictable even for large rounds. Panel sizes are as
+    decided by the Hungarian allocator and aren't changed by the search.
+    """
+
+    # Number of consecutive unsuccessful attempts per debate before the search
+    # concludes that it's at a local optimum and stops early
+    patience = 200
+
+    def __init__(self, *args, time_budget=None, seed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if time_budget is None:
+            time_budget = self.tournament.pref('adj_allocation_time_budget')
+        self.time_budget = time_budget
+        self.random = random.Random(seed)
+
+    def run_allocation(self):
+        deadline = monotonic() + self.time_budget
+        alloc = super().run_allocation()
+        if not alloc:
+            return alloc
+        self.improve_allocation(alloc, deadline)
+        return alloc
+
+    def voting_adjustments(self, alloc):
+        """Returns a list of lists, one for each element of `alloc`, giving the
+        `adjustment` argument to `calc_cost()` for each voting position in
+        that panel, in descending order of adjudicator score. Subclasses must
+        implement this method."""
+        raise NotImplementedError
+
+    def panel_cost(self, debate, voting, trainees, adjustments):
+        voting = sorted(voting, key=lambda a: a._normalized_score, reverse=True)
+        cost = sum(self.calc_cost(debate, adj, adjustment) for adj, adjustment in zip(voting, adjustments))
+        for adj1, adj2 in combinations(voting, 2):
+            cost += self.conflict_penalty * self.conflicts.conflict_adj_adj(adj1, adj2)
+            cost += self.history_penalty * self.history.seen_adj_adj(adj1, adj2)
+        chair = voting[0] if voting else None
+        cost += sum(self.calc_cost(debate, adj, adjustment=-2.0, chair=chair) for adj in trainees)
+        return cost
+
+    def improve_allocation(self, alloc, deadline):
+        """Improves `alloc` (a list of `AdjudicatorAllocation` objects) in place
+        by local search, until `deadline` (a `time.monotonic()` value)."""
+
+        adjustments = self.voting_adjustments(alloc)
+        voting = [list(aa.voting()) for aa in alloc]
+        trainees = [list(aa.trainees) for aa in alloc]
+        costs = [self.panel_cost(aa.container, v, t, adj) for aa, v, t, adj in
+                 zip(alloc, voting, trainees, adjustments)]
+
+        allocated = {adj for aa in alloc for adj in aa.all()}
+        eligible = {a for a in self.adjudicators if a._weighted_score >= self.min_voting_score and not a.trainee}
+        spare_voting = [a for a in self.adjudicators if a in eligible and a not in allocated]
+        if self.no_trainees:
+            spare_trainees = []
+        else:
+            spare_trainees = [a for a in self.adjudicators if a not in eligible and a not in allocated]
+
+        initial_cost = sum(costs)
+        n = len(alloc)
+        limit = self.patience * n
+        attempts = swaps = moves = failures = 0
+
+        def evaluate(i, new_voting, new_trainees):
+            return self.panel_cost(alloc[i].container, new_voting, new_trainees, adjustments[i])
+
+        while failures < limit and monotonic() < deadline:
+            attempts += 1
+            failures += 1
+            i = self.random.randrange(n)
+            slots = voting if self.random.random() < 0.8 else trainees
+            if not slots[i]:
+                continue
+            p = self.random.randrange(len(slots[i]))
+            spares = spare_voting if slots is voting else spare_trainees
+
+            if n > 1 and (not spares or self.random.random() < 0.75):
+                # Swap with an adjudicator in another debate
+                j = self.random.randrange(n - 1)
+                j += j >= i
+                if not slots[j]:
+                    continue
+                q = self.random.randrange(len(slots[j]))
+                new_i, new_j = list(slots[i]), list(slots[j])
+                new_i[p], new_j[q] = new_j[q], new_i[p]
+                if slots is voting:
+                    cost_i = evaluate(i, new_i, trainees[i])
+                    cost_j = evaluate(j, new_j, trainees[j])
+                else:
+                    cost_i = evaluate(i, voting[i], new_i)
+                    cost_j = evaluate(j, voting[j], new_j)
+                if cost_i + cost_j < costs[i] + costs[j] - 1e-9:
+                    slots[i], slots[j] = new_i, new_j
+                    costs[i], costs[j] = cost_i, cost_j
+                    swaps += 1
+                    failures = 0
+
+            elif spares:
+                # Replace with an unallocated adjudicator
+                s = self.random.randrange(len(spares))
+                new_i = list(slots[i])
+                new_i[p], spare = spares[s], new_i[p]
+                if slots is voting:
+                    cost_i = evaluate(i, new_i, trainees[i])
+                else:
+                    cost_i = evaluate(i, voting[i], new_i)
+                if cost_i < costs[i] - 1e-9:
+                    slots[i] = new_i
+                    spares[s] = spare
+                    costs[i] = cost_i
+                    moves += 1
+                    failures = 0
+
+        logger.info("local search: %d attempts, %d swaps, %d moves, cost %f -> %f (%s)",
+            attempts, swaps, moves, initial_cost, sum(costs),
+            "time budget expired" if failures < limit else "no improvement found")
+
+        for aa, v, t in zip(alloc, voting, trainees):
+            v.sort(key=lambda a: a._normalized_score, reverse=True)
+            aa.chair = v[0] if v else None
+            aa.panellists = v[1:]
+            aa.trainees = t
+
+
+@register
+class VotingLocalSearchAllocator(LocalSearchAllocatorMixin, VotingHungarianAllocator):
+
+    key = "hungarian-voting-local-search"
+
+    def voting_adjustments(self, alloc):
+        # As in VotingHungarianAllocator, for the top half of panel debates,
+        # the final panellist can be of lower quality than the other two.
+        npanels = len([aa for aa in alloc if aa.is_panel])
+        adjustments = []
+        i = 0
+        for aa in alloc:
+            if aa.is_panel:
+                adjustments.append([0.0, 0.0, -1.0 if i < npanels / 2 else 0.0])
+                i += 1
+            else:
+                adjustments.append([0.0])
+        return adjustments
+
+
+@register
+class ConsensusLocalSearchAllocator(LocalSearchAllocatorMixin, ConsensusHungarianAllocator):
+
+    key = "hungarian-consensus-local-search"
+
+    def voting_adjustments(self, alloc):
+        return [[-i for i in range(aa.num_voting)] for aa in alloc]
@@ -11,6 +11,19 @@ from participants.models import Adjudicator, Team
 logger = logging.getLogger(__name__)
 
 
+def _iter_bits(mask):
+    """Yields the positions of the set bits in the integer `mask`, lowest
+    first."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
 class ConflictsInfo:
     """Manages information about conflicts between participants.
 
@@ -21,13 +34,18 @@ class ConflictsInfo:
     particular participants conflict, without a need for further SQL queries or
     excessive data processing.
 
+    Internally, every adjudicator, team and institution covered is given a
+    dense index, and conflicts are stored as bitsets (Python integers) over
+    those indices. Checking a pair is then a single bit test, and checking a
+    participant against a whole group of others (e.g. every adjudicator
+    against the teams in a debate) is a handful of bitwise operations.
+
     All queries must relate to teams and adjudicators that were in the QuerySets
     or other iterables that were provided to the constructor.
 
-    Although the attributes `self.adjteamconflicts`, `self.adjadjconflicts`,
-    etc. aren't marked as such, they should be treated a private implementation
-    detail that is subject to change. Callers should rely exclusively on
-    methods of the class to access conflict information.
+    The attributes `self._adjteam`, `self._adjadj`, etc. are a private
+    implementation detail that is subject to change. Callers should rely
+    exclusively on methods of the class to access conflict information.
     """
 
     def __init__(self, teams=None, adjudicators=None):
@@ -37,125 +55,241 @@ class ConflictsInfo:
 
     def _fetch_conflicts_from_db(self):
         """Fetches relevant conflicts from the database, based on `self.teams`
-        and `self.adjudicators`."""
+        and `self.adjudicators`, and builds the bitsets."""
 
-        # Refresh `self.adjudicator_ids` and `self.team_ids`
+        # Refresh `self.adjudicator_ids` and `self.team_ids`, and assign each
+        # a position in the bitsets. Sorting makes the indices (and hence the
+        # serialized output) deterministic.
         self.adjudicator_ids = {adj.id for adj in self.adjudicators}
         self.team_ids = {team.id for team in self.teams}
 
-        # Adjudicator-team and adjudicator-adjudicator conflicts are stored as
-        # sets of primary keys. Primary keys to avoid having to select_related
-        # all the teams and adjudicators from the database, and sets so that
-        # they're stored in a hash-map structure (for O(1) `x in S` check)
-        # rather than an array (O(n)). Adjudicator pairs are stored both ways
-        # round, i.e. under both `(adj1.id, adj2.id)` and `(adj2.id, adj1.id)`.
+        self._adj_ids = sorted(self.adjudicator_ids)
+        self._team_ids = sorted(self.team_ids)
+        self._adj_index = {adj_id: i for i, adj_id in enumerate(self._adj_ids)}
+        self._team_index = {team_id: i for i, team_id in enumerate(self._team_ids)}
+
+        # Personal conflicts are stored in both directions: for each
+        # adjudicator, a bitset over team indices, and for each team, a bitset
+        # over adjudicator indices. Adjudicator-adjudicator conflicts are
+        # symmetric, so set in both adjudicators' bitsets.
 
-        adjteamconflict_instances = AdjudicatorTeamConflict.objects.filter(
+        self._adjteam = {adj_id: 0 for adj_id in self._adj_ids}
+        self._teamadj = {team_id: 0 for team_id in self._team_ids}
+        self._adjadj = {adj_id: 0 for adj_id in self._adj_ids}
+
+        adjteamconflicts = AdjudicatorTeamConflict.objects.filter(
             adjudicator__in=self.adjudicators,
             team__in=self.teams,
-        ).distinct()
-        self.adjteamconflicts = {(c.adjudicator_id, c.team_id) for c in adjteamconflict_instances}
-
-        adjadjconflict_instances = AdjudicatorAdjudicatorConflict.objects.filter(
+        ).values_list('adjudicator_id', 'team_id').distinct()
+        for adj_id, team_id in adjteamconflicts:
+            if adj_id not in self._adj_index or team_id not in self._team_index:
+                continue
+            self._adjteam[adj_id] |= 1 << self._team_index[team_id]
+            self._teamadj[team_id] |= 1 << self._adj_index[adj_id]
+
+        adjadjconflicts = AdjudicatorAdjudicatorConflict.objects.filter(
             adjudicator1__in=self.adjudicators,
             adjudicator2__in=self.adjudicators,
-        ).distinct()
-        self.adjadjconflicts = set()
-        for conflict in adjadjconflict_instances:
-            self.adjadjconflicts.add((conflict.adjudicator1_id, conflict.adjudicator2_id))
-            self.adjadjconflicts.add((conflict.adjudicator2_id, conflict.adjudicator1_id))
-
-        # Adjudicator-institution and team-institution conflicts are stored as
-        # sets, which in turn are in dicts whose keys are the adjudicator/team
-        # primary keys. The sets contain the entire institution objects, since
-        # it's useful in some contexts to be able to grab institution details
-        # quickly from them. They're sets to allow the use of the set
-        # intersection operator to check for institution overlap.
-
-        teaminstconflict_instances = TeamInstitutionConflict.objects.filter(
+        ).values_list('adjudicator1_id', 'adjudicator2_id').distinct()
+        for adj1_id, adj2_id in adjadjconflicts:
+            if adj1_id not in self._adj_index or adj2_id not in self._adj_index:
+                continue
+            self._adjadj[adj1_id] |= 1 << self._adj_index[adj2_id]
+            self._adjadj[adj2_id] |= 1 << self._adj_index[adj1_id]
+
+        # Institutional conflicts are stored as bitsets over institution
+        # indices, one per adjudicator and team. The institution objects
+        # themselves are kept, since it's useful in some contexts to be able to
+        # grab institution details quickly. `self._instadj` is the transpose
+        # of `self._adjinst`, which allows us to find all adjudicators from an
+        # institution with one lookup.
+
+        self._institutions = []
+        self._inst_index = {}
+
+        def inst_bit(institution):
+            if institution.id not in self._inst_index:
+                self._inst_index[institution.id] = len(self._institutions)
+                self._institutions.append(institution)
+            return 1 << self._inst_index[institution.id]
+
+        teaminstconflicts = TeamInstitutionConflict.objects.filter(
             team__in=self.teams,
         ).select_related('institution').distinct()
-        self.teaminstconflicts = {team_id: set() for team_id in self.team_ids}
-        for conflict in teaminstconflict_instances:
-            if conflict.team_id in self.teaminstconflicts:
-                self.teaminstconflicts[conflict.team_id].add(conflict.institution)
+        self._teaminst = {team_id: 0 for team_id in self._team_ids}
+        for conflict in teaminstconflicts:
+            if conflict.team_id in self._teaminst:
+                self._teaminst[conflict.team_id] |= inst_bit(conflict.institution)
             else:
                 logger.warning("Couldnt add conflict for team ID %s to \
                                 institution %s" % (conflict.team_id, conflict.institution))
 
-        adjinstconflict_instances = AdjudicatorInstitutionConflict.objects.filter(
+        adjinstconflicts = AdjudicatorInstitutionConflict.objects.filter(
             adjudicator__in=self.adjudicators,
         ).select_related('institution').distinct()
-        self.adjinstconflicts = {adj_id: set() for adj_id in self.adjudicator_ids}
-        for conflict in adjinstconflict_instances:
-            if conflict.adjudicator_id in self.adjinstconflicts:
-                self.adjinstconflicts[conflict.adjudicator_id].add(conflict.institution)
+        self._adjinst = {adj_id: 0 for adj_id in self._adj_ids}
+        self._instadj = {}
+        for conflict in adjinstconflicts:
+            if conflict.adjudicator_id in self._adjinst:
+                bit = inst_bit(conflict.institution)
+                self._adjinst[conflict.adjudicator_id] |= bit
+                index = self._inst_index[conflict.institution_id]
+                self._instadj[index] = self._instadj.get(index, 0) | 1 << self._adj_index[conflict.adjudicator_id]
             else:
                 logger.warning("Couldnt add conflict for adjudicator ID %s to \
                                 institution %s" % (conflict.adjudicator_id, conflict.institution))
 
+        # Finally, precompute for each team and each adjudicator the bitset of
+        # all adjudicators they conflict with (personally or institutionally).
+        # These are what the allocators use most.
+
+        self._teamadj_all = {}
+        for team_id in self._team_ids:
+            mask = self._teamadj[team_id]
+            for index in _iter_bits(self._teaminst[team_id]):
+                mask |= self._instadj.get(index, 0)
+            self._teamadj_all[team_id] = mask
+
+        self._adjadj_all = {}
+        for adj_id in self._adj_ids:
+            mask = self._adjadj[adj_id]
+            for index in _iter_bits(self._adjinst[adj_id]):
+                mask |= self._instadj.get(index, 0)
+            mask &= ~(1 << self._adj_index[adj_id])  # don't conflict with self
+            self._adjadj_all[adj_id] = mask
+
+    def _adjudicator_mask(self, adjudicators):
+        mask = 0
+        for adj in adjudicators:
+            mask |= 1 << self._adj_index[adj.id]
+        return mask
+
+    def _institutions_from_mask(self, mask):
+        return {self._institutions[index] for index in _iter_bits(mask)}
+
     def personal_conflict_adj_team(self, adj, team):
         """Returns True if the adjudicator and team personally conflict."""
         assert adj.id in self.adjudicator_ids, "adjudicator not covered"
         assert team.id in self.team_ids, "team not covered"
-        return (adj.id, team.id) in self.adjteamconflicts
+        return bool(self._adjteam[adj.id] >> self._team_index[team.id] & 1)
 
     def personal_conflict_adj_adj(self, adj1, adj2):
         """Returns True if the two adjudicators personally conflict."""
         assert adj1.id in self.adjudicator_ids, "adjudicator 1 not covered"
         assert adj2.id in self.adjudicator_ids, "adjudicator 2 not covered"
-        return (adj1.id, adj2.id) in self.adjadjconflicts
+        return bool(self._adjadj[adj1.id] >> self._adj_index[adj2.id] & 1)
 
     def conflicting_institutions_adj_team(self, adj, team):
         """Returns a set of institutions that the adjudicator and team share."""
-        return self.adjinstconflicts[adj.id] & self.teaminstconflicts[team.id]
+        return self._institutions_from_mask(self._adjinst[adj.id] & self._teaminst[team.id])
 
     def conflicting_institutions_adj_adj(self, adj1, adj2):
         """Returns a set of institutions that the two adjudicators share."""
-        return self.adjinstconflicts[adj1.id] & self.adjinstconflicts[adj2.id]
+        return self._institutions_from_mask(self._adjinst[adj1.id] & self._adjinst[adj2.id])
 
     def institutional_conflict_adj_team(self, adj, team):
         """Returns True if the adjudicator and team share at least one institution."""
-        return not self.adjinstconflicts[adj.id].isdisjoint(self.teaminstconflicts[team.id])
+        return self._adjinst[adj.id] & self._teaminst[team.id] != 0
 
     def institutional_conflict_adj_adj(self, adj1, adj2):
         """Returns True if the two adjudicators share at least one institution."""
-        return not self.adjinstconflicts[adj1.id].isdisjoint(self.adjinstconflicts[adj2.id])
+        return self._adjinst[adj1.id] & self._adjinst[adj2.id] != 0
 
     def conflict_adj_team(self, adj, team):
         """Returns True if the adjudicator and team conflict."""
-        return (self.personal_conflict_adj_team(adj, team) or
-                self.institutional_conflict_adj_team(adj, team))
+        return bool(self._teamadj_all[team.id] >> self._adj_index[adj.id] & 1)
 
     def conflict_adj_adj(self, adj1, adj2):
         """Returns True if the two adjudicators conflict."""
-        return (self.personal_conflict_adj_adj(adj1, adj2) or
-                self.institutional_conflict_adj_adj(adj1, adj2))
+        if adj1.id == adj2.id:
+            return self.institutional_conflict_adj_adj(adj1, adj2)
+        return bool(self._adjadj_all[adj1.id] >> self._adj_index[adj2.id] & 1)
+
+    # --------------------------------------------------------------------------
+    # Vectorized queries
+    # --------------------------------------------------------------------------
+
+    def count_conflicts_adj_teams(self, adj, teams):
+        """Returns the number of teams in `teams` that conflict with the
+        adjudicator."""
+        bit = 1 << self._adj_index[adj.id]
+        return sum(1 for team in teams if self._teamadj_all[team.id] & bit)
+
+    def count_conflicts_adjs_team(self, adjudicators, team):
+        """Returns the number of adjudicators in `adjudicators` that conflict
+        with the team."""
+        return _popcount(self._teamadj_all[team.id] & self._adjudicator_mask(adjudicators))
+
+    def count_conflicts_matrix(self, team_groups, adjudicator_groups):
+        """Returns a matrix (list of lists) whose element `[i][j]` is the number
+        of conflicting adjudicator-team pairs between the teams in
+        `team_groups[i]` and the adjudicators in `adjudicator_groups[j]`, e.g.
+        between the teams in a debate and the adjudicators on a panel."""
+        adjmasks = [self._adjudicator_mask(adjs) for adjs in adjudicator_groups]
+        matrix = []
+        for teams in team_groups:
+            teammasks = [self._teamadj_all[team.id] for team in teams]
+            matrix.append([sum(_popcount(teammask & adjmask) for teammask in teammasks) for adjmask in adjmasks])
+        return matrix
+
+    def adjudicators_conflicting_with_teams(self, teams):
+        """Returns a set of primary keys of all adjudicators covered that
+        conflict with at least one of the given teams, e.g. all adjudicators
+        who can't judge a debate between those teams."""
+        mask = 0
+        for team in teams:
+            mask |= self._teamadj_all[team.id]
+        return {self._adj_ids[index] for index in _iter_bits(mask)}
+
+    def adjudicators_conflicting_with_adjudicators(self, adjudicators):
+        """Returns a set of primary keys of all adjudicators covered that
+        conflict with at least one of the given adjudicators."""
+        mask = 0
+        for adj in adjudicators:
+            mask |= self._adjadj_all[adj.id]
+        return {self._adj_ids[index] for index in _iter_bits(mask)}
+
+    def any_conflict_in_panel(self, adjudicators, teams):
+        """Returns True if there is any conflict between the given adjudicators
+        and teams, or among the given adjudicators."""
+        adjmask = self._adjudicator_mask(adjudicators)
+        if any(self._teamadj_all[team.id] & adjmask for team in teams):
+            return True
+        return any(self._adjadj_all[adj.id] & adjmask for adj in adjudicators)
 
     def serialized_by_participant(self):
         """Returns a tuple of two dicts, mapping primary keys of teams and
-        adjudicators respectively to a three-key dict
+        adjudicators respectively to a dict with up to three keys
             {'team': [], 'adjudicator': [], 'institution': []}
         where each list contains single-key dicts {'id': id} containing the
-        primary key of conflicting objects."""
-
-        teams = {team_id: {'team': [], 'adjudicator': [], 'institution': []}
-                 for team_id in self.team_ids}
-        adjudicators = {adj_id: {'team': [], 'adjudicator': [], 'institution': []}
-                        for adj_id in self.adjudicator_ids}
+        primary key of conflicting objects.
 
-        for adj_id, team_id in self.adjteamconflicts:
-            teams[team_id]['adjudicator'].append({'id': adj_id})
-            adjudicators[adj_id]['team'].append({'id': team_id})
+        To keep the payload compact, participants without any conflicts are
+        omitted, as are empty lists. Callers should treat a missing key the
+        same as an empty list."""
 
-        for adj1_id, adj2_id in self.adjadjconflicts:
-            adjudicators[adj1_id]['adjudicator'].append({'id': adj2_id})
-
-        for team_id, institutions in self.teaminstconflicts.items():
-            teams[team_id]['institution'] = [{'id': inst.id} for inst in institutions]
+        teams = {}
+        adjudicators = {}
 
-        for adj_id, institutions in self.adjinstconflicts.items():
-            adjudicators[adj_id]['institution'] = [{'id': inst.id} for inst in institutions]
+        for team_id in self._team_ids:
+            entry = {}
+            if self._teamadj[team_id]:
+                entry['adjudicator'] = [{'id': self._adj_ids[index]} for index in _iter_bits(self._teamadj[team_id])]
+            if self._teaminst[team_id]:
+                entry['institution'] = [{'id': inst.id} for inst in self._institutions_from_mask(self._teaminst[team_id])]
+            if entry:
+                teams[team_id] = entry
+
+        for adj_id in self._adj_ids:
+            entry = {}
+            if self._adjteam[adj_id]:
+                entry['team'] = [{'id': self._team_ids[index]} for index in _iter_bits(self._adjteam[adj_id])]
+            if self._adjadj[adj_id]:
+                entry['adjudicator'] = [{'id': self._adj_ids[index]} for index in _iter_bits(self._adjadj[adj_id])]
+            if self._adjinst[adj_id]:
+                entry['institution'] = [{'id': inst.id} for inst in self._institutions_from_mask(self._adjinst[adj_id])]
+            if entry:
+                adjudicators[adj_id] = entry
 
         return teams, adjudicators
 
@@ -225,6 +359,20 @@ class HistoryInfo:
                 pair = (da1.adjudicator_id, da2.adjudicator_id)
                 self.adjadjhistories.setdefault(pair, []).append(r)
 
+    def count_seen_matrix(self, team_groups, adjudicator_groups):
+        """Returns a matrix (list of lists) whose element `[i][j]` is the number
+        of adjudicator-team pairs between the teams in `team_groups[i]` and the
+        adjudicators in `adjudicator_groups[j]` that have seen each other."""
+        seen_by_team = {}
+        for adj_id, team_id in self.adjteamhistories:
+            seen_by_team.setdefault(team_id, set()).add(adj_id)
+        adj_id_groups = [{adj.id for adj in adjs} for adjs in adjudicator_groups]
+        matrix = []
+        for teams in team_groups:
+            seen = [seen_by_team.get(team.id, set()) for team in teams]
+            matrix.append([sum(len(s & adj_ids) for s in seen) for adj_ids in adj_id_groups])
+        return matrix
+
     def seen_adj_team(self, adj, team):
         """Returns True if the adjudicator has seen this team in the history
         covered by this object."""
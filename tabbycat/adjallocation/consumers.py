@@ -7,13 +7,14 @@ from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _, ngettext
 
 from actionlog.models import ActionLogEntry
-from breakqual.utils import calculate_live_thresholds
+from breakqual.liveness import DEAD, SAFE
+from breakqual.utils import calculate_live_thresholds, get_liveness, overall_liveness
 from draw.consumers import BaseAdjudicatorContainerConsumer, EditDebateOrPanelWorkerMixin
-from participants.prefetch import populate_win_counts
 from tournaments.models import Round
 
 from .allocators.base import AdjudicatorAllocationError
 from .allocators.hungarian import ConsensusHungarianAllocator, VotingHungarianAllocator
+from .allocators.localsearch import ConsensusLocalSearchAllocator, VotingLocalSearchAllocator
 from .models import PreformedPanel
 from .preformed import copy_panels_to_debates
 from .preformed.anticipated import calculate_anticipated_draw
@@ -50,6 +51,17 @@ class AdjudicatorAllocationWorkerConsumer(EditDebateOrPanelWorkerMixin):
             else:
                 t.preferences[key] = value
 
+    def _get_allocator_class(self, round):
+        """Returns the adjudicator allocator class to use, according to the
+        ballot type and whether there is time budgeted for local search."""
+        if round.tournament.pref('adj_allocation_time_budget') > 0:
+            if round.ballots_per_debate == 'per-adj':
+                return VotingLocalSearchAllocator
+            return ConsensusLocalSearchAllocator
+        if round.ballots_per_debate == 'per-adj':
+            return VotingHungarianAllocator
+        return ConsensusHungarianAllocator
+
     def allocate_debate_adjs(self, event):
         round = Round.objects.get(pk=event['extra']['round_id'])
         self._apply_allocation_settings(round, event['extra']['settings'])
@@ -90,10 +102,7 @@ class AdjudicatorAllocationWorkerConsumer(EditDebateOrPanelWorkerMixin):
             adjs = round.active_adjudicators.all()
 
             try:
-                if round.ballots_per_debate == 'per-adj':
-                    allocator = VotingHungarianAllocator(debates, adjs, round)
-                else:
-                    allocator = ConsensusHungarianAllocator(debates, adjs, round)
+                allocator = self._get_allocator_class(round)(debates, adjs, round)
                 allocation, user_warnings = allocator.allocate()
             except AdjudicatorAllocationError as e:
                 self.return_error(event['extra']['group_name'], str(e))
@@ -134,11 +143,7 @@ class AdjudicatorAllocationWorkerConsumer(EditDebateOrPanelWorkerMixin):
         adjs = round.active_adjudicators.all()
 
         try:
-            if round.ballots_per_debate == 'per-adj':
-                allocator = VotingHungarianAllocator(panels, adjs, round)
-            else:
-                allocator = ConsensusHungarianAllocator(panels, adjs, round)
-
+            allocator = self._get_allocator_class(round)(panels, adjs, round)
             allocation, user_warnings = allocator.allocate()
         except AdjudicatorAllocationError as e:
             self.return_error(event['extra']['group_name'], str(e))
@@ -187,24 +192,20 @@ class AdjudicatorAllocationWorkerConsumer(EditDebateOrPanelWorkerMixin):
 
         priority_method = event['extra']['settings']['type']
         if priority_method == 'liveness':
-            populate_win_counts([team for debate in debates for team in debate.teams], round.prev)
-            open_category = round.tournament.breakcategory_set.filter(is_general=True).first()
-            if open_category:
-                safe, dead = calculate_live_thresholds(open_category, round.tournament, round)
+            liveness = get_liveness(round)
+            if liveness:
                 for debate in debates:
-                    points_now = [team.points_count for team in debate.teams]
-                    highest = max(points_now)
-                    lowest = min(points_now)
-                    if lowest >= safe:
+                    statuses = [overall_liveness(liveness, team.id) for team in debate.teams]
+                    if all(status == SAFE for status in statuses):
                         debate.importance = 0
-                    elif highest <= dead:
+                    elif all(status == DEAD for status in statuses):
                         debate.importance = -2
                     else:
                         debate.importance = 1
                     debate.save()
             else:
                 self.return_error(event['extra']['group_name'],
-                    _("You have no break category set as 'is general' so debate importances can't be calculated."))
+                    _("You have no break categories, so debate importances can't be calculated."))
                 return
 
         elif priority_method == 'bracket':
@@ -1,10 +1,20 @@
 """Functions for computing an anticipated draw."""
 
 import itertools
+import logging
+
+from django.core.cache import cache
 
 from breakqual.utils import calculate_live_thresholds, determine_liveness
 from draw.generator.utils import ispow2, partial_break_round_split
 from participants.prefetch import populate_win_counts
+from tournaments.models import Round
+
+logger = logging.getLogger(__name__)
+
+
+def anticipated_draw_cache_key(round_id):
+    return "round_%d_anticipated_draw" % round_id
 
 
 def calculate_anticipated_draw(round):
@@ -58,6 +68,24 @@ def calculate_anticipated_draw(round):
         npanels = nteams // nteamsindebate
         return [(0, 0, 0) for i in range(npanels)]
 
+    # The rest is expensive (it generates standings), so cache it. The cache
+    # is cleared by signals when results or the draw of an earlier round
+    # change; see `invalidate_anticipated_draws()`.
+    key = anticipated_draw_cache_key(round.id)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug("Using cached anticipated draw for %s", round)
+        return cached
+
+    anticipated = _calculate_anticipated_draw_from_previous_round(round, nteamsindebate)
+    cache.set(key, anticipated, None)
+    return anticipated
+
+
+def _calculate_anticipated_draw_from_previous_round(round, nteamsindebate):
+    """Does steps 1 to 4 of `calculate_anticipated_draw()`, which requires that
+    the previous round has a draw. Returns a list."""
+
     # 1. Take the (actual) draw of the last round, with team points
     debates = round.prev.debate_set_with_prefetches(ordering=('room_rank',),
         teams=True, adjudicators=False, speakers=False, venues=False)
@@ -112,4 +140,15 @@ def calculate_anticipated_draw(round):
     else:
         liveness = [0] * len(debates)
 
-    return zip(brackets_min, brackets_max, liveness)
+    return list(zip(brackets_min, brackets_max, liveness))
+
+
+def invalidate_anticipated_draws(tournament_id, after_seq=None):
+    """Clears cached anticipated draws for all rounds in the tournament, or if
+    `after_seq` is given, all rounds after that round, since those depend on
+    results and the draw in that round."""
+    rounds = Round.objects.filter(tournament_id=tournament_id)
+    if after_seq is not None:
+        rounds = rounds.filter(seq__gt=after_seq)
+    keys = [anticipated_draw_cache_key(round_id) for round_id in rounds.values_list('id', flat=True)]
+    cache.delete_many(keys)
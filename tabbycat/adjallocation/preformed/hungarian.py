@@ -1,7 +1,10 @@
 import logging
 
+from django.db.models import Prefetch
 from munkres import Munkres
 
+from draw.models import DebateTeam
+
 from .base import BasePreformedPanelAllocator, register
 
 logger = logging.getLogger(__name__)
@@ -35,12 +38,27 @@ class HungarianPreformedPanelAllocator(BasePreformedPanelAllocator):
 
         return cost
 
-    def allocate(self):
-        cost_matrix = [
-            [self.calc_cost(debate, panel) for panel in self.panels]
-            for debate in self.debates
+    def calc_cost_matrix(self, debates, panels):
+        """Returns the same matrix as calling `calc_cost()` for every debate and
+        panel, but counts conflicts and history for all pairs at once."""
+        team_groups = [debate.teams for debate in debates]
+        adjudicator_groups = [list(panel.adjudicators.all()) for panel in panels]
+        conflicts = self.conflicts.count_conflicts_matrix(team_groups, adjudicator_groups)
+        seen = self.history.count_seen_matrix(team_groups, adjudicator_groups)
+
+        return [
+            [self.mismatch_penalty * (debate.importance - panel.importance) ** 2 +
+             self.conflict_penalty * nconflicts + self.history_penalty * nseen
+             for panel, nconflicts, nseen in zip(panels, conflicts_row, seen_row)]
+            for debate, conflicts_row, seen_row in zip(debates, conflicts, seen)
         ]
 
+    def allocate(self):
+        debates = list(self.debates.prefetch_related(
+            Prefetch('debateteam_set', queryset=DebateTeam.objects.select_related('team'))))
+        panels = list(self.panels)
+        cost_matrix = self.calc_cost_matrix(debates, panels)
+
         logger.info("optimizing panels (matrix size: %d debates by %d panels", len(cost_matrix), len(cost_matrix[0]))
         indices = self.munkres.compute(cost_matrix)
         indices.sort()
@@ -49,9 +67,9 @@ class HungarianPreformedPanelAllocator(BasePreformedPanelAllocator):
 
         # Need to make sure all debates show up in the returned debates list,
         # corresponding to `None` if it didn't get assigned a panel.
-        panels = [None] * len(self.debates)
+        allocated = [None] * len(debates)
         for r, c in indices:
             logger.info("debate %d, panel %d: cost %f", r, c, cost_matrix[r][c])
-            panels[r] = self.panels[c]
+            allocated[r] = panels[c]
 
-        return list(self.debates), panels
+        return debates, allocated
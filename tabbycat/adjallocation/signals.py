@@ -0,0 +1,36 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from breakqual.models import BreakCategory
+from results.models import BallotSubmission
+from tournaments.models import Round
+
+from .preformed.anticipated import invalidate_anticipated_draws
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_delete, sender=BallotSubmission)
+@receiver(post_save, sender=BallotSubmission)
+def clear_anticipated_draws_after_debate(sender, instance, **kwargs):
+    """Results in a round affect the anticipated draws of all later rounds. So
+    does the draw, but code that writes debate teams calls
+    `invalidate_anticipated_draws()` itself, once per round."""
+    round_info = Round.objects.filter(debate__id=instance.debate_id).values_list('tournament_id', 'seq').first()
+    if round_info is None:
+        return
+    tournament_id, seq = round_info
+    invalidate_anticipated_draws(tournament_id, after_seq=seq)
+    logger.debug("Cleared anticipated draws after round %d of tournament %d", seq, tournament_id)
+
+
+@receiver(post_delete, sender=BreakCategory)
+@receiver(post_save, sender=BreakCategory)
+@receiver(post_delete, sender=Round)
+@receiver(post_save, sender=Round)
+def clear_anticipated_draws_in_tournament(sender, instance, **kwargs):
+    """Liveness in the anticipated draw depends on the break categories and
+    number of rounds in the tournament."""
+    invalidate_anticipated_draws(instance.tournament_id)
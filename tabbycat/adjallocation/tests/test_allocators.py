@@ -0,0 +1,63 @@
+from time import monotonic
+
+from django.test import TestCase
+
+from adjallocation.allocators.hungarian import ConsensusHungarianAllocator, VotingHungarianAllocator
+from adjallocation.allocators.localsearch import ConsensusLocalSearchAllocator, VotingLocalSearchAllocator
+from tournaments.models import Tournament
+
+
+class LocalSearchAllocatorTestMixin:
+
+    fixtures = ['after_round_4.json']
+    hungarian_class = None
+    local_search_class = None
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+        self.debates = self.round.debate_set_with_prefetches(speakers=False, venues=False)
+        self.adjs = self.tournament.adjudicator_set.all()
+
+    def total_cost(self, allocator, alloc):
+        adjustments = allocator.voting_adjustments(alloc)
+        return sum(allocator.panel_cost(aa.container, list(aa.voting()), aa.trainees, adj)
+                   for aa, adj in zip(alloc, adjustments))
+
+    def assertValidAllocation(self, alloc):  # noqa: N802
+        self.assertEqual({aa.container for aa in alloc}, set(self.debates))
+        allocated = [adj for aa in alloc for adj in aa.all()]
+        self.assertEqual(len(allocated), len(set(allocated)))
+        for aa in alloc:
+            self.assertIsNotNone(aa.chair)
+            for adj in aa.panellists:
+                self.assertGreaterEqual(aa.chair._normalized_score, adj._normalized_score)
+
+    def test_does_not_worsen(self):
+        allocator = self.local_search_class(self.debates, self.adjs, self.round, time_budget=1.0, seed=0)
+        allocator.populate_adj_scores(allocator.adjudicators)
+        alloc = self.hungarian_class.run_allocation(allocator)
+        sizes = {aa.container: (aa.num_voting, len(aa.trainees)) for aa in alloc}
+        before = self.total_cost(allocator, alloc)
+
+        allocator.improve_allocation(alloc, monotonic() + 1.0)
+        self.assertValidAllocation(alloc)
+        self.assertLessEqual(self.total_cost(allocator, alloc), before)
+        self.assertEqual({aa.container: (aa.num_voting, len(aa.trainees)) for aa in alloc}, sizes)
+
+    def test_respects_time_budget(self):
+        allocator = self.local_search_class(self.debates, self.adjs, self.round, time_budget=0.0, seed=0)
+        start = monotonic()
+        alloc, _ = allocator.allocate()
+        self.assertLess(monotonic() - start, 5.0)
+        self.assertValidAllocation(alloc)
+
+
+class TestVotingLocalSearchAllocator(LocalSearchAllocatorTestMixin, TestCase):
+    hungarian_class = VotingHungarianAllocator
+    local_search_class = VotingLocalSearchAllocator
+
+
+class TestConsensusLocalSearchAllocator(LocalSearchAllocatorTestMixin, TestCase):
+    hungarian_class = ConsensusHungarianAllocator
+    local_search_class = ConsensusLocalSearchAllocator
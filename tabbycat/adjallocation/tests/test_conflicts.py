@@ -0,0 +1,101 @@
+from itertools import product
+
+from django.test import TestCase
+
+from adjallocation.conflicts import ConflictsInfo
+from adjallocation.models import (AdjudicatorAdjudicatorConflict, AdjudicatorInstitutionConflict,
+                                  AdjudicatorTeamConflict, TeamInstitutionConflict)
+from tournaments.models import Tournament
+
+
+class TestConflictsInfo(TestCase):
+    """Checks the bitset-based ConflictsInfo against conflicts computed directly
+    from the database."""
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.teams = list(self.tournament.team_set.all())
+        self.adjs = list(self.tournament.adjudicator_set.all())
+
+        # The fixture has no adjudicator-adjudicator conflicts, so add a few
+        for adj1, adj2 in zip(self.adjs[0:6:2], self.adjs[1:6:2]):
+            AdjudicatorAdjudicatorConflict.objects.create(adjudicator1=adj1, adjudicator2=adj2)
+
+        self.conflicts = ConflictsInfo(teams=self.teams, adjudicators=self.adjs)
+
+        self.adjteam = set(AdjudicatorTeamConflict.objects.values_list('adjudicator_id', 'team_id'))
+        self.adjadj = set(AdjudicatorAdjudicatorConflict.objects.values_list('adjudicator1_id', 'adjudicator2_id'))
+        self.adjadj |= {(b, a) for a, b in self.adjadj}
+        self.adjinst = {adj.id: set() for adj in self.adjs}
+        for adj_id, inst_id in AdjudicatorInstitutionConflict.objects.values_list('adjudicator_id', 'institution_id'):
+            self.adjinst[adj_id].add(inst_id)
+        self.teaminst = {team.id: set() for team in self.teams}
+        for team_id, inst_id in TeamInstitutionConflict.objects.values_list('team_id', 'institution_id'):
+            self.teaminst[team_id].add(inst_id)
+
+    def expected_adj_team(self, adj, team):
+        return (adj.id, team.id) in self.adjteam or bool(self.adjinst[adj.id] & self.teaminst[team.id])
+
+    def expected_adj_adj(self, adj1, adj2):
+        return (adj1.id, adj2.id) in self.adjadj or bool(self.adjinst[adj1.id] & self.adjinst[adj2.id])
+
+    def test_adj_team(self):
+        for adj, team in product(self.adjs, self.teams):
+            with self.subTest(adj=adj, team=team):
+                self.assertEqual(self.conflicts.personal_conflict_adj_team(adj, team), (adj.id, team.id) in self.adjteam)
+                self.assertEqual({i.id for i in self.conflicts.conflicting_institutions_adj_team(adj, team)},
+                                 self.adjinst[adj.id] & self.teaminst[team.id])
+                self.assertEqual(self.conflicts.conflict_adj_team(adj, team), self.expected_adj_team(adj, team))
+
+    def test_adj_adj(self):
+        for adj1, adj2 in product(self.adjs, self.adjs):
+            if adj1 == adj2:
+                continue
+            with self.subTest(adj1=adj1, adj2=adj2):
+                self.assertEqual(self.conflicts.personal_conflict_adj_adj(adj1, adj2), (adj1.id, adj2.id) in self.adjadj)
+                self.assertEqual({i.id for i in self.conflicts.conflicting_institutions_adj_adj(adj1, adj2)},
+                                 self.adjinst[adj1.id] & self.adjinst[adj2.id])
+                self.assertEqual(self.conflicts.conflict_adj_adj(adj1, adj2), self.expected_adj_adj(adj1, adj2))
+
+    def test_vectorized(self):
+        for team1, team2 in zip(self.teams[0::2], self.teams[1::2]):
+            teams = [team1, team2]
+            expected = {adj.id for adj in self.adjs if any(self.expected_adj_team(adj, t) for t in teams)}
+            self.assertEqual(self.conflicts.adjudicators_conflicting_with_teams(teams), expected)
+            for adj in self.adjs:
+                self.assertEqual(self.conflicts.count_conflicts_adj_teams(adj, teams),
+                                 sum(self.expected_adj_team(adj, t) for t in teams))
+            self.assertEqual(self.conflicts.count_conflicts_adjs_team(self.adjs, team1),
+                             sum(self.expected_adj_team(adj, team1) for adj in self.adjs))
+
+        for adj in self.adjs:
+            expected = {other.id for other in self.adjs if other != adj and self.expected_adj_adj(adj, other)}
+            self.assertEqual(self.conflicts.adjudicators_conflicting_with_adjudicators([adj]), expected)
+
+    def test_any_conflict_in_panel(self):
+        for team1, team2 in zip(self.teams[0::2], self.teams[1::2]):
+            for adj1, adj2 in zip(self.adjs[0::2], self.adjs[1::2]):
+                expected = any(self.expected_adj_team(a, t) for a, t in product([adj1, adj2], [team1, team2])) or \
+                    self.expected_adj_adj(adj1, adj2)
+                self.assertEqual(self.conflicts.any_conflict_in_panel([adj1, adj2], [team1, team2]), expected)
+
+    def test_serialized_by_participant(self):
+        teams, adjudicators = self.conflicts.serialized_by_participant()
+
+        for team in self.teams:
+            entry = teams.get(team.id, {})
+            self.assertEqual({c['id'] for c in entry.get('adjudicator', [])},
+                             {a for a, t in self.adjteam if t == team.id})
+            self.assertEqual({c['id'] for c in entry.get('institution', [])}, self.teaminst[team.id])
+            for value in entry.values():
+                self.assertTrue(value)  # empty lists should be omitted
+
+        for adj in self.adjs:
+            entry = adjudicators.get(adj.id, {})
+            self.assertEqual({c['id'] for c in entry.get('team', [])},
+                             {t for a, t in self.adjteam if a == adj.id})
+            self.assertEqual({c['id'] for c in entry.get('adjudicator', [])},
+                             {b for a, b in self.adjadj if a == adj.id})
+            self.assertEqual({c['id'] for c in entry.get('institution', [])}, self.adjinst[adj.id])
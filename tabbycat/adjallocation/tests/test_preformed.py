@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from adjallocation.models import PreformedPanel
+from adjallocation.preformed.anticipated import anticipated_draw_cache_key, calculate_anticipated_draw
+from adjallocation.preformed.hungarian import HungarianPreformedPanelAllocator
+from draw.manager import DrawManager
+from tournaments.models import Tournament
+
+
+class TestAnticipatedDrawCache(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+        self.key = anticipated_draw_cache_key(self.round.id)
+
+    def test_cached(self):
+        anticipated = calculate_anticipated_draw(self.round)
+        self.assertEqual(len(anticipated), self.round.prev.debate_set.count())
+        self.assertEqual(cache.get(self.key), anticipated)
+        with self.assertNumQueries(1):  # round.prev.debate_set.exists()
+            self.assertEqual(calculate_anticipated_draw(self.round), anticipated)
+
+    def test_invalidated_by_ballot(self):
+        calculate_anticipated_draw(self.round)
+        ballotsub = self.round.prev.debate_set.first().ballotsubmission_set.get(confirmed=True)
+        ballotsub.confirmed = False
+        ballotsub.save()
+        self.assertIsNone(cache.get(self.key))
+
+    def test_not_invalidated_by_later_ballot(self):
+        calculate_anticipated_draw(self.round)
+        ballotsub = self.round.debate_set.first().ballotsubmission_set.get(confirmed=True)
+        ballotsub.save()
+        self.assertIsNotNone(cache.get(self.key))
+
+    def test_invalidated_by_draw(self):
+        calculate_anticipated_draw(self.round)
+        DrawManager(self.round.prev).delete()
+        self.assertIsNone(cache.get(self.key))
+
+
+class TestHungarianPreformedPanelAllocator(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+
+        # Make a preformed panel out of each debate's adjudicators
+        for i, debate in enumerate(self.round.debate_set.order_by('room_rank'), start=1):
+            panel = PreformedPanel.objects.create(round=self.round, room_rank=i, importance=i % 3 - 1)
+            for da in debate.debateadjudicator_set.all():
+                panel.preformedpaneladjudicator_set.create(adjudicator=da.adjudicator, type=da.type)
+
+    def test_cost_matrix(self):
+        allocator = HungarianPreformedPanelAllocator(self.round.debate_set.all(),
+            self.round.preformedpanel_set.all(), self.round)
+        debates = list(allocator.debates)
+        panels = list(allocator.panels)
+        expected = [[allocator.calc_cost(debate, panel) for panel in panels] for debate in debates]
+        self.assertEqual(allocator.calc_cost_matrix(debates, panels), expected)
+
+    def test_allocate(self):
+        allocator = HungarianPreformedPanelAllocator(self.round.debate_set.all(),
+            self.round.preformedpanel_set.all(), self.round)
+        debates, panels = allocator.allocate()
+        self.assertEqual(len(debates), len(panels))
+        self.assertEqual(len({panel.id for panel in panels}), len(panels))
@@ -21,6 +21,9 @@ def adjudicator_conflicts_display(debates):
 
     for debate in debates:
 
+        if not conflicts.any_conflict_in_panel(debate.adjudicators.all(), debate.teams):
+            continue
+
         for adj, team in product(debate.adjudicators.all(), debate.teams):
 
             if conflicts.personal_conflict_adj_team(adj, team):
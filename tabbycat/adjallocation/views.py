@@ -10,8 +10,7 @@ from django.views.generic.base import TemplateView
 from actionlog.mixins import LogActionMixin
 from actionlog.models import ActionLogEntry
 from availability.utils import annotate_availability
-from participants.models import Adjudicator, Region
-from participants.prefetch import populate_feedback_scores
+from participants.models import Adjudicator, Institution, Region
 from tournaments.mixins import DebateDragAndDropMixin, TournamentMixin
 from utils.misc import ranks_dictionary, redirect_tournament, reverse_tournament
 from utils.mixins import AdministratorMixin
@@ -47,6 +46,7 @@ class BaseEditDebateOrPanelAdjudicatorsView(DebateDragAndDropMixin, Administrato
             'draw_rules__adj_min_voting_score',
             'draw_rules__adj_conflict_penalty',
             'draw_rules__adj_history_penalty',
+            'draw_rules__adj_allocation_time_budget',
             'draw_rules__preformed_panel_mismatch_penalty',
             'draw_rules__no_trainee_position',
             'draw_rules__no_panellist_position',
@@ -63,7 +63,6 @@ class BaseEditDebateOrPanelAdjudicatorsView(DebateDragAndDropMixin, Administrato
     def get_serialised_allocatable_items(self):
         adjs = Adjudicator.objects.filter(tournament=self.tournament)
         adjs = annotate_availability(adjs, self.round)
-        populate_feedback_scores(adjs)
         weight = self.tournament.current_round.feedback_weight
         serialized_adjs = EditPanelOrDebateAdjSerializer(
             adjs, many=True, context={'feedback_weight': weight})
@@ -155,6 +154,23 @@ class BaseAdjudicatorConflictsView(LogActionMixin, AdministratorMixin, Tournamen
     def get_success_url(self, *args, **kwargs):
         return reverse_tournament('importer-simple-index', self.tournament)
 
+    def get_choice_querysets(self):
+        """Returns a dict mapping field names to the querysets of choices for
+        those fields."""
+        return {}
+
+    def get_formset(self):
+        formset = super().get_formset()
+        for name, queryset in self.get_choice_querysets().items():
+            # Evaluate choices once, rather than once for every form
+            field = formset.empty_form.fields[name]
+            field.queryset = queryset
+            choices = list(field.choices)
+            for form in formset:
+                form.fields[name].queryset = queryset
+                form.fields[name].choices = choices
+        return formset
+
     def formset_valid(self, formset):
         result = super().formset_valid(formset)
         nsaved = len(self.instances)
@@ -178,14 +194,11 @@ class AdjudicatorTeamConflictsView(BaseAdjudicatorConflictsView):
         'field_classes': {'team': TeamChoiceField},
     })
 
-    def get_formset(self):
-        formset = super().get_formset()
-        all_adjs = self.tournament.adjudicator_set.order_by('name').all()
-        all_teams = self.tournament.team_set.order_by('short_name').all()
-        for form in formset:
-            form.fields['adjudicator'].queryset = all_adjs  # order alphabetically
-            form.fields['team'].queryset = all_teams        # order alphabetically
-        return formset
+    def get_choice_querysets(self):
+        return {
+            'adjudicator': self.tournament.adjudicator_set.order_by('name'),  # order alphabetically
+            'team': self.tournament.team_set.order_by('short_name'),          # order alphabetically
+        }
 
     def get_formset_queryset(self):
         return self.formset_model.objects.filter(
@@ -219,13 +232,9 @@ class AdjudicatorAdjudicatorConflictsView(BaseAdjudicatorConflictsView):
     formset_factory_kwargs = BaseAdjudicatorConflictsView.formset_factory_kwargs.copy()
     formset_factory_kwargs.update({'fields': ('adjudicator1', 'adjudicator2')})
 
-    def get_formset(self):
-        formset = super().get_formset()
-        all_adjs = self.tournament.adjudicator_set.order_by('name').all()
-        for form in formset:
-            form.fields['adjudicator1'].queryset = all_adjs  # order alphabetically
-            form.fields['adjudicator2'].queryset = all_adjs  # order alphabetically
-        return formset
+    def get_choice_querysets(self):
+        all_adjs = self.tournament.adjudicator_set.order_by('name')  # order alphabetically
+        return {'adjudicator1': all_adjs, 'adjudicator2': all_adjs}
 
     def get_formset_queryset(self):
         return self.formset_model.objects.filter(
@@ -259,12 +268,11 @@ class AdjudicatorInstitutionConflictsView(BaseAdjudicatorConflictsView):
     formset_factory_kwargs = BaseAdjudicatorConflictsView.formset_factory_kwargs.copy()
     formset_factory_kwargs.update({'fields': ('adjudicator', 'institution')})
 
-    def get_formset(self):
-        formset = super().get_formset()
-        all_adjs = self.tournament.adjudicator_set.order_by('name').all()
-        for form in formset:
-            form.fields['adjudicator'].queryset = all_adjs  # order alphabetically
-        return formset
+    def get_choice_querysets(self):
+        return {
+            'adjudicator': self.tournament.adjudicator_set.order_by('name'),  # order alphabetically
+            'institution': Institution.objects.all(),
+        }
 
     def get_formset_queryset(self):
         return self.formset_model.objects.filter(
@@ -301,12 +309,11 @@ class TeamInstitutionConflictsView(BaseAdjudicatorConflictsView):
         'field_classes': {'team': TeamChoiceField},
     })
 
-    def get_formset(self):
-        formset = super().get_formset()
-        all_teams = self.tournament.team_set.order_by('short_name').all()
-        for form in formset:
-            form.fields['team'].queryset = all_teams  # order alphabetically
-        return formset
+    def get_choice_querysets(self):
+        return {
+            'team': self.tournament.team_set.order_by('short_name'),  # order alphabetically
+            'institution': Institution.objects.all(),
+        }
 
     def get_formset_queryset(self):
         return self.formset_model.objects.filter(
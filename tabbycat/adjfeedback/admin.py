@@ -6,11 +6,13 @@ from django.utils.translation import gettext_lazy as _
 from django_better_admin_arrayfield.admin.mixins import DynamicArrayMixin
 
 from draw.models import DebateTeam
+from tournaments.versions import bump_versions
 from utils.admin import custom_titled_filter
 
 from .models import (AdjudicatorBaseScoreHistory, AdjudicatorFeedback, AdjudicatorFeedbackBooleanAnswer,
     AdjudicatorFeedbackFloatAnswer, AdjudicatorFeedbackIntegerAnswer, AdjudicatorFeedbackManyAnswer,
     AdjudicatorFeedbackQuestion, AdjudicatorFeedbackStringAnswer)
+from .utils import update_feedback_scores
 
 
 # ==============================================================================
@@ -199,8 +201,18 @@ class AdjudicatorFeedbackAdmin(admin.ModelAdmin):
             ) % {'count': difference}
             self.message_user(request, message, level=messages.WARNING)
 
+    def bump_tournament_versions(self, tournament_ids):
+        # update() doesn't send the signals that would normally do this
+        for tournament_id in tournament_ids:
+            bump_versions(tournament_id)
+
     def mark_as_unconfirmed(self, request, queryset):
+        # Before updating, since the queryset might be filtered on this field
+        adjudicator_ids = set(queryset.values_list('adjudicator_id', flat=True))
+        tournament_ids = set(queryset.values_list('adjudicator__tournament_id', flat=True))
         count = queryset.update(confirmed=False)
+        update_feedback_scores(adjudicator_ids)
+        self.bump_tournament_versions(tournament_ids)
         message = ngettext(
             "1 feedback submission was marked as unconfirmed.",
             "%(count)d feedback submissions were marked as unconfirmed.",
@@ -209,7 +221,12 @@ class AdjudicatorFeedbackAdmin(admin.ModelAdmin):
         self.message_user(request, message)
 
     def ignore_feedback(self, request, queryset):
+        # Before updating, since the queryset might be filtered on this field
+        adjudicator_ids = set(queryset.values_list('adjudicator_id', flat=True))
+        tournament_ids = set(queryset.values_list('adjudicator__tournament_id', flat=True))
         count = queryset.update(ignored=True)
+        update_feedback_scores(adjudicator_ids)
+        self.bump_tournament_versions(tournament_ids)
 
         message = ngettext(
             "1 feedback submission is now ignored.",
@@ -219,7 +236,12 @@ class AdjudicatorFeedbackAdmin(admin.ModelAdmin):
         self.message_user(request, message)
 
     def recognize_feedback(self, request, queryset):
+        # Before updating, since the queryset might be filtered on this field
+        adjudicator_ids = set(queryset.values_list('adjudicator_id', flat=True))
+        tournament_ids = set(queryset.values_list('adjudicator__tournament_id', flat=True))
         count = queryset.update(ignored=False)
+        update_feedback_scores(adjudicator_ids)
+        self.bump_tournament_versions(tournament_ids)
 
         message = ngettext(
             "1 feedback submission is now recognized.",
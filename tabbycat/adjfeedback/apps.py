@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class AdjFeedbackConfig(AppConfig):
     name = 'adjfeedback'
     verbose_name = _("Adjudicator Feedback")
+
+    def ready(self):
+        from . import signals  # noqa: F401
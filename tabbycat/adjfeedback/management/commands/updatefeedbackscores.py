@@ -0,0 +1,14 @@
+from utils.management.base import TournamentCommand
+
+from ...utils import update_feedback_scores
+
+
+class Command(TournamentCommand):
+
+    help = "Recalculates the stored feedback scores of all adjudicators in the tournament. " \
+           "This shouldn't normally be necessary, since they're updated automatically " \
+           "whenever feedback changes."
+
+    def handle_tournament(self, tournament, **options):
+        count = update_feedback_scores(tournament.adjudicator_set.all())
+        self.stdout.write("Updated feedback scores of {:d} adjudicators in {}".format(count, tournament.name))
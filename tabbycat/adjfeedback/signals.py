@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from adjallocation.models import DebateAdjudicator
+from participants.models import Adjudicator
+
+from .models import AdjudicatorFeedback
+from .utils import update_feedback_scores
+
+
+@receiver(post_delete, sender=AdjudicatorFeedback)
+@receiver(post_save, sender=AdjudicatorFeedback)
+def update_feedback_score_of_target(sender, instance, **kwargs):
+    # Saving a submission can also unconfirm other versions of it, but these
+    # are always for the same adjudicator.
+    update_feedback_scores([instance.adjudicator_id])
+
+
+@receiver(post_save, sender=DebateAdjudicator)
+def update_feedback_scores_from_source(sender, instance, created, raw, **kwargs):
+    """Feedback from trainees doesn't count, so changing an adjudicator's
+    position in a debate can change the scores of those they gave feedback on.
+    New positions can't have feedback yet, except when loading fixtures."""
+    if created and not raw:
+        return
+    targets = AdjudicatorFeedback.objects.filter(source_adjudicator=instance).values('adjudicator_id')
+    update_feedback_scores(Adjudicator.objects.filter(id__in=targets))
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.db.models import Avg, Count
+from django.test import RequestFactory, TestCase
+
+from adjallocation.models import DebateAdjudicator
+from adjfeedback.admin import AdjudicatorFeedbackAdmin
+from adjfeedback.dbutils import add_feedback_to_round
+from adjfeedback.models import AdjudicatorFeedback
+from adjfeedback.utils import update_feedback_scores
+from participants.models import Adjudicator
+from tournaments.models import Tournament
+
+
+class TestStoredFeedbackScores(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        for round in self.tournament.round_set.filter(seq__lte=2):
+            add_feedback_to_round(round, submitter_type=AdjudicatorFeedback.SUBMITTER_PUBLIC,
+                                  user=None, probability=0.8, confirmed=True)
+
+    def assertScoresCorrect(self):  # noqa: N802
+        for adj in Adjudicator.objects.filter(tournament=self.tournament):
+            expected = adj.adjudicatorfeedback_set.filter(confirmed=True, ignored=False).exclude(
+                source_adjudicator__type=DebateAdjudicator.TYPE_TRAINEE).aggregate(
+                    avg=Avg('score'), count=Count('id'))
+            with self.subTest(adj=adj):
+                self.assertAlmostEqual(adj.stored_feedback_score, expected['avg'])
+                self.assertEqual(adj.feedback_count, expected['count'])
+
+    def test_maintained_on_save(self):
+        self.assertTrue(Adjudicator.objects.filter(feedback_count__gt=0).exists())
+        self.assertScoresCorrect()
+
+    def test_confirm_and_ignore(self):
+        feedbacks = list(AdjudicatorFeedback.objects.order_by('id')[:6])
+        feedbacks[0].confirmed = False
+        feedbacks[0].save()
+        feedbacks[1].ignored = True
+        feedbacks[1].save()
+        feedbacks[2].delete()
+        self.assertScoresCorrect()
+
+    def test_trainee_source(self):
+        da = DebateAdjudicator.objects.filter(adjudicatorfeedback__isnull=False).exclude(
+            type=DebateAdjudicator.TYPE_TRAINEE).first()
+        da.type = DebateAdjudicator.TYPE_TRAINEE
+        da.save()
+        self.assertScoresCorrect()
+
+    def test_update_after_queryset_update(self):
+        queryset = AdjudicatorFeedback.objects.filter(score__gte=4)
+        queryset.update(ignored=True)
+        update_feedback_scores(set(queryset.values_list('adjudicator_id', flat=True)))
+        self.assertScoresCorrect()
+
+    def test_admin_actions_on_filtered_queryset(self):
+        # As from a changelist filtered on the field the action changes
+        model_admin = AdjudicatorFeedbackAdmin(AdjudicatorFeedback, site)
+        request = RequestFactory().post('/')
+        with mock.patch.object(model_admin, 'message_user'):
+            model_admin.ignore_feedback(request, AdjudicatorFeedback.objects.filter(ignored=False, score__gte=4))
+            self.assertScoresCorrect()
+            model_admin.recognize_feedback(request, AdjudicatorFeedback.objects.filter(ignored=True))
+            self.assertScoresCorrect()
+            model_admin.mark_as_unconfirmed(request, AdjudicatorFeedback.objects.filter(confirmed=True, score__lt=3))
+            self.assertScoresCorrect()
+
+    def test_weighted_score_reads_stored_score(self):
+        adj = Adjudicator.objects.filter(feedback_count__gt=0).first()
+        with self.assertNumQueries(0):
+            score = adj.weighted_score(0.5)
+        self.assertAlmostEqual(score, adj.base_score * 0.5 + adj.stored_feedback_score * 0.5)
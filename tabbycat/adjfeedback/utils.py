@@ -1,16 +1,47 @@
 import logging
 from statistics import mean, stdev
 
-from django.db.models import Count, Prefetch, Q
+from django.db import models
+from django.db.models import Avg, Count, IntegerField, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 
 from adjallocation.allocation import AdjudicatorAllocation
 from adjallocation.models import DebateAdjudicator
 from adjfeedback.models import AdjudicatorFeedback
 from options.preferences import FeedbackPaths
+from participants.models import Adjudicator
 
 logger = logging.getLogger(__name__)
 
 
+def update_feedback_scores(adjudicators):
+    """Recalculates the stored feedback score and feedback count of the given
+    adjudicators, in a single query. `adjudicators` may be a queryset or an
+    iterable of adjudicator IDs.
+
+    The stored score is the average score of all confirmed, non-ignored
+    feedback on the adjudicator, excluding feedback from trainees. This must be
+    called whenever something changes which feedback counts towards that
+    average; saving or deleting an `AdjudicatorFeedback` instance does so
+    automatically (see adjfeedback/signals.py), but `QuerySet.update()` and
+    bulk operations don't, so callers using those must call it explicitly."""
+
+    counted = AdjudicatorFeedback.objects.filter(
+        adjudicator=OuterRef('pk'), confirmed=True, ignored=False,
+    ).exclude(
+        source_adjudicator__type=DebateAdjudicator.TYPE_TRAINEE,
+    ).order_by().values('adjudicator')
+
+    if not isinstance(adjudicators, models.QuerySet):
+        adjudicators = Adjudicator.objects.filter(id__in=list(adjudicators))
+
+    return adjudicators.update(
+        stored_feedback_score=Subquery(counted.annotate(avg=Avg('score')).values('avg')),
+        feedback_count=Coalesce(Subquery(counted.annotate(count=Count('id')).values('count'),
+            output_field=IntegerField()), 0),
+    )
+
+
 def expected_feedback_targets(debateadj, feedback_paths=None, debate=None):
     """Returns a list of adjudicators and positions (adj, pos), each being
     someone that the given DebateAdjudicator object is expected to give feedback
@@ -41,8 +72,9 @@ def expected_feedback_targets(debateadj, feedback_paths=None, debate=None):
     # Need to associate the feedback submission status with the Adjudicator object
     # directly to be passed onto AdjudicatorAllocation. Must use debateadj to assure
     # the prefetch is available.
-    if hasattr(debateadj.debate.debateadjudicator_set.first(), 'submitted'):
-        for dadj in debateadj.debate.debateadjudicator_set.all():
+    debateadjs = debateadj.debate.debateadjudicator_set.all()
+    if debateadjs and hasattr(debateadjs[0], 'submitted'):
+        for dadj in debateadjs:
             dadj.adjudicator.submitted = dadj.submitted
 
     if debate is None:
@@ -15,7 +15,6 @@ from actionlog.mixins import LogActionMixin
 from actionlog.models import ActionLogEntry
 from options.utils import use_team_code_names, use_team_code_names_data_entry
 from participants.models import Adjudicator, Speaker, Team
-from participants.prefetch import populate_feedback_scores
 from participants.templatetags.team_name_for_data_entry import team_name_for_data_entry
 from results.mixins import PublicSubmissionFieldsMixin, TabroomSubmissionFieldsMixin
 from results.prefetch import populate_wins_for_debateteams
@@ -44,7 +43,6 @@ class BaseFeedbackOverview(TournamentMixin, VueTableTemplateView):
         if not hasattr(self, '_adjudicators'):
             t = self.tournament
             self._adjudicators = Adjudicator.objects.filter(tournament=t)
-            populate_feedback_scores(self._adjudicators)
         return self._adjudicators
 
     def get_context_data(self, **kwargs):
@@ -143,12 +141,13 @@ class FeedbackByTargetView(AdministratorMixin, TournamentMixin, VueTableTemplate
     page_emoji = '🔍'
 
     def get_table(self):
-        adjudicators = self.tournament.adjudicator_set.annotate(feedback_count=Count('adjudicatorfeedback'))
+        # Not feedback_count, which is a field counting only feedback in the score
+        adjudicators = self.tournament.adjudicator_set.annotate(received_feedback_count=Count('adjudicatorfeedback'))
         table = TabbycatTableBuilder(view=self, sort_key="name")
         table.add_adjudicator_columns(adjudicators)
         feedback_data = []
         for adj in adjudicators:
-            count = adj.feedback_count
+            count = adj.received_feedback_count
             feedback_data.append({
                 'text': ngettext("%(count)d feedback", "%(count)d feedbacks", count) % {'count': count},
                 'link': reverse_tournament('adjfeedback-view-on-adjudicator', self.tournament, kwargs={'pk': adj.id}),
@@ -181,13 +180,13 @@ class FeedbackBySourceView(AdministratorMixin, TournamentMixin, VueTableTemplate
             })
         team_table.add_column({'key': 'feedbacks', 'title': _("Feedbacks")}, team_feedback_data)
 
-        adjudicators = tournament.adjudicator_set.all().annotate(feedback_count=Count('debateadjudicator__adjudicatorfeedback'))
+        adjudicators = tournament.adjudicator_set.all().annotate(given_feedback_count=Count('debateadjudicator__adjudicatorfeedback'))
         adj_table = TabbycatTableBuilder(
             view=self, title=_('From Adjudicators'), sort_key='name')
         adj_table.add_adjudicator_columns(adjudicators)
         adj_feedback_data = []
         for adj in adjudicators:
-            count = adj.feedback_count
+            count = adj.given_feedback_count
             adj_feedback_data.append({
                 'text': ngettext("%(count)d feedback", "%(count)d feedbacks", count) % {'count': count},
                 'link': reverse_tournament('adjfeedback-view-from-adjudicator',
@@ -0,0 +1,129 @@
+"""Bulk writes for API collections, used by `BulkMixin` (in api/mixins.py).
+
+Each item is validated by the collection's usual serializer, then the validated
+data for all items is saved by a `BulkWriter`, which uses a fixed number of
+queries for the whole batch, rather than a few for each item. Serializers that
+support this subclass `BulkSerializerMixin`, and can override its hooks to do
+what their `create()` and `update()` methods would otherwise do."""
+
+from django.core.exceptions import FieldDoesNotExist
+
+
+def get_many_to_many(model, name):
+    """If `name` is the name of a many-to-many field of `model`, or the accessor
+    name of a reverse many-to-many relation, returns a tuple
+    `(through, source_field, target_field)` describing the intermediate model.
+    Otherwise, returns None."""
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        pass
+    else:
+        if field.many_to_many and field.concrete:
+            return field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name()
+        return None
+
+    for rel in model._meta.related_objects:
+        if rel.many_to_many and rel.get_accessor_name() == name:
+            return rel.field.remote_field.through, rel.field.m2m_reverse_field_name(), rel.field.m2m_field_name()
+    return None
+
+
+class BulkWriter:
+    """Saves many instances of a model, along with their many-to-many
+    relations, from validated data. Usage:
+
+        writer = BulkWriter(Venue)
+        venues = writer.save([(None, data1), (venue, data2)], tournament=t)
+
+    Each item is a pair `(instance, validated_data)`, where `instance` is None
+    for a new object. Keyword arguments are set on every new object. Many-to-
+    many relations in the data replace the existing ones. Fields of existing
+    objects listed in `extra_update_fields` are saved even if they aren't in the
+    data (for fields that are derived from others when saving)."""
+
+    def __init__(self, model, extra_update_fields=()):
+        self.model = model
+        self.extra_update_fields = set(extra_update_fields)
+
+    def save(self, items, before_save=None, **kwargs):
+        objs = []
+        relations = []
+        update_fields = set(self.extra_update_fields)
+
+        for instance, data in items:
+            data = dict(data)
+            m2m = {name: data.pop(name) for name in list(data) if get_many_to_many(self.model, name)}
+            if instance is None:
+                obj = self.model(**kwargs, **data)
+            else:
+                obj = instance
+                for attr, value in data.items():
+                    setattr(obj, attr, value)
+                update_fields.update(data)
+            objs.append(obj)
+            relations.append(m2m)
+
+        if before_save is not None:
+            before_save(objs)
+
+        existing = [obj for obj in objs if obj.pk is not None]
+        new = [obj for obj in objs if obj.pk is None]
+
+        if self.model._meta.parents:
+            # bulk_create() doesn't support multi-table inheritance
+            for obj in new:
+                obj.save()
+        elif new:
+            self.model.objects.bulk_create(new)
+        if existing and update_fields:
+            self.model.objects.bulk_update(existing, sorted(update_fields))
+
+        self.save_many_to_many(objs, relations, [obj in existing for obj in objs])
+        return objs
+
+    def save_many_to_many(self, objs, relations, replace):
+        names = {name for m2m in relations for name in m2m}
+        for name in names:
+            through, source, target = get_many_to_many(self.model, name)
+            items = [(obj, m2m[name], clear) for obj, m2m, clear in zip(objs, relations, replace) if name in m2m]
+
+            through.objects.filter(**{source + '__in': [obj for obj, _, clear in items if clear]}).delete()
+            through.objects.bulk_create([through(**{source: obj, target: value})
+                for obj, values, _ in items for value in values], ignore_conflicts=True)
+
+
+class BulkSerializerMixin:
+    """For model serializers whose collections support bulk writes. The hooks
+    are class methods, because they're also used for nested data that isn't
+    attached to serializer instances (like speakers in teams)."""
+
+    bulk_update_fields = ()
+
+    @classmethod
+    def save_bulk(cls, items, context, **kwargs):
+        """Saves `items`, a list of `(instance, validated_data)` pairs, and returns
+        the saved instances. `kwargs` are set on all new instances, as for
+        `save()`."""
+        items = [(instance, dict(data)) for instance, data in items]
+        state = cls.prepare_bulk(items, context)
+        writer = BulkWriter(cls.Meta.model, cls.bulk_update_fields)
+        objs = writer.save(items, before_save=cls.before_bulk_save, **kwargs)
+        cls.finish_bulk(objs, state, context)
+        return objs
+
+    @classmethod
+    def prepare_bulk(cls, items, context):
+        """Modifies the validated data in `items` before it's saved. Anything
+        returned is passed to `finish_bulk()`."""
+        return None
+
+    @classmethod
+    def before_bulk_save(cls, objs):
+        """Called with the unsaved instances just before they're saved."""
+        pass
+
+    @classmethod
+    def finish_bulk(cls, objs, state, context):
+        """Saves anything else that depends on the saved instances."""
+        pass
@@ -5,7 +5,32 @@ from rest_framework.reverse import reverse
 from participants.models import Speaker
 
 
-class TournamentHyperlinkedRelatedField(HyperlinkedRelatedField):
+class BatchLookupMixin:
+    """If the serializer context has a `related_objects` dict (as for bulk
+    writes), looks up objects in it rather than querying the database for each
+    one. The first lookup for each model loads all objects in the field's
+    queryset into the dict."""
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        related_objects = self.context.get('related_objects')
+        if related_objects is None:
+            return super().get_object(view_name, view_args, view_kwargs)
+
+        queryset = self.get_queryset()
+        key = (queryset.model, self.lookup_field, getattr(self, 'tournament_field', None))
+        if key not in related_objects:
+            related_objects[key] = {str(getattr(obj, self.lookup_field)): obj for obj in queryset}
+        try:
+            return related_objects[key][str(view_kwargs[self.lookup_url_kwarg])]
+        except KeyError:
+            raise queryset.model.DoesNotExist
+
+
+class GlobalHyperlinkedRelatedField(BatchLookupMixin, HyperlinkedRelatedField):
+    pass
+
+
+class TournamentHyperlinkedRelatedField(BatchLookupMixin, HyperlinkedRelatedField):
     default_tournament_field = 'tournament'
 
     def __init__(self, *args, **kwargs):
@@ -29,13 +54,6 @@ class TournamentHyperlinkedRelatedField(HyperlinkedRelatedField):
     def get_url(self, obj, view_name, request, format):
         return reverse(view_name, kwargs=self.get_url_kwargs(obj), request=request, format=format)
 
-    def get_object(self, view_name, view_args, view_kwargs):
-        lookup_value = view_kwargs[self.lookup_url_kwarg]
-        lookup_kwargs = {
-            self.lookup_field: lookup_value,
-        }
-        return self.get_queryset().get(**lookup_kwargs)
-
     def lookup_kwargs(self):
         return {self.tournament_field: self.context['tournament']}
 
@@ -1,14 +1,78 @@
+import hashlib
 import operator
 
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from breakqual.utils import invalidate_liveness
 from tournaments.models import Round, Tournament
+from tournaments.versions import bump_versions, get_round_versions, get_tournament_versions
 
 from .permissions import APIEnabledPermission, IsAdminOrReadOnly, PublicIfReleasedPermission, PublicPreferencePermission
+from .renderers import NDJSONRenderer
 
 
-class TournamentAPIMixin:
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """Adds ETag and Last-Modified headers to responses to GET and HEAD
+    requests, and responds with 304 Not Modified if the client already has
+    the current version, according to the If-None-Match or If-Modified-Since
+    header. This check happens after authentication and permission checks, but
+    before the handler is called, so no queryset is evaluated.
+
+    The ETag is derived from the change versions returned by
+    `get_change_versions()` (see tournaments/versions.py), the user, the media
+    type and the URL. Views must return versions that change whenever anything
+    in their response might change, or set `conditional_get` to False."""
+
+    conditional_get = True
+
+    def get_change_versions(self):
+        raise NotImplementedError
+
+    def get_etag(self, request, versions):
+        user = request.user.pk if request.user.is_authenticated else None
+        key = repr((versions, user, request.accepted_media_type, request.get_full_path()))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.change_versions = self.etag = self.last_modified = None
+        if not self.conditional_get or request.method not in ('GET', 'HEAD') or \
+                request.method not in self.allowed_methods:
+            return
+
+        self.change_versions = self.get_change_versions()
+        self.etag = self.get_etag(request, self.change_versions)
+        self.last_modified = int(max(self.change_versions))
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=exc.status_code)  # must not have a body
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+
+class TournamentAPIMixin(ConditionalGetMixin):
     tournament_field = 'tournament'
 
     access_operator = operator.eq
@@ -34,6 +98,9 @@ class TournamentAPIMixin:
         context['tournament'] = self.tournament
         return context
 
+    def get_change_versions(self):
+        return get_tournament_versions(self.tournament.id)
+
 
 class RoundAPIMixin(TournamentAPIMixin):
     tournament_field = 'round__tournament'
@@ -58,6 +125,9 @@ class RoundAPIMixin(TournamentAPIMixin):
         context['round'] = self.round
         return context
 
+    def get_change_versions(self):
+        return get_round_versions(self.tournament.id, self.round.id)
+
 
 class AdministratorAPIMixin:
     permission_classes = [APIEnabledPermission, IsAdminUser]
@@ -73,3 +143,115 @@ class OnReleasePublicAPIMixin(TournamentPublicAPIMixin):
 
 class PublicAPIMixin:
     permission_classes = [APIEnabledPermission, IsAdminOrReadOnly]
+
+
+class StreamingListMixin:
+    """For list views. If the client asks for newline-delimited JSON (with
+    `?format=ndjson` or `Accept: application/x-ndjson`), streams the whole
+    collection, one object per line, ignoring pagination.
+
+    Objects are loaded and serialized `stream_chunk_size` at a time, in order
+    of primary key, so memory use doesn't grow with the size of the
+    collection. Each chunk is its own query (for objects after the last one
+    sent), so that `prefetch_related()` in `get_queryset()` still applies,
+    and no database cursor is held open while the client reads."""
+
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            queryset = self.filter_queryset(self.get_queryset())
+            return StreamingHttpResponse(self.stream_list(queryset, request.accepted_renderer),
+                                         content_type=NDJSONRenderer.media_type)
+        return super().list(request, *args, **kwargs)
+
+    def stream_list(self, queryset, renderer):
+        queryset = queryset.order_by('pk')
+        chunk = list(queryset[:self.stream_chunk_size])
+        while chunk:
+            yield from renderer.render_lines(self.get_serializer(chunk, many=True).data)
+            if len(chunk) < self.stream_chunk_size:
+                break
+            chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:self.stream_chunk_size])
+
+
+class BulkMixin:
+    """Adds bulk writes of lists of objects to a collection:
+
+    - `bulk_create` (POST) creates an object for each item
+    - `bulk_update` (PATCH) partially updates the object with each item's `id`
+    - `bulk_upsert` (PUT) updates the object with each item's `id`, or creates
+      an object for items without an `id`
+
+    All items are validated first, with related objects looked up in batch. If
+    any item is invalid, nothing is saved, and the response is a list with the
+    errors for each item. Otherwise, all items are saved in one transaction
+    using bulk queries, and the response is a list of results, one for each
+    item, with the `status` ("created" or "updated") and the saved `object`.
+
+    The serializer class must subclass `BulkSerializerMixin` (in api/bulk.py)."""
+
+    def bulk_create(self, request, *args, **kwargs):
+        return self.bulk_write(request, create=True, update=False)
+
+    def bulk_update(self, request, *args, **kwargs):
+        return self.bulk_write(request, create=False, update=True)
+
+    def bulk_upsert(self, request, *args, **kwargs):
+        return self.bulk_write(request, create=True, update=True)
+
+    def get_bulk_save_kwargs(self):
+        return self.lookup_kwargs()
+
+    def get_bulk_serializers(self, items, create, update, context):
+        """Returns a list of serializers, one for each item, or None for items
+        that don't refer to a valid object, and a list of errors."""
+        ids = [item['id'] for item in items if update and isinstance(item.get('id'), int)]
+        instances = self.get_queryset().in_bulk(ids)
+        serializer_class = self.get_serializer_class()
+
+        serializers = []
+        errors = []
+        for item in items:
+            instance = None
+            if update and item.get('id') is not None:
+                instance = instances.get(item['id'])
+                if instance is None:
+                    serializers.append(None)
+                    errors.append({'id': ["There is no object with this ID."]})
+                    continue
+            elif not create:
+                serializers.append(None)
+                errors.append({'id': ["This field is required."]})
+                continue
+
+            # Not get_serializer(), which doesn't take a context
+            serializer = serializer_class(instance, data=item, partial=not create, context=context)
+            serializers.append(serializer)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+        return serializers, errors
+
+    def bulk_write(self, request, create, update):
+        items = request.data
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError("Expected a list of objects.")
+
+        context = self.get_serializer_context()
+        context['related_objects'] = {}
+        serializers, errors = self.get_bulk_serializers(items, create, update, context)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        created = [serializer.instance is None for serializer in serializers]
+        with transaction.atomic():
+            objs = self.get_serializer_class().save_bulk([(serializer.instance, serializer.validated_data)
+                for serializer in serializers], context, **self.get_bulk_save_kwargs())
+        # bulk_create() doesn't send the signals that would normally do these
+        bump_versions(self.tournament.id)
+        invalidate_liveness(self.tournament.id)
+
+        saved = self.get_queryset().in_bulk([obj.pk for obj in objs])
+        data = self.get_serializer([saved[obj.pk] for obj in objs], many=True).data
+        return Response([{'status': "created" if new else "updated", 'object': obj}
+                         for new, obj in zip(created, data)],
+                        status=status.HTTP_201_CREATED if create and not update else status.HTTP_200_OK)
@@ -0,0 +1,43 @@
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Paginates by primary key, using opaque cursors. Unlike limit-offset
+    pagination, fetching a page doesn't get slower the further into the
+    collection it is, and pages don't skip or repeat items if items are added
+    or deleted while a client goes through them."""
+
+    ordering = 'pk'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class TabbycatPagination(BasePagination):
+    """Chooses the pagination style from the query parameters:
+
+    - with `cursor` or `page_size`, keyset pagination (recommended for large
+      collections; start with `?page_size=n` and follow the `next` links);
+    - with `limit` (and optionally `offset`), limit-offset pagination;
+    - otherwise, the whole collection is returned unpaginated.
+    """
+
+    keyset_query_params = [KeysetPagination.cursor_query_param, KeysetPagination.page_size_query_param]
+
+    def __init__(self):
+        self.paginator = LimitOffsetPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if any(param in request.query_params for param in self.keyset_query_params):
+            self.paginator = KeysetPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_schema_fields(self, view):
+        return KeysetPagination().get_schema_fields(view) + LimitOffsetPagination().get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return (KeysetPagination().get_schema_operation_parameters(view) +
+                LimitOffsetPagination().get_schema_operation_parameters(view))
@@ -0,0 +1,27 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders newline-delimited JSON: one JSON object per line. A list is
+    rendered as one line per item; anything else as a single line.
+
+    Collection endpoints using `StreamingListMixin` don't use this to render
+    their lists, but stream them instead (see `StreamingListMixin`)."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render_lines(self, items):
+        for item in items:
+            yield json.dumps(item, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, list):
+            data = [data]
+        return b''.join(self.render_lines(data))
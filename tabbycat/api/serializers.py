@@ -1,3 +1,4 @@
+import random
 from urllib import parse
 
 from django.db import IntegrityError
@@ -8,12 +9,14 @@ from django.utils.encoding import uri_to_iri
 from rest_framework import serializers
 from rest_framework.relations import Hyperlink
 
-from adjallocation.models import DebateAdjudicator
+from adjallocation.models import AdjudicatorInstitutionConflict, DebateAdjudicator, TeamInstitutionConflict
+from adjallocation.preformed.anticipated import invalidate_anticipated_draws
 from adjfeedback.models import AdjudicatorFeedback, AdjudicatorFeedbackQuestion
+from breakqual.liveness import DEAD, LIVE, SAFE
 from breakqual.models import BreakCategory, BreakingTeam
 from draw.models import Debate, DebateTeam
 from motions.models import Motion, RoundMotion
-from participants.emoji import pick_unused_emoji
+from participants.emoji import EMOJI_RANDOM_OPTIONS, pick_unused_emoji
 from participants.models import Adjudicator, Institution, Region, Speaker, SpeakerCategory, Team
 from privateurls.utils import populate_url_keys
 from results.mixins import TabroomSubmissionFieldsMixin
@@ -23,6 +26,7 @@ from tournaments.models import Round, Tournament
 from venues.models import Venue, VenueCategory
 
 from . import fields
+from .bulk import BulkSerializerMixin
 
 
 class TournamentSerializer(serializers.ModelSerializer):
@@ -212,6 +216,8 @@ class BreakCategorySerializer(serializers.ModelSerializer):
             view_name='api-breakcategory-eligibility')
         breaking_teams = fields.TournamentHyperlinkedIdentityField(
             view_name='api-breakcategory-break')
+        liveness = fields.TournamentHyperlinkedIdentityField(
+            view_name='api-breakcategory-liveness')
 
     url = fields.TournamentHyperlinkedIdentityField(
         view_name='api-breakcategory-detail')
@@ -303,7 +309,30 @@ class PartialBreakingTeamSerializer(BreakingTeamSerializer):
         return bt
 
 
-class SpeakerSerializer(serializers.ModelSerializer):
+class PersonBulkSerializerMixin(BulkSerializerMixin):
+    """Gives new people URL keys in bulk writes, as `create()` does."""
+
+    @classmethod
+    def prepare_bulk(cls, items, context):
+        populate = []
+        for instance, data in items:
+            if instance is not None:
+                populate.append(False)
+                continue
+            url_key = data.pop('url_key', None)
+            if url_key is not None and len(url_key) != 0:  # Let an empty string be null for the uniqueness constraint
+                data['url_key'] = url_key
+            populate.append(url_key is None)
+        return populate
+
+    @classmethod
+    def finish_bulk(cls, objs, populate, context):
+        people = [obj for obj, needs_key in zip(objs, populate) if needs_key]
+        if people:
+            populate_url_keys(people)
+
+
+class SpeakerSerializer(PersonBulkSerializerMixin, serializers.ModelSerializer):
 
     class LinksSerializer(serializers.Serializer):
         checkin = fields.TournamentHyperlinkedIdentityField(tournament_field='team__tournament', view_name='api-speaker-checkin')
@@ -344,19 +373,19 @@ class SpeakerSerializer(serializers.ModelSerializer):
         return speaker
 
 
-class AdjudicatorSerializer(serializers.ModelSerializer):
+class AdjudicatorSerializer(PersonBulkSerializerMixin, serializers.ModelSerializer):
 
     class LinksSerializer(serializers.Serializer):
         checkin = fields.TournamentHyperlinkedIdentityField(view_name='api-adjudicator-checkin')
 
     url = fields.TournamentHyperlinkedIdentityField(view_name='api-adjudicator-detail')
-    institution = serializers.HyperlinkedRelatedField(
+    institution = fields.GlobalHyperlinkedRelatedField(
         allow_null=True,
         view_name='api-global-institution-detail',
         queryset=Institution.objects.all(),
     )
 
-    institution_conflicts = serializers.HyperlinkedRelatedField(
+    institution_conflicts = fields.GlobalHyperlinkedRelatedField(
         many=True,
         view_name='api-global-institution-detail',
         queryset=Institution.objects.all(),
@@ -399,7 +428,7 @@ class AdjudicatorSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Adjudicator
-        exclude = ('tournament', 'round_availabilities', 'venue_constraints')
+        exclude = ('tournament', 'stored_feedback_score', 'feedback_count')
 
     def create(self, validated_data):
         url_key = validated_data.pop('url_key', None)
@@ -416,15 +445,25 @@ class AdjudicatorSerializer(serializers.ModelSerializer):
 
         return adj
 
+    @classmethod
+    def finish_bulk(cls, objs, populate, context):
+        super().finish_bulk(objs, populate, context)
+        AdjudicatorInstitutionConflict.objects.bulk_create([
+            AdjudicatorInstitutionConflict(adjudicator=adj, institution=adj.institution)
+            for adj in objs if adj.institution is not None
+        ], ignore_conflicts=True)
+
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(BulkSerializerMixin, serializers.ModelSerializer):
     class TeamSpeakerSerializer(SpeakerSerializer):
+        team = None
+
         class Meta:
             model = Speaker
             exclude = ('team',)
 
     url = fields.TournamentHyperlinkedIdentityField(view_name='api-team-detail')
-    institution = serializers.HyperlinkedRelatedField(
+    institution = fields.GlobalHyperlinkedRelatedField(
         allow_null=True,
         view_name='api-global-institution-detail',
         queryset=Institution.objects.all(),
@@ -435,15 +474,17 @@ class TeamSerializer(serializers.ModelSerializer):
         queryset=BreakCategory.objects.all(),
     )
 
-    institution_conflicts = serializers.HyperlinkedRelatedField(
+    institution_conflicts = fields.GlobalHyperlinkedRelatedField(
         many=True,
         view_name='api-global-institution-detail',
         queryset=Institution.objects.all(),
     )
 
+    bulk_update_fields = ('short_name', 'long_name')
+
     class Meta:
         model = Team
-        exclude = ('tournament', 'round_availabilities', 'venue_constraints', 'type')
+        exclude = ('tournament', 'type')
 
     def __init__(self, *args, **kwargs):
         self.fields['speakers'] = self.TeamSpeakerSerializer(*args, many=True, required=False, **kwargs)
@@ -479,20 +520,9 @@ class TeamSerializer(serializers.ModelSerializer):
         3. Create the speakers.
         4. Add institution conflict"""
 
-        if len(validated_data.get('short_reference'), "") == 0:
-            validated_data['short_reference'] = validated_data['reference'][:34]
-
         speakers_data = validated_data.pop('speakers', [])
         break_categories = validated_data.pop('break_categories')
-
-        emoji, code_name = pick_unused_emoji()
-        if 'emoji' not in validated_data or validated_data.get('emoji') is None:
-            validated_data['emoji'] = emoji
-        if 'code_name' not in validated_data or validated_data.get('code_name') is None:
-            validated_data['code_name'] = code_name
-
-        if validated_data['emoji'] == '':
-            validated_data['emoji'] = None  # Must convert to null to avoid uniqueness errors
+        self.set_defaults(validated_data, pick_unused_emoji() or (None, ""))
 
         team = super().create(validated_data)
 
@@ -521,6 +551,55 @@ class TeamSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
 
+    @staticmethod
+    def set_defaults(validated_data, emoji):
+        """Fills in the short reference, emoji and code name of a new team, if
+        they weren't given. `emoji` is an `(emoji, code_name)` pair to use."""
+        if len(validated_data.get('short_reference', "")) == 0:
+            validated_data['short_reference'] = validated_data.get('reference', "")[:34]
+
+        if validated_data.get('emoji') is None:
+            validated_data['emoji'] = emoji[0]
+        if validated_data.get('code_name') is None:
+            validated_data['code_name'] = emoji[1]
+
+        if validated_data['emoji'] == '':
+            validated_data['emoji'] = None  # Must convert to null to avoid uniqueness errors
+
+    @classmethod
+    def prepare_bulk(cls, items, context):
+        tournament = context['tournament']
+        general = list(BreakCategory.objects.filter(tournament=tournament, is_general=True))
+
+        used_emoji = set(tournament.team_set.filter(emoji__isnull=False).values_list('emoji', flat=True))
+        used_emoji.update(data.get('emoji') for instance, data in items)
+        unused_emoji = [e for e in EMOJI_RANDOM_OPTIONS if e[0] not in used_emoji]
+        random.shuffle(unused_emoji)
+
+        speakers = []
+        for instance, data in items:
+            speakers.append(data.pop('speakers', []))
+            if instance is None:
+                emoji = unused_emoji.pop() if data.get('emoji') is None and unused_emoji else (None, "")
+                cls.set_defaults(data, emoji)
+                data['break_categories'] = general + [bc for bc in data.get('break_categories', []) if bc not in general]
+        return speakers
+
+    @classmethod
+    def before_bulk_save(cls, objs):
+        for team in objs:
+            team.short_name = team._construct_short_name()
+            team.long_name = team._construct_long_name()
+
+    @classmethod
+    def finish_bulk(cls, objs, speakers, context):
+        SpeakerSerializer.save_bulk([(None, dict(data, team=team))
+            for team, team_speakers in zip(objs, speakers) for data in team_speakers], context)
+        TeamInstitutionConflict.objects.bulk_create([
+            TeamInstitutionConflict(team=team, institution=team.institution)
+            for team in objs if team.institution is not None
+        ], ignore_conflicts=True)
+
 
 class InstitutionSerializer(serializers.ModelSerializer):
     url = serializers.HyperlinkedIdentityField(view_name='api-global-institution-detail')
@@ -551,7 +630,7 @@ class PerTournamentInstitutionSerializer(InstitutionSerializer):
             self.fields.pop('adjudicators')
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(BulkSerializerMixin, serializers.ModelSerializer):
 
     class LinksSerializer(serializers.Serializer):
         checkin = fields.TournamentHyperlinkedIdentityField(view_name='api-venue-checkin')
@@ -596,16 +675,26 @@ class BaseStandingsSerializer(serializers.Serializer):
         return obj.rankings['rank'][1]
 
     def get_metrics(self, obj):
-        return [{'metric': s, 'value': v} for s, v in obj.metrics.items()]
+        return [{'metric': s, 'value': v} for s, v in obj.metrics.items()
+                if self.metric_keys is None or s in self.metric_keys]
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, fields=None, metrics=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.metric_keys = metrics
+        if fields is not None:
+            for field in set(self.fields) - set(fields):
+                self.fields.pop(field)
 
 
 class TeamStandingsSerializer(BaseStandingsSerializer):
     team = fields.TournamentHyperlinkedRelatedField(view_name='api-team-detail', queryset=Team.objects.all())
 
 
+class TeamLivenessSerializer(serializers.Serializer):
+    team = fields.TournamentHyperlinkedRelatedField(view_name='api-team-detail', queryset=Team.objects.all())
+    liveness = serializers.ChoiceField(choices=(SAFE, LIVE, DEAD))
+
+
 class SpeakerStandingsSerializer(BaseStandingsSerializer):
     speaker = fields.AnonymisingHyperlinkedTournamentRelatedField(view_name='api-speaker-detail', anonymous_source='anonymous')
 
@@ -659,6 +748,7 @@ class RoundPairingSerializer(serializers.ModelSerializer):
         teams = self.DebateTeamSerializer(many=True)
         teams._validated_data = teams_data  # Data was already validated
         teams.save(debate=debate)
+        invalidate_anticipated_draws(debate.round.tournament_id, after_seq=debate.round.seq)
 
         adjudicators = self.DebateAdjudicatorSerializer()
         adjudicators._validated_data = adjs_data
@@ -674,6 +764,7 @@ class RoundPairingSerializer(serializers.ModelSerializer):
                 })
             except (IntegrityError, TypeError) as e:
                 raise serializers.ValidationError(e)
+        invalidate_anticipated_draws(instance.round.tournament_id, after_seq=instance.round.seq)
 
         adjudicators = self.DebateAdjudicatorSerializer()
         adjudicators._validated_data = validated_data.pop('adjudicators')
@@ -1017,7 +1108,7 @@ class BallotSerializer(TabroomSubmissionFieldsMixin, serializers.ModelSerializer
 
     class Meta:
         model = BallotSubmission
-        exclude = ('debate',)
+        exclude = ('debate', 'result_hash')
         read_only_fields = ('timestamp', 'version',
             'submitter_type', 'submitter', 'participant_submitter',
             'confirmer', 'confirm_timestamp',
@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from breakqual.models import BreakCategory
+from breakqual.utils import get_liveness, liveness_cache_key
+from participants.models import Adjudicator, Institution, Team
+from tournaments.models import Tournament
+from venues.models import Venue, VenueCategory
+
+
+class TestBulkWrites(APITestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        user = get_user_model().objects.create(username='test_admin', is_superuser=True, is_staff=True)
+        self.client.force_authenticate(user)
+        self.institution = Institution.objects.first()
+
+    def url(self, model):
+        return reverse('api-%s-bulk' % model, kwargs={'tournament_slug': self.tournament.slug})
+
+    def institution_url(self, institution):
+        return reverse('api-global-institution-detail', kwargs={'pk': institution.pk})
+
+    def test_create_teams(self):
+        teams = [{
+            'reference': "Bulk %d" % i,
+            'institution': self.institution_url(self.institution),
+            'use_institution_prefix': True,
+            'break_categories': [],
+            'institution_conflicts': [],
+            'speakers': [{'name': "Speaker %d-%d" % (i, j), 'categories': []} for j in range(2)],
+        } for i in range(3)]
+        response = self.client.post(self.url('team'), teams, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual([result['status'] for result in response.data], ["created"] * 3)
+
+        general = set(BreakCategory.objects.filter(tournament=self.tournament, is_general=True))
+        for result in response.data:
+            team = Team.objects.get(id=result['object']['id'])
+            self.assertEqual(team.short_name, "%s %s" % (self.institution.code, team.reference))
+            self.assertEqual(set(team.break_categories.all()), general)
+            self.assertEqual(team.speaker_set.count(), 2)
+            self.assertFalse(team.speaker_set.filter(url_key__isnull=True).exists())
+            self.assertTrue(team.teaminstitutionconflict_set.filter(institution=self.institution).exists())
+            self.assertIsNotNone(team.emoji)
+        self.assertEqual(len({result['object']['emoji'] for result in response.data}), 3)
+
+    def test_create_teams_clears_liveness(self):
+        round = self.tournament.round_set.order_by('seq').last()
+        get_liveness(round)
+        self.assertIsNotNone(cache.get(liveness_cache_key(round.id)))
+        teams = [{'reference': "Bulk", 'institution': self.institution_url(self.institution),
+                  'break_categories': [], 'institution_conflicts': [],
+                  'speakers': [{'name': "Speaker", 'categories': []}]}]
+        response = self.client.post(self.url('team'), teams, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNone(cache.get(liveness_cache_key(round.id)))
+
+    def test_invalid_item_saves_nothing(self):
+        venues = [{'name': "Room A", 'priority': 10, 'categories': []},
+                  {'name': "Room B", 'priority': "high", 'categories': []}]
+        count = Venue.objects.count()
+        response = self.client.post(self.url('venue'), venues, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('priority', response.data[1])
+        self.assertEqual(Venue.objects.count(), count)
+
+    def test_queries_independent_of_batch_size(self):
+        category = VenueCategory.objects.create(tournament=self.tournament, name="Accessible")
+        category_url = reverse('api-venuecategory-detail', kwargs={'tournament_slug': self.tournament.slug, 'pk': category.pk})
+        counts = []
+        for n in [2, 10]:
+            venues = [{'name': "Room %d-%d" % (n, i), 'priority': i, 'categories': [category_url]} for i in range(n)]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url('venue'), venues, format='json')
+            self.assertEqual(response.status_code, 201, response.data)
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(category.venues.count(), 12)
+
+    def test_update_adjudicators(self):
+        adjs = list(Adjudicator.objects.filter(tournament=self.tournament)[:3])
+        items = [{'id': adj.id, 'base_score': 4.5} for adj in adjs] + [{'id': 0, 'base_score': 1}]
+        response = self.client.patch(self.url('adjudicator'), items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data[3])
+
+        response = self.client.patch(self.url('adjudicator'), items[:3], format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([result['status'] for result in response.data], ["updated"] * 3)
+        for adj in adjs:
+            adj.refresh_from_db()
+            self.assertEqual(adj.base_score, 4.5)
+
+    def test_upsert_venues(self):
+        venue = self.tournament.venue_set.first()
+        items = [{'id': venue.id, 'name': "Renamed", 'priority': 5, 'categories': []},
+                 {'name': "New room", 'priority': 5, 'categories': []}]
+        response = self.client.put(self.url('venue'), items, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([result['status'] for result in response.data], ["updated", "created"])
+        venue.refresh_from_db()
+        self.assertEqual(venue.name, "Renamed")
+        self.assertFalse(venue.venuecategory_set.exists())
+        self.assertTrue(self.tournament.venue_set.filter(name="New room").exists())
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from adjallocation.models import AdjudicatorTeamConflict
+from draw.admin import DebateAdmin
+from draw.models import Debate
+from participants.models import Adjudicator, Speaker, Team
+from tournaments.models import Tournament
+
+
+class TestConditionalGet(APITestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        user = get_user_model().objects.create(username='test_admin', is_superuser=True, is_staff=True)
+        self.client.force_authenticate(user)
+        self.url = reverse('api-speaker-list', kwargs={'tournament_slug': self.tournament.slug})
+
+    def pairings_url(self, seq):
+        return reverse('api-pairing-list', kwargs={'tournament_slug': self.tournament.slug, 'round_seq': seq})
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertFalse([q for q in context.captured_queries if 'participants_speaker' in q['sql']])
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified_after_save(self):
+        etag = self.client.get(self.url)['ETag']
+        speaker = Speaker.objects.filter(team__tournament=self.tournament).first()
+        speaker.name = "Renamed"
+        speaker.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_media_type(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'format': 'ndjson'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_round_versions(self):
+        etag = self.client.get(self.pairings_url(1))['ETag']
+
+        # changes to other rounds don't affect this round
+        Debate.objects.filter(round__seq=2, round__tournament=self.tournament).first().save()
+        response = self.client.get(self.pairings_url(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # but changes to participants do
+        Team.objects.filter(tournament=self.tournament).first().save()
+        response = self.client.get(self.pairings_url(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_modified_after_conflict_saved(self):
+        url = reverse('api-adjudicator-list', kwargs={'tournament_slug': self.tournament.slug})
+        etag = self.client.get(url)['ETag']
+        adj = Adjudicator.objects.filter(tournament=self.tournament).first()
+        team = Team.objects.filter(tournament=self.tournament).exclude(adjudicatorteamconflict__adjudicator=adj).first()
+        AdjudicatorTeamConflict.objects.create(adjudicator=adj, team=team)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_modified_after_admin_action(self):
+        etag = self.client.get(self.pairings_url(1))['ETag']
+        model_admin = DebateAdmin(Debate, site)
+        with mock.patch.object(model_admin, 'message_user'):
+            model_admin.mark_as_sides_not_confirmed(RequestFactory().post('/'),
+                Debate.objects.filter(round__seq=1, round__tournament=self.tournament))
+        response = self.client.get(self.pairings_url(1), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
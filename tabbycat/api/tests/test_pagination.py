@@ -0,0 +1,62 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.views import PairingViewSet
+from participants.models import Speaker
+from tournaments.models import Tournament
+
+
+class TestCollectionPagination(APITestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        user = get_user_model().objects.create(username='test_admin', is_superuser=True, is_staff=True)
+        self.client.force_authenticate(user)
+        self.url = reverse('api-speaker-list', kwargs={'tournament_slug': self.tournament.slug})
+        self.speaker_ids = list(Speaker.objects.filter(team__tournament=self.tournament).order_by('id').values_list('id', flat=True))
+
+    def test_unpaginated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), len(self.speaker_ids))
+
+    def test_limit_offset(self):
+        response = self.client.get(self.url, {'limit': 5, 'offset': 5})
+        self.assertEqual(response.data['count'], len(self.speaker_ids))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_keyset(self):
+        ids = []
+        url = self.url + '?page_size=7'
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 7)
+            ids.extend(speaker['id'] for speaker in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(ids, self.speaker_ids)
+
+    def test_ndjson_stream(self):
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], self.speaker_ids)
+
+    @patch.object(PairingViewSet, 'stream_chunk_size', 3)
+    def test_ndjson_stream_chunks(self):
+        url = reverse('api-pairing-list', kwargs={'tournament_slug': self.tournament.slug, 'round_seq': 1})
+        expected = json.loads(self.client.get(url).content)
+        response = self.client.get(url, HTTP_ACCEPT='application/x-ndjson')
+        streamed = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+        # Debate teams aren't ordered, so may come in a different order in each response
+        for pairing in streamed + expected:
+            pairing['teams'].sort(key=lambda team: team['side'])
+        self.assertEqual(streamed, sorted(expected, key=lambda pairing: pairing['id']))
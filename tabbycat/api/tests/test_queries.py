@@ -0,0 +1,125 @@
+from django.test import TestCase
+from django.urls import get_resolver, reverse
+from rest_framework.test import APIClient
+
+from adjfeedback.models import AdjudicatorFeedback, AdjudicatorFeedbackQuestion
+from draw.models import Debate
+from participants.models import Speaker, SpeakerCategory
+from results.models import BallotSubmission
+from utils.tests import QueryCountTestMixin
+from venues.models import VenueCategory
+
+
+def tournament_kwargs(t):
+    return {'tournament_slug': t.slug}
+
+
+def round_kwargs(t):
+    return {'tournament_slug': t.slug, 'round_seq': 1}
+
+
+def debate_kwargs(t):
+    debate = Debate.objects.filter(round__tournament=t, round__seq=1).order_by('id').first()
+    return dict(round_kwargs(t), debate_pk=debate.pk)
+
+
+def object_kwargs(get_object, base=tournament_kwargs):
+    return lambda t: dict(base(t), pk=get_object(t).pk)
+
+
+def first_speaker_category(t):
+    return SpeakerCategory.objects.get_or_create(tournament=t, slug='novice', defaults={'name': "Novice", 'seq': 1})[0]
+
+
+def first_venue_category(t):
+    return VenueCategory.objects.get_or_create(tournament=t, name="Accessible")[0]
+
+
+def first_feedback_question(t):
+    return AdjudicatorFeedbackQuestion.objects.get_or_create(tournament=t, reference='comments', defaults={
+        'text': "Comments", 'seq': 1, 'answer_type': AdjudicatorFeedbackQuestion.ANSWER_TYPE_LONGTEXT,
+        'from_adj': True, 'from_team': True})[0]
+
+
+def first_ballot(t):
+    kwargs = debate_kwargs(t)
+    return BallotSubmission.objects.filter(debate_id=kwargs['debate_pk'], confirmed=True).get()
+
+
+# Maps the name of each API route to a function returning the URL keyword
+# arguments for a tournament. Routes that don't accept GET requests are None.
+API_ROUTES = {
+    'api-root': lambda t: {},
+    'api-v1-root': lambda t: {},
+    'api-tournament-list': lambda t: {},
+    'api-tournament-detail': tournament_kwargs,
+    'api-motion-list': tournament_kwargs,
+    'api-motion-detail': object_kwargs(lambda t: t.motion_set.order_by('id').first()),
+    'api-feedbackquestion-list': tournament_kwargs,
+    'api-feedbackquestion-detail': object_kwargs(first_feedback_question),
+    'api-feedback-list': tournament_kwargs,
+    'api-feedback-detail': object_kwargs(lambda t: AdjudicatorFeedback.objects.filter(
+        adjudicator__tournament=t).order_by('id').first()),
+    'api-round-list': tournament_kwargs,
+    'api-round-detail': round_kwargs,
+    'api-round-result-statuses': round_kwargs,
+    'api-pairing-list': round_kwargs,
+    'api-pairing-detail': debate_kwargs,
+    'api-ballot-list': debate_kwargs,
+    'api-ballot-detail': object_kwargs(first_ballot, base=debate_kwargs),
+    'api-ballot-ingest': None,
+    'api-breakcategory-list': tournament_kwargs,
+    'api-breakcategory-detail': object_kwargs(lambda t: t.breakcategory_set.order_by('id').first()),
+    'api-breakcategory-eligibility': object_kwargs(lambda t: t.breakcategory_set.order_by('id').first()),
+    'api-breakcategory-break': object_kwargs(lambda t: t.breakcategory_set.order_by('id').first()),
+    'api-breakcategory-liveness': object_kwargs(lambda t: t.breakcategory_set.order_by('id').first()),
+    'api-speakercategory-list': tournament_kwargs,
+    'api-speakercategory-detail': object_kwargs(first_speaker_category),
+    'api-speakercategory-eligibility': object_kwargs(first_speaker_category),
+    'api-institution-list': tournament_kwargs,
+    'api-team-list': tournament_kwargs,
+    'api-team-bulk': None,
+    'api-team-detail': object_kwargs(lambda t: t.team_set.order_by('id').first()),
+    'api-team-standings': tournament_kwargs,
+    'api-adjudicator-list': tournament_kwargs,
+    'api-adjudicator-bulk': None,
+    'api-adjudicator-detail': object_kwargs(lambda t: t.adjudicator_set.order_by('id').first()),
+    'api-adjudicator-checkin': object_kwargs(lambda t: t.adjudicator_set.order_by('id').first()),
+    'api-speaker-list': tournament_kwargs,
+    'api-speaker-bulk': None,
+    'api-speaker-detail': object_kwargs(lambda t: Speaker.objects.filter(team__tournament=t).order_by('id').first()),
+    'api-speaker-checkin': object_kwargs(lambda t: Speaker.objects.filter(team__tournament=t).order_by('id').first()),
+    'api-substantive-speaker-standings': tournament_kwargs,
+    'api-reply-speaker-standings': tournament_kwargs,
+    'api-venue-list': tournament_kwargs,
+    'api-venue-bulk': None,
+    'api-venue-detail': object_kwargs(lambda t: t.venue_set.order_by('id').first()),
+    'api-venue-checkin': object_kwargs(lambda t: t.venue_set.order_by('id').first()),
+    'api-venuecategory-list': tournament_kwargs,
+    'api-venuecategory-detail': object_kwargs(first_venue_category),
+    'tournamentpreferencemodel-list': tournament_kwargs,
+    'tournamentpreferencemodel-bulk': None,
+    'tournamentpreferencemodel-detail': lambda t: dict(tournament_kwargs(t), pk='debate_rules__substantive_speakers'),
+    'api-global-institution-list': lambda t: {},
+    'api-global-institution-detail': object_kwargs(lambda t: t.team_set.order_by('id').first().institution, base=lambda t: {}),
+}
+
+
+class APIQueryCountTests(QueryCountTestMixin, TestCase):
+
+    client_class = APIClient
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_all_routes_listed(self):
+        names = {name for name in get_resolver('api.urls').reverse_dict if isinstance(name, str)}
+        self.assertEqual(names, set(API_ROUTES))
+
+    def test_query_counts(self):
+        for name, get_kwargs in API_ROUTES.items():
+            if get_kwargs is None:
+                continue
+            with self.subTest(route=name):
+                self.assertQueryCountBounded(lambda t: reverse(name, kwargs=get_kwargs(t)))
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from breakqual.models import BreakCategory
+from participants.models import Team
+from tournaments.models import Tournament
+
+
+class TestStandingsAPI(APITestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.tournament.preferences['standings__team_standings_precedence'] = ['wins', 'speaks_sum']
+        self.tournament.preferences['standings__team_standings_extra_metrics'] = ['margin_avg', 'npullups']
+        user = get_user_model().objects.create(username='test_admin', is_superuser=True, is_staff=True)
+        self.client.force_authenticate(user)
+        self.url = reverse('api-team-standings', kwargs={'tournament_slug': self.tournament.slug})
+
+    def metrics(self, item):
+        return [metric['metric'] for metric in item['metrics']]
+
+    def test_all(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), Team.objects.filter(tournament=self.tournament).count())
+        self.assertEqual(set(response.data[0]), {'rank', 'tied', 'metrics', 'team'})
+        self.assertEqual(set(self.metrics(response.data[0])), {'wins', 'speaks_sum', 'margin_avg', 'npullups'})
+
+    def test_fields_and_metrics(self):
+        response = self.client.get(self.url, {'fields': 'rank,team,metrics', 'metrics': 'wins,margin_avg'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data[0]), {'rank', 'team', 'metrics'})
+        self.assertEqual(self.metrics(response.data[0]), ['wins', 'margin_avg'])
+
+        # ranks don't depend on which metrics are shown
+        full = self.client.get(self.url).data
+        self.assertEqual([(item['team'], item['rank']) for item in response.data],
+                         [(item['team'], item['rank']) for item in full])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'fields': 'rank,name'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'metrics': 'firsts'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'round': 99}).status_code, 400)
+
+    def test_round(self):
+        response = self.client.get(self.url, {'round': 1, 'metrics': 'wins'})
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(max(item['metrics'][0]['value'] for item in response.data), 1)
+
+    def test_cached(self):
+        first = self.client.get(self.url, {'metrics': 'wins'}).data
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.url, {'metrics': 'wins'}).data
+        self.assertEqual(first, second)
+        self.assertFalse([q for q in context.captured_queries if 'results_teamscore' in q['sql']])
+
+        team = Team.objects.filter(tournament=self.tournament).first()
+        team.save()
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {'metrics': 'wins'})
+        self.assertTrue([q for q in context.captured_queries if 'results_teamscore' in q['sql']])
+
+    def test_cache_key_uses_validated_params(self):
+        self.client.get(self.url, {'round': 1, 'metrics': 'wins'})
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {'round': '01', 'metrics': 'wins'})
+        self.assertFalse([q for q in context.captured_queries if 'results_teamscore' in q['sql']])
+
+        self.assertEqual(self.client.get(self.url, {'category': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'category': 'open'}).status_code, 400)
+
+    def test_category(self):
+        category = BreakCategory.objects.filter(tournament=self.tournament).first()
+        response = self.client.get(self.url, {'category': category.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), category.team_set.count())
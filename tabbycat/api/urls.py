@@ -9,6 +9,7 @@ pref_router.register('preferences', views.TournamentPreferenceViewSet)
 
 list_methods = {'get': 'list', 'post': 'create'}
 detail_methods = {'get': 'retrieve', 'post': 'update', 'delete': 'destroy'}
+bulk_methods = {'post': 'bulk_create', 'patch': 'bulk_update', 'put': 'bulk_upsert'}
 
 urlpatterns = [
 
@@ -69,6 +70,9 @@ urlpatterns = [
                         path('',
                             views.RoundViewSet.as_view(detail_methods),
                             name='api-round-detail'),
+                        path('/result-statuses',
+                            views.RoundResultStatusView.as_view(),
+                            name='api-round-result-statuses'),
 
                         path('/pairings', include([
                             path('',
@@ -92,6 +96,10 @@ urlpatterns = [
                     ])),
                 ])),
 
+                path('/ballots',
+                    views.BallotIngestView.as_view(),
+                    name='api-ballot-ingest'),
+
                 path('/break-categories', include([
 
                     path('',
@@ -110,6 +118,9 @@ urlpatterns = [
                                 {'get': 'list', 'post': 'create', 'delete': 'destroy', 'patch': 'update'},
                             ),
                             name='api-breakcategory-break'),
+                        path('/liveness',
+                            views.BreakCategoryLivenessView.as_view(),
+                            name='api-breakcategory-liveness'),
                     ])),
                 ])),
 
@@ -136,6 +147,9 @@ urlpatterns = [
                     path('',
                          views.TeamViewSet.as_view(list_methods),
                          name='api-team-list'),
+                    path('/bulk',
+                         views.TeamViewSet.as_view(bulk_methods),
+                         name='api-team-bulk'),
                     path('/<int:pk>',
                          views.TeamViewSet.as_view(detail_methods),
                          name='api-team-detail'),
@@ -147,6 +161,9 @@ urlpatterns = [
                     path('',
                         views.AdjudicatorViewSet.as_view(list_methods),
                         name='api-adjudicator-list'),
+                    path('/bulk',
+                        views.AdjudicatorViewSet.as_view(bulk_methods),
+                        name='api-adjudicator-bulk'),
                     path('/<int:pk>', include([
                         path('',
                             views.AdjudicatorViewSet.as_view(detail_methods),
@@ -160,6 +177,9 @@ urlpatterns = [
                     path('',
                          views.SpeakerViewSet.as_view(list_methods),
                          name='api-speaker-list'),
+                    path('/bulk',
+                         views.SpeakerViewSet.as_view(bulk_methods),
+                         name='api-speaker-bulk'),
                     path('/<int:pk>', include([
                         path('',
                             views.SpeakerViewSet.as_view(detail_methods),
@@ -181,6 +201,9 @@ urlpatterns = [
                     path('',
                         views.VenueViewSet.as_view(list_methods),
                         name='api-venue-list'),
+                    path('/bulk',
+                        views.VenueViewSet.as_view(bulk_methods),
+                        name='api-venue-bulk'),
                     path('/<int:pk>', include([
                         path('',
                             views.VenueViewSet.as_view(detail_methods),
@@ -1,9 +1,13 @@
+import hashlib
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Prefetch, Q
 from dynamic_preferences.api.serializers import PreferenceSerializer
 from dynamic_preferences.api.viewsets import PerInstancePreferenceViewSet
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import GenericAPIView, get_object_or_404, RetrieveUpdateAPIView
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
@@ -12,6 +16,7 @@ from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
 from adjfeedback.models import AdjudicatorFeedbackQuestion
 from breakqual.models import BreakCategory
+from breakqual.utils import get_liveness
 from breakqual.views import GenerateBreakMixin
 from checkins.consumers import CheckInEventConsumer
 from checkins.models import Event
@@ -19,14 +24,18 @@ from checkins.utils import create_identifiers, get_unexpired_checkins
 from draw.models import Debate
 from options.models import TournamentPreferenceModel
 from participants.models import Adjudicator, Institution, Speaker, SpeakerCategory, Team
+from results.ingest import BallotIngester, BallotIngestError
+from results.utils import get_result_status_stats
 from standings.speakers import SpeakerStandingsGenerator
 from standings.teams import TeamStandingsGenerator
 from tournaments.mixins import TournamentFromUrlMixin
 from tournaments.models import Round, Tournament
+from utils.misc import get_ip_address
 from venues.models import Venue, VenueCategory
 
 from . import serializers
-from .mixins import AdministratorAPIMixin, PublicAPIMixin, RoundAPIMixin, TournamentAPIMixin, TournamentPublicAPIMixin
+from .mixins import (AdministratorAPIMixin, BulkMixin, PublicAPIMixin, RoundAPIMixin, StreamingListMixin,
+                     TournamentAPIMixin, TournamentPublicAPIMixin)
 from .permissions import APIEnabledPermission, PublicPreferencePermission
 
 
@@ -171,7 +180,23 @@ class BreakingTeamsView(TournamentAPIMixin, TournamentPublicAPIMixin, GenerateBr
         return self.create(request, *args, **kwargs)
 
 
-class InstitutionViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
+class BreakCategoryLivenessView(TournamentAPIMixin, AdministratorAPIMixin, GenericAPIView):
+    """Whether each eligible team is safe, live or dead for the break going into
+    the current round."""
+    name = "Break Liveness"
+    serializer_class = serializers.TeamLivenessSerializer
+
+    def get(self, request, *args, **kwargs):
+        category = get_object_or_404(BreakCategory, tournament=self.tournament, pk=self.kwargs.get('pk'))
+        round = self.tournament.current_round
+        liveness = get_liveness(round).get(category.id, {}) if round is not None else {}
+        teams = Team.objects.filter(id__in=liveness.keys()).select_related('tournament').order_by('id')
+        data = [{'team': team, 'liveness': liveness[team.id]} for team in teams]
+        serializer = self.get_serializer(data, many=True)
+        return Response(serializer.data)
+
+
+class InstitutionViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, StreamingListMixin, ModelViewSet):
     serializer_class = serializers.PerTournamentInstitutionSerializer
     access_preference = 'public_institutions_list'
 
@@ -192,7 +217,7 @@ class InstitutionViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelView
         )
 
 
-class TeamViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
+class TeamViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, StreamingListMixin, BulkMixin, ModelViewSet):
     serializer_class = serializers.TeamSerializer
     access_preference = 'public_participants'
 
@@ -201,7 +226,7 @@ class TeamViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
         if not self.request.user or not self.request.user.is_staff:
             category_prefetch.queryset = category_prefetch.queryset.filter(public=True)
 
-        return super().get_queryset().select_related('tournament').prefetch_related(
+        return super().get_queryset().select_related('tournament', 'institution').prefetch_related(
             Prefetch(
                 'speaker_set',
                 queryset=Speaker.objects.all().prefetch_related(category_prefetch).select_related('team__tournament'),
@@ -211,7 +236,7 @@ class TeamViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
         )
 
 
-class AdjudicatorViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
+class AdjudicatorViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, StreamingListMixin, BulkMixin, ModelViewSet):
     serializer_class = serializers.AdjudicatorSerializer
     access_preference = 'public_participants'
 
@@ -240,7 +265,7 @@ class GlobalInstitutionViewSet(AdministratorAPIMixin, ModelViewSet):
         return Institution.objects.filter(filters).select_related('region')
 
 
-class SpeakerViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
+class SpeakerViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, StreamingListMixin, BulkMixin, ModelViewSet):
     serializer_class = serializers.SpeakerSerializer
     tournament_field = "team__tournament"
     access_preference = 'public_participants'
@@ -248,6 +273,9 @@ class SpeakerViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet)
     def perform_create(self, serializer):
         serializer.save()
 
+    def get_bulk_save_kwargs(self):
+        return {}
+
     def get_queryset(self):
         category_prefetch = Prefetch('categories', queryset=SpeakerCategory.objects.all().select_related('tournament'))
         if not self.request.user or not self.request.user.is_staff:
@@ -256,7 +284,7 @@ class SpeakerViewSet(TournamentAPIMixin, TournamentPublicAPIMixin, ModelViewSet)
         return super().get_queryset().prefetch_related(category_prefetch)
 
 
-class VenueViewSet(TournamentAPIMixin, PublicAPIMixin, ModelViewSet):
+class VenueViewSet(TournamentAPIMixin, PublicAPIMixin, BulkMixin, ModelViewSet):
     serializer_class = serializers.VenueSerializer
 
     def get_queryset(self):
@@ -276,6 +304,7 @@ class VenueCategoryViewSet(TournamentAPIMixin, PublicAPIMixin, ModelViewSet):
 
 class BaseCheckinsView(AdministratorAPIMixin, TournamentAPIMixin, APIView):
     name = "Check-ins"
+    conditional_get = False  # check-ins aren't covered by change versions
 
     lookup_field = 'pk'
     lookup_url_kwarg = None
@@ -387,8 +416,20 @@ class VenueCheckinsView(BaseCheckinsView):
 
 
 class BaseStandingsView(TournamentAPIMixin, TournamentPublicAPIMixin, GenericAPIView):
+    """Standings can be narrowed with these query parameters, which also make
+    them quicker to generate:
+
+    - `fields`: comma-separated fields of each item to include
+    - `metrics`: comma-separated metrics to include; extra (unranked) metrics
+      not listed aren't calculated at all
+    - `round`: sequence number of the round up to which to include results
+    - `category`: ID of the category to which to restrict the standings
+
+    Responses are cached until anything in the tournament changes."""
+
     lookup_field = 'slug'
     lookup_url_kwarg = 'tournament_slug'
+    category_field = 'categories'
 
     def get_metrics(self):
         pref_model = self.model.__name__.lower()
@@ -396,20 +437,81 @@ class BaseStandingsView(TournamentAPIMixin, TournamentPublicAPIMixin, GenericAPI
 
     def get_queryset(self):
         qs = self.model.objects.filter(**{self.tournament_field: self.tournament}).select_related(self.tournament_field)
-        category = self.request.query_params.get('category', None)
+        category = self.get_category_param()
         if category is not None:
-            return qs.filter(categories__pk=category)
+            return qs.filter(**{self.category_field: category})
         return qs
 
     def get_max_round(self):
         return None
 
+    def get_list_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    def get_category_param(self):
+        value = self.request.query_params.get('category')
+        if value is None:
+            return None
+        category_model = self.model._meta.get_field(self.category_field).related_model
+        try:
+            return category_model.objects.values_list('pk', flat=True).get(tournament=self.tournament, pk=int(value))
+        except (ValueError, category_model.DoesNotExist):
+            raise ValidationError({'category': "There is no category %s in this tournament." % value})
+
+    def get_round_param(self):
+        seq = self.request.query_params.get('round')
+        if seq is None:
+            return self.get_max_round()
+        try:
+            return self.tournament.round_set.get(seq=int(seq))
+        except (ValueError, Round.DoesNotExist):
+            raise ValidationError({'round': "There is no round %s in this tournament." % seq})
+
+    def get_cache_key(self, fields, metrics, category, round):
+        # Only validated parameters are used, so that invalid or equivalent
+        # query strings don't add cache entries
+        params = (type(self).__name__, self.tournament.id, self.request.build_absolute_uri('/'),
+                  category, round.seq if round is not None else None,
+                  sorted(fields or []), sorted(metrics or []))
+        return "api_standings_%s" % hashlib.md5(repr(params).encode()).hexdigest()
+
     def get(self, request, **kwargs):
+        fields = self.get_list_param('fields')
+        requested_metrics = self.get_list_param('metrics')
+        round = self.get_round_param()
+
+        key = self.get_cache_key(fields, requested_metrics, self.get_category_param(), round)
+        cached = cache.get(key)
+        if cached is not None and cached[0] == self.change_versions:
+            return Response(cached[1])
+
+        if fields is not None and not fields <= set(self.get_serializer_class()._declared_fields):
+            raise ValidationError({'fields': "Unrecognised fields: %s" % ", ".join(
+                sorted(fields - set(self.get_serializer_class()._declared_fields)))})
+
         metrics, extra_metrics = self.get_metrics()
+        if requested_metrics is not None:
+            unknown = requested_metrics - set(metrics) - set(extra_metrics)
+            if unknown:
+                raise ValidationError({'metrics': "Unrecognised metrics: %s" % ", ".join(sorted(unknown))})
+            extra_metrics = [metric for metric in extra_metrics if metric in requested_metrics]
+
         generator = self.generator(metrics, ('rank',), extra_metrics)
-        standings = generator.generate(self.get_queryset(), round=self.get_max_round())
-        serializer = self.get_serializer(iter(standings), many=True)
-        return Response(serializer.data)
+        standings = generator.generate(self.get_queryset(), round=round)
+
+        if requested_metrics is not None:
+            # precedence has repeated metrics numbered, e.g. "wbw1"
+            requested_metrics = {key for key, metric in zip(generator.precedence, metrics)
+                                 if metric in requested_metrics} | set(extra_metrics)
+
+        serializer = self.get_serializer(iter(standings), many=True, fields=fields, metrics=requested_metrics)
+        data = serializer.data
+        if self.change_versions is not None:
+            cache.set(key, (self.change_versions, data), settings.PUBLIC_VERSIONED_CACHE_TIMEOUT)
+        return Response(data)
 
 
 class SubstantiveSpeakerStandingsView(BaseStandingsView):
@@ -434,10 +536,11 @@ class TeamStandingsView(BaseStandingsView):
     serializer_class = serializers.TeamStandingsSerializer
     access_preference = 'team_tab_released'
     model = Team
+    category_field = 'break_categories'
     generator = TeamStandingsGenerator
 
 
-class PairingViewSet(RoundAPIMixin, ModelViewSet):
+class PairingViewSet(RoundAPIMixin, StreamingListMixin, ModelViewSet):
 
     class Permission(PublicPreferencePermission):
         def get_tournament_preference(self, view, op):
@@ -473,7 +576,7 @@ class PairingViewSet(RoundAPIMixin, ModelViewSet):
         )
 
 
-class BallotViewSet(RoundAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
+class BallotViewSet(RoundAPIMixin, TournamentPublicAPIMixin, StreamingListMixin, ModelViewSet):
     serializer_class = serializers.BallotSerializer
     access_preference = 'ballots_released'
 
@@ -510,6 +613,40 @@ class BallotViewSet(RoundAPIMixin, TournamentPublicAPIMixin, ModelViewSet):
             'participant_submitter__adjudicator__tournament')
 
 
+class RoundResultStatusView(RoundAPIMixin, AdministratorAPIMixin, APIView):
+    """The number of debates in the round with each result status."""
+    name = "Result Statuses"
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_result_status_stats(self.round))
+
+
+class BallotIngestView(TournamentAPIMixin, AdministratorAPIMixin, APIView):
+    """Saves a list of ballots, across any debates in the tournament, in one
+    request. See `results.ingest` for the format of each ballot. The response
+    has one item for each ballot, either the URL of the saved ballot or the
+    reason it wasn't saved; invalid ballots don't stop the others being saved."""
+    name = "Bulk Ballots"
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError("Expected a list of ballots")
+
+        ingester = BallotIngester(self.tournament, submitter=request.user, ip_address=get_ip_address(request))
+        response = []
+        for outcome in ingester.ingest(request.data):
+            if isinstance(outcome, BallotIngestError):
+                response.append({'error': str(outcome)})
+                continue
+            response.append({'url': reverse('api-ballot-detail', request=request, kwargs={
+                'tournament_slug': self.tournament.slug,
+                'round_seq': outcome.debate.round.seq,
+                'debate_pk': outcome.debate_id,
+                'pk': outcome.pk,
+            })})
+        return Response(response)
+
+
 class FeedbackQuestionViewSet(TournamentAPIMixin, PublicAPIMixin, ModelViewSet):
     serializer_class = serializers.FeedbackQuestionSerializer
 
@@ -522,7 +659,7 @@ class FeedbackQuestionViewSet(TournamentAPIMixin, PublicAPIMixin, ModelViewSet):
         return super().get_queryset().filter(filters)
 
 
-class FeedbackViewSet(TournamentAPIMixin, AdministratorAPIMixin, ModelViewSet):
+class FeedbackViewSet(TournamentAPIMixin, AdministratorAPIMixin, StreamingListMixin, ModelViewSet):
     serializer_class = serializers.FeedbackSerializer
     tournament_field = 'adjudicator__tournament'
 
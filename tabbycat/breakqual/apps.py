@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class BreakQualConfig(AppConfig):
     name = 'breakqual'
     verbose_name = _("Break Qualification")
+
+    def ready(self):
+        from . import signals  # noqa: F401
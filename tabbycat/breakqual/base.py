@@ -9,6 +9,7 @@ from django.utils.translation import gettext as _
 
 from breakqual.models import BreakingTeam
 from standings.teams import TeamStandingsGenerator
+from tournaments.versions import bump_versions
 
 logger = logging.getLogger(__name__)
 
@@ -106,9 +107,9 @@ class BaseBreakGenerator:
         this break category."""
 
         if self.category.is_general:
-            self.team_queryset = self.category.tournament.team_set.all()
+            self.team_queryset = self.category.tournament.team_set.select_related('tournament')
         else:
-            self.team_queryset = self.category.team_set.all()
+            self.team_queryset = self.category.team_set.select_related('tournament')
 
     def retrieve_standings(self):
         """Retrieves standings and places them in `self.standings`."""
@@ -139,29 +140,26 @@ class BaseBreakGenerator:
         institution cap. Such cases should be accounted for directly in the
         `compute_break()` method.
         """
-        existing_remark_teams = self.team_queryset.filter(
-            breakingteam__break_category=self.category,
-            breakingteam__remark__isnull=False,
-        ).exclude(breakingteam__remark__exact='')
-        different_break_teams = self.team_queryset.exclude(
-            breakingteam__remark=BreakingTeam.REMARK_INELIGIBLE,
-            breakingteam__break_category__priority__gt=self.category.priority,
-        ).filter(
-            breakingteam__break_category__priority__gt=self.category.priority,
-        )
-        ineligible_teams = self.team_queryset.exclude(break_categories=self.category)
+        existing_remark_teams = set(self.category.breakingteam_set.filter(
+            remark__isnull=False,
+        ).exclude(remark__exact='').values_list('team_id', flat=True))
+        different_break_teams = set(BreakingTeam.objects.filter(
+            break_category__tournament=self.category.tournament,
+            break_category__priority__gt=self.category.priority,
+        ).exclude(remark=BreakingTeam.REMARK_INELIGIBLE).values_list('team_id', flat=True))
+        eligible_teams = set(self.category.team_set.values_list('id', flat=True))
 
         self.excluded_teams = {}
         self.eligible_teams = []
 
         for tsi in self.standings:
-            if tsi.team in existing_remark_teams:
+            if tsi.team.id in existing_remark_teams:
                 logger.debug("Excluding %s because it has an existing remark", tsi.team)
                 self.excluded_teams[tsi] = None
-            elif tsi.team in ineligible_teams:
+            elif tsi.team.id not in eligible_teams:
                 logger.debug("Excluding %s because it is ineligible", tsi.team)
                 self.excluded_teams[tsi] = BreakingTeam.REMARK_INELIGIBLE
-            elif tsi.team in different_break_teams:
+            elif tsi.team.id in different_break_teams:
                 logger.debug("Excluding %s because it broke in a different break", tsi.team)
                 self.excluded_teams[tsi] = BreakingTeam.REMARK_DIFFERENT_BREAK
             else:
@@ -200,11 +198,16 @@ class BaseBreakGenerator:
         representing in `self.breaking_teams`, and those teams in
         `self.excluded_teams` that ranked ahead of the last breaking team."""
 
-        # We could bulk retrieve and create to reduce SQL queries, but this is a
-        # rare action and the code's much easier to read using
-        # update_or_create().
+        bts = {bt.team_id: bt for bt in self.category.breakingteam_set.all()}
+        bts_to_keep = set()
 
-        bts_to_keep = []
+        def add(team, **fields):
+            bt = bts.setdefault(team.id, BreakingTeam(break_category=self.category))
+            bt.team = team
+            for field, value in fields.items():
+                setattr(bt, field, value)
+            bts_to_keep.add(team.id)
+            return bt
 
         # first, breaking teams
         break_rank = 1
@@ -212,11 +215,7 @@ class BaseBreakGenerator:
         for rank, group in groupby(self.breaking_teams, key=lambda tsi: tsi.get_ranking("rank")):
             group = list(group)
             for tsi in group:
-                bt, _ = BreakingTeam.objects.update_or_create(
-                    break_category=self.category, team=tsi.team,
-                    defaults={'rank': rank, 'break_rank': break_rank, 'remark': None},
-                )
-                bts_to_keep.append(bt.id)
+                bt = add(tsi.team, rank=rank, break_rank=break_rank, remark=None)
                 logger.info("Breaking in %s (rank %s): %s", bt.break_rank, rank, bt.team)
             break_rank += len(group)
 
@@ -232,16 +231,18 @@ class BaseBreakGenerator:
         for tsi, remark in self.excluded_teams.items():
             rank = tsi.get_ranking("rank")
             if rank < self.hide_excluded_teams_from:
-                defaults = {'rank': tsi.get_ranking("rank"), 'break_rank': None}
+                fields = {'rank': rank, 'break_rank': None}
                 if remark is not None:
-                    defaults['remark'] = remark
-                bt, _ = BreakingTeam.objects.update_or_create(
-                    break_category=self.category, team=tsi.team, defaults=defaults)
-                bts_to_keep.append(bt.id)
+                    fields['remark'] = remark
+                bt = add(tsi.team, **fields)
                 logger.info("Excluded from break (%s, %s): %s", bt.rank, bt.get_remark_display(), bt.team)
 
-        # finally, delete stray BreakingTeam objects
-        self.category.breakingteam_set.exclude(id__in=bts_to_keep).delete()
+        # finally, delete stray BreakingTeam objects and write the rest in bulk
+        self.category.breakingteam_set.exclude(team_id__in=bts_to_keep).delete()
+        bts = [bts[team_id] for team_id in bts_to_keep]
+        BreakingTeam.objects.bulk_update([bt for bt in bts if bt.pk is not None], ['rank', 'break_rank', 'remark'])
+        BreakingTeam.objects.bulk_create([bt for bt in bts if bt.pk is None])
+        bump_versions(self.category.tournament_id)
 
 
 @register
@@ -120,3 +120,105 @@ def liveness_bp(is_general, current_round, break_size, total_teams, total_rounds
             dead = -1 # All are live if no team scores exist (i.e. Round 1)
 
     return safe, dead
+
+
+# ==============================================================================
+# Per-team liveness
+# ==============================================================================
+
+SAFE = 'safe'
+LIVE = 'live'
+DEAD = 'dead'
+
+
+def round_points(nteams, points_per_room):
+    """Returns a list of the points awarded to teams in a single round, in
+    descending order, if `nteams` teams are split into rooms that each award
+    `points_per_room` (e.g. `[1, 0]` for two-team formats or `[3, 2, 1, 0]`
+    for British Parliamentary). Teams left over (e.g. swings) get no points."""
+    nrooms, nleftover = divmod(nteams, len(points_per_room))
+    return sorted(list(points_per_room) * nrooms + [0] * nleftover, reverse=True)
+
+
+def team_liveness(points, eligible, break_size, rounds_remaining, points_per_room):
+    """Classifies each team in `eligible` as SAFE, LIVE or DEAD for a break of
+    size `break_size`, given the current points of every team in the tournament.
+
+    `points` is a dict mapping every team in the tournament (eligible or not)
+    to its current points. `eligible` is an iterable of the teams eligible for
+    the break category. `rounds_remaining` is the number of preliminary rounds
+    still to be scored.
+
+    Each remaining round is assumed to award exactly the points in
+    `round_points()`, but teams may be paired in any way. Under that model:
+
+     - A team is *safe* if it's impossible for `break_size` other eligible
+       teams to finish on or above its current points, even if it scores
+       nothing more. (Teams that finish level are taken to be ahead, since
+       the tiebreaks can't be predicted.)
+     - A team is *dead* if, even if it wins every remaining round, at least
+       `break_size` other eligible teams must finish strictly above it.
+     - Otherwise, it is *live*.
+
+    Both tests are conservative: they use necessary conditions on how the
+    remaining points can be distributed, so a team is only classified as safe
+    or dead when that's certain (under the model), and teams near the
+    boundaries may be classified as live when they're not."""
+
+    eligible = list(eligible)
+    if len(eligible) <= break_size:
+        return {team: SAFE for team in eligible}
+
+    values = round_points(len(points), points_per_room)
+    reach = rounds_remaining * values[0]  # most points a team can still gain
+
+    # For the safety test, the team takes the lowest points in each round;
+    # the most the best j other teams can gain in a round is lowest_prefix[j-1].
+    lowest_prefix = list(accumulate(values[:-1]))
+    # For the deadness test, the team takes the highest points in each round.
+    total_to_others = rounds_remaining * sum(values[1:])
+
+    eligible_points = sorted((points.get(team, 0) for team in eligible), reverse=True)
+    others_capacity_base = (len(points) - 1) * reach
+
+    result = {}
+    for team in eligible:
+        p = points.get(team, 0)
+
+        # Safety: can break_size other eligible teams all reach p?
+        # The teams most able to catch up are those with the most points.
+        rivals = eligible_points[:break_size + 1]
+        if p in rivals:
+            rivals.remove(p)  # the team itself
+        rivals = rivals[:break_size]
+        demands = [max(0, p - q) for q in reversed(rivals)]  # descending demands
+        catchable = len(rivals) == break_size and all(d <= reach for d in demands)
+        if catchable:
+            cumulative = 0
+            for j, demand in enumerate(demands):
+                cumulative += demand
+                if cumulative > rounds_remaining * lowest_prefix[j]:
+                    catchable = False
+                    break
+        if not catchable:
+            result[team] = SAFE
+            continue
+
+        # Deadness: with the team on maximum points, how few eligible teams
+        # can be kept strictly above it? Each other team can absorb up to
+        # `reach` points, except that an eligible team below the maximum
+        # overtakes it if it absorbs more than the difference.
+        best = p + reach
+        above = sum(1 for q in eligible_points if q > best)
+        releases = [q - p for q in eligible_points if p < q <= best]  # descending
+        deficit = total_to_others - (others_capacity_base - sum(releases))
+        forced = 0
+        for release in releases:
+            if deficit <= 0:
+                break
+            deficit -= release
+            forced += 1
+
+        result[team] = DEAD if above + forced >= break_size else LIVE
+
+    return result
@@ -0,0 +1,53 @@
+from django.core.management.base import CommandError
+
+from draw.generator import DrawUserError
+from utils.management.base import TournamentCommand
+
+from ...simulator import BreakSimulationError, BreakSimulator
+
+
+class Command(TournamentCommand):
+
+    help = "Estimates each team's probability of breaking in each break category, " \
+           "by simulating the remaining preliminary rounds many times."
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("-r", "--round", type=int, default=None,
+            help="Seq number of the first round to simulate (default: the current round)")
+        parser.add_argument("-n", "--iterations", type=int, default=10000,
+            help="Maximum number of simulations to run (default: %(default)s)")
+        parser.add_argument("-b", "--time-budget", type=float, default=30.0,
+            help="Maximum time in seconds to spend on simulations (default: %(default)s)")
+        parser.add_argument("-p", "--processes", type=int, default=None,
+            help="Number of worker processes to use (default: one per CPU)")
+        parser.add_argument("--seed", type=int, default=None,
+            help="Seed for the random number generator")
+
+    def handle_tournament(self, tournament, **options):
+        if options["round"] is not None:
+            try:
+                round = tournament.round_set.get(seq=options["round"])
+            except tournament.round_set.model.DoesNotExist:
+                raise CommandError("The tournament {!r} has no round with seq {:d}".format(
+                    tournament.slug, options["round"]))
+        else:
+            round = tournament.current_round
+
+        try:
+            simulator = BreakSimulator(tournament, round=round, iterations=options["iterations"],
+                time_budget=options["time_budget"], processes=options["processes"], seed=options["seed"])
+            probabilities = simulator.simulate()
+        except (BreakSimulationError, DrawUserError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write("Ran {:d} simulations from {}".format(simulator.nsimulations, round.name))
+
+        teams = {team.id: team for team in tournament.team_set.all()}
+        points = dict(zip(simulator.state['team_ids'], simulator.state['points']))
+        for category in tournament.breakcategory_set.all():
+            self.stdout.write(self.style.MIGRATE_HEADING("\n==== {} ====".format(category.name)))
+            probs = probabilities[category.id]
+            for team_id in sorted(probs, key=lambda t: (-probs[t], -points[t])):
+                self.stdout.write("{:>6.1%}  {:>4}  {}".format(probs[team_id], points[team_id],
+                                  teams[team_id].short_name))
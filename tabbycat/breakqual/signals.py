@@ -0,0 +1,39 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from participants.models import Team
+from results.models import BallotSubmission
+from tournaments.models import Round
+
+from .models import BreakCategory
+from .utils import invalidate_liveness
+
+
+@receiver(post_delete, sender=BallotSubmission)
+@receiver(post_save, sender=BallotSubmission)
+def clear_liveness_after_debate(sender, instance, **kwargs):
+    """Results in a round affect the liveness going into all later rounds."""
+    round_info = Round.objects.filter(debate__id=instance.debate_id).values_list('tournament_id', 'seq').first()
+    if round_info is None:
+        return
+    invalidate_liveness(*round_info)
+
+
+@receiver(post_delete, sender=BreakCategory)
+@receiver(post_save, sender=BreakCategory)
+@receiver(post_delete, sender=Round)
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Team)
+def clear_liveness_in_tournament(sender, instance, **kwargs):
+    """Liveness depends on the break categories, number of rounds and number of
+    teams in the tournament."""
+    if instance.tournament_id is not None:
+        invalidate_liveness(instance.tournament_id)
+
+
+@receiver(m2m_changed, sender=Team.break_categories.through)
+def clear_liveness_on_eligibility_change(sender, instance, action, **kwargs):
+    # instance is a Team or a BreakCategory, depending on the direction
+    if action.startswith('post_') and instance.tournament_id is not None:
+        invalidate_liveness(instance.tournament_id)
@@ -0,0 +1,336 @@
+"""Monte Carlo simulation of the break.
+
+The simulator estimates, for each break category, the probability that each
+team breaks, by repeatedly simulating the remaining preliminary rounds and
+computing the break that would result.
+
+Everything the simulation needs is loaded from the database once, by
+`BreakSimulator.__init__()`, into plain lists and dicts. The simulations
+themselves run in memory (in a pool of worker processes, if more than one is
+requested) and never touch the database, so they're cheap enough to run
+thousands of times.
+
+The simulation makes a few simplifications:
+
+ - Each room's result is drawn at random, weighting each team by its form to
+   date (its points so far relative to the maximum possible), so that stronger
+   teams tend to win more often.
+ - Draws for power-paired rounds are generated using the same draw generators
+   (and draw rules) as real rounds, except that pull-up restrictions are
+   ignored. Other rounds are drawn at random.
+ - Only the first metric in the team standings precedence is simulated. Teams
+   tied on that metric are ranked by their current values of the remaining
+   metrics, then at random.
+ - All break categories are treated as using the standard break rule.
+"""
+
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+
+from django.utils.translation import gettext as _
+
+from draw.generator import DrawGenerator
+from draw.models import DebateTeam
+from participants.utils import get_side_history
+from standings.metrics import metricgetter
+from standings.teams import TeamStandingsGenerator
+from tournaments.models import Round
+
+from .models import BreakCategory, BreakingTeam
+
+logger = logging.getLogger(__name__)
+
+DRAW_OPTIONS = {
+    'two': {
+        "avoid_institution"     : "draw_rules__avoid_same_institution",
+        "avoid_history"         : "draw_rules__avoid_team_history",
+        "history_penalty"       : "draw_rules__team_history_penalty",
+        "institution_penalty"   : "draw_rules__team_institution_penalty",
+        "side_allocations"      : "draw_rules__draw_side_allocations",
+        "avoid_conflicts"       : "draw_rules__draw_avoid_conflicts",
+        "odd_bracket"           : "draw_rules__draw_odd_bracket",
+        "pairing_method"        : "draw_rules__draw_pairing_method",
+    },
+    'bp': {
+        "pullup"                : "draw_rules__bp_pullup_distribution",
+        "position_cost"         : "draw_rules__bp_position_cost",
+        "assignment_method"     : "draw_rules__bp_assignment_method",
+        "renyi_order"           : "draw_rules__bp_renyi_order",
+        "exponent"              : "draw_rules__bp_position_cost_exponent",
+    },
+}
+
+
+class BreakSimulationError(RuntimeError):
+    pass
+
+
+class SimulatedTeam:
+    """Minimal implementation of the team interface expected by the draw
+    generators, for use in simulations."""
+
+    __slots__ = ('id', 'index', 'institution', 'points', 'side_history', 'history')
+
+    def __init__(self, id, index, institution, points, side_history, history):
+        self.id = id
+        self.index = index
+        self.institution = institution
+        self.points = points
+        self.side_history = side_history
+        self.history = history
+
+    def __repr__(self):
+        return "<SimulatedTeam {0} ({1})>".format(self.id, self.points)
+
+    def seen(self, other):
+        return self.history.get(other.id, 0)
+
+
+class BreakSimulator:
+    """Estimates the probability of each team breaking in each break category,
+    by simulating the preliminary rounds from `round` (by default, the current
+    round) onwards.
+
+    `time_budget` is the maximum wall-clock time, in seconds, that the
+    simulations may take (not counting the initial load), and `iterations` is
+    the maximum number of simulations to run. The simulations are split
+    between `processes` worker processes (by default, one per CPU); if this is
+    1, they run in the current process.
+    """
+
+    def __init__(self, tournament, round=None, iterations=10000, time_budget=30.0, processes=None, seed=None):
+        self.tournament = tournament
+        self.round = round or tournament.current_round
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.processes = processes or os.cpu_count() or 1
+        self.seed = seed
+        self.nsimulations = 0
+        self.state = self.load()
+
+    def load(self):
+        """Loads everything needed for the simulation from the database, and
+        returns it as a dict of plain (picklable) data."""
+
+        tournament = self.tournament
+        teams_in_debate = tournament.pref('teams_in_debate')
+        metrics = tournament.pref('team_standings_precedence')
+
+        if self.round.stage != Round.STAGE_PRELIMINARY:
+            raise BreakSimulationError(_("The break can only be simulated before the end of the preliminary rounds."))
+        if not metrics or metrics[0] not in ('points', 'wins'):
+            raise BreakSimulationError(_("The break can only be simulated if the first metric in the "
+                "team standings precedence is points or wins."))
+
+        if teams_in_debate == 'bp':
+            points_by_position = [3, 2, 1, 0] if metrics[0] == 'points' else [1, 0, 0, 0]
+        else:
+            points_by_position = [1, 0]
+
+        rounds = list(tournament.prelim_rounds().filter(seq__gte=self.round.seq).order_by('seq'))
+        prev = tournament.prelim_rounds(before=self.round).order_by('seq').last()
+        nprev = tournament.prelim_rounds(before=self.round).count()
+
+        generator = TeamStandingsGenerator(metrics, ('rank',))
+        standings = generator.generate(tournament.team_set.all(), round=prev)
+        infos = sorted(standings, key=lambda info: info.team.id)  # for reproducibility
+
+        # Rank teams by the metrics other than the first, which stay frozen
+        # at their current values during the simulation
+        tiebreak = metricgetter(metrics[1:], [standings.metric_ascending[key] for key in metrics[1:]])
+        by_tiebreak = sorted(infos, key=tiebreak, reverse=True)
+        secondary_rank = {}
+        for i, info in enumerate(by_tiebreak):
+            if i > 0 and tiebreak(info) == tiebreak(by_tiebreak[i-1]):
+                secondary_rank[info.team.id] = secondary_rank[by_tiebreak[i-1].team.id]
+            else:
+                secondary_rank[info.team.id] = i
+
+        teams = [info.team for info in infos]
+        team_ids = [team.id for team in teams]
+        index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+        history = [{} for team in teams]
+        if prev is not None:
+            debates = {}
+            for debate_id, team_id in DebateTeam.objects.filter(
+                    debate__round__tournament=tournament, debate__round__seq__lte=prev.seq,
+                    debate__round__stage=Round.STAGE_PRELIMINARY).values_list('debate_id', 'team_id'):
+                debates.setdefault(debate_id, []).append(team_id)
+            for debate_teams in debates.values():
+                for team_id in debate_teams:
+                    h = history[index[team_id]]
+                    for other_id in debate_teams:
+                        if other_id != team_id:
+                            h[other_id] = h.get(other_id, 0) + 1
+            side_history = get_side_history(teams, tournament.sides, prev.seq)
+        else:
+            side_history = {team_id: [0] * len(tournament.sides) for team_id in team_ids}
+
+        categories = []
+        eligible = {}
+        for category_id, team_id in BreakCategory.team_set.through.objects.filter(
+                breakcategory__tournament=tournament).values_list('breakcategory_id', 'team_id'):
+            eligible.setdefault(category_id, set()).add(team_id)
+        excluded = {}  # teams who can't break regardless of results
+        for category_id, team_id in BreakingTeam.objects.filter(
+                break_category__tournament=tournament,
+                remark__in=[BreakingTeam.REMARK_DISQUALIFIED, BreakingTeam.REMARK_WITHDRAWN]).values_list(
+                'break_category_id', 'team_id'):
+            excluded.setdefault(category_id, set()).add(team_id)
+        for category in tournament.breakcategory_set.order_by('-priority', 'seq'):
+            if category.rule != 'standard':
+                logger.info("Simulating %s as if it used the standard break rule", category.name)
+            categories.append({
+                'id': category.id,
+                'priority': category.priority,
+                'break_size': category.break_size,
+                'eligible': eligible.get(category.id, set()),
+                'excluded': excluded.get(category.id, set()),
+            })
+
+        options = {key: tournament.preferences[pref] for key, pref in DRAW_OPTIONS[teams_in_debate].items()}
+        if options.get("side_allocations") in ("manual-ballot", "preallocated"):
+            options["side_allocations"] = "balance"
+
+        points = [next(info.itermetrics(), 0) or 0 for info in infos]
+        max_points = nprev * points_by_position[0]
+
+        return {
+            'teams_in_debate': teams_in_debate,
+            'team_ids': team_ids,
+            'institutions': [team.institution_id for team in teams],
+            'points': points,
+            'strengths': [(p + 1) / (max_points - p + 1) for p in points],
+            'secondary_rank': [secondary_rank[team_id] for team_id in team_ids],
+            'side_history': [side_history[team_id] for team_id in team_ids],
+            'history': history,
+            'points_by_position': points_by_position,
+            'draw_types': ['power_paired' if r.draw_type == Round.DRAW_POWERPAIRED else 'random' for r in rounds],
+            'options': options,
+            'categories': categories,
+        }
+
+    def simulate(self):
+        """Runs the simulations and returns a dict mapping each break category
+        ID to a dict mapping each eligible team's ID to its estimated
+        probability of breaking in that category."""
+
+        deadline = time() + self.time_budget
+        seed = self.seed if self.seed is not None else random.SystemRandom().randrange(2**32)
+        nprocesses = max(min(self.processes, self.iterations), 1)
+        quotas = [self.iterations // nprocesses + (i < self.iterations % nprocesses) for i in range(nprocesses)]
+
+        if nprocesses == 1:
+            state = random.getstate()
+            results = [run_simulations(self.state, quotas[0], deadline, seed)]
+            random.setstate(state)
+        else:
+            with ProcessPoolExecutor(max_workers=nprocesses) as executor:
+                futures = [executor.submit(run_simulations, self.state, quota, deadline, seed + i)
+                           for i, quota in enumerate(quotas)]
+                results = [future.result() for future in futures]
+
+        self.nsimulations = sum(n for n, counts in results)
+        logger.info("Ran %d break simulations in %d processes", self.nsimulations, nprocesses)
+
+        probabilities = {}
+        for category in self.state['categories']:
+            probabilities[category['id']] = {team_id: sum(counts[category['id']].get(team_id, 0)
+                    for n, counts in results) / max(self.nsimulations, 1)
+                for team_id in category['eligible']}
+        return probabilities
+
+
+def run_simulations(state, iterations, deadline, seed):
+    """Runs up to `iterations` simulations, stopping early if the time
+    `deadline` (a `time.time()` value) passes, and returns a tuple
+    `(n, counts)`, where `n` is the number of simulations run and `counts`
+    maps each break category ID to a dict mapping team IDs to the number of
+    simulations in which that team broke in that category.
+
+    This is a module-level function so that it can be run in worker processes.
+    The draw generators use the `random` module, so this seeds it."""
+
+    random.seed(seed)
+    counts = {category['id']: {} for category in state['categories']}
+    n = 0
+    while n < iterations and time() < deadline:
+        for category_id, team_ids in simulate_break(state).items():
+            category_counts = counts[category_id]
+            for team_id in team_ids:
+                category_counts[team_id] = category_counts.get(team_id, 0) + 1
+        n += 1
+    return n, counts
+
+
+def simulate_results(state, teams, pairings):
+    """Draws a result for each pairing at random, and updates the points, side
+    history and team history of `teams` accordingly. In each room, the teams
+    are ranked by sampling without replacement, with probabilities
+    proportional to their strengths."""
+
+    strengths = state['strengths']
+    points_by_position = state['points_by_position']
+
+    for pairing in pairings:
+        for side, team in enumerate(pairing.teams):
+            team.side_history[side] += 1
+            for other in pairing.teams:
+                if other is not team:
+                    team.history[other.id] = team.history.get(other.id, 0) + 1
+
+        remaining = list(pairing.teams)
+        for points in points_by_position:
+            weights = [strengths[team.index] for team in remaining]
+            team = random.choices(remaining, weights)[0]
+            team.points += points
+            remaining.remove(team)
+
+
+def rank_teams(state, teams):
+    """Returns `teams` sorted by their simulated points, then the remaining
+    metrics, then at random."""
+    secondary_rank = state['secondary_rank']
+    keys = {team: (-team.points, secondary_rank[team.index], random.random()) for team in teams}
+    return sorted(teams, key=keys.__getitem__)
+
+
+def simulate_break(state):
+    """Simulates the remaining preliminary rounds once, and returns a dict
+    mapping each break category ID to a list of the IDs of teams that broke in
+    that category."""
+
+    teams = [SimulatedTeam(team_id, i, institution, points, list(sides), dict(history))
+             for i, (team_id, institution, points, sides, history) in enumerate(zip(
+                 state['team_ids'], state['institutions'], state['points'],
+                 state['side_history'], state['history']))]
+
+    for draw_type in state['draw_types']:
+        ranked = rank_teams(state, teams)
+        options = state['options'] if draw_type == 'power_paired' else {}
+        drawer = DrawGenerator(state['teams_in_debate'], draw_type, ranked, **options)
+        simulate_results(state, teams, drawer.generate())
+
+    ranked = rank_teams(state, teams)
+
+    # As in the standard break generator, a team that breaks in a category
+    # can't break in a category of lower priority
+    broken = {}  # team ID: priority of category it broke in
+    breaks = {}
+    for category in state['categories']:
+        eligible, excluded = category['eligible'], category['excluded']
+        breaking = []
+        for team in ranked:
+            if len(breaking) >= category['break_size']:
+                break
+            if team.id in eligible and team.id not in excluded and broken.get(team.id, category['priority']) <= category['priority']:
+                breaking.append(team.id)
+        for team_id in breaking:
+            broken.setdefault(team_id, category['priority'])
+        breaks[category['id']] = breaking
+
+    return breaks
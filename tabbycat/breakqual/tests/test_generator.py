@@ -0,0 +1,85 @@
+from django.test import TestCase
+
+from breakqual.generator import BreakGenerator
+from breakqual.models import BreakCategory, BreakingTeam
+from tournaments.models import Tournament
+
+
+class TestBreakGenerator(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.tournament.preferences['standings__team_standings_precedence'] = ['wins', 'speaks_avg']
+        self.categories = list(self.tournament.breakcategory_set.order_by('-priority'))
+        BreakingTeam.objects.all().delete()  # the fixture has a stale break
+
+    def generate_all(self):
+        for category in self.categories:
+            BreakGenerator(category).generate()
+
+    def breaking_teams(self, category):
+        return set(category.breakingteam_set_competing.values_list('team_id', flat=True))
+
+    def assertValidBreak(self):  # noqa: N802
+        broken = {}
+        for category in self.categories:
+            breaking = self.breaking_teams(category)
+            self.assertLessEqual(breaking, set(category.team_set.values_list('id', flat=True)))
+            if category.team_set.count() >= category.break_size * 2:
+                self.assertGreaterEqual(len(breaking), category.break_size)
+            for team_id in breaking:
+                self.assertEqual(broken.setdefault(team_id, category.priority), category.priority)
+
+    def test_rules(self):
+        for rule, _ in BreakCategory.BREAK_QUALIFICATION_CHOICES:
+            with self.subTest(rule=rule):
+                BreakingTeam.objects.all().delete()
+                for category in self.categories:
+                    category.rule = rule
+                    category.save()
+                self.generate_all()
+                self.assertValidBreak()
+
+    def test_institution_cap(self):
+        category = self.categories[-1]  # open
+        category.rule = 'aida-1996'
+        generator = BreakGenerator(category)
+        generator.institution_cap = 1
+        generator.generate()
+        institutions = list(category.breakingteam_set_competing.values_list('team__institution_id', flat=True))
+        self.assertEqual(len(institutions), len(set(institutions)))
+        self.assertTrue(category.breakingteam_set.filter(remark=BreakingTeam.REMARK_CAPPED).exists())
+
+    def test_preserves_remarks(self):
+        self.generate_all()
+        category = self.categories[0]
+        bt = category.breakingteam_set_competing.order_by('rank').first()
+        bt.remark = BreakingTeam.REMARK_WITHDRAWN
+        bt.save()
+
+        self.generate_all()
+        bt.refresh_from_db()
+        self.assertEqual(bt.remark, BreakingTeam.REMARK_WITHDRAWN)
+        self.assertIsNone(bt.break_rank)
+        self.assertNotIn(bt.team_id, self.breaking_teams(category))
+        self.assertValidBreak()
+
+        # Clearing the remark should put the team back in the break
+        bt.remark = ''
+        bt.save()
+        self.generate_all()
+        self.assertIn(bt.team_id, self.breaking_teams(category))
+
+    def test_populate_database_queries(self):
+        self.generate_all()
+        category = self.categories[-1]
+        generator = BreakGenerator(category)
+        generator.set_team_queryset()
+        generator.retrieve_standings()
+        generator.filter_eligible_teams()
+        generator.compute_break()
+        # select existing, delete stray, bulk update (no new teams to create)
+        with self.assertNumQueries(3):
+            generator.populate_database()
@@ -1,6 +1,13 @@
+import random
+from itertools import permutations, product
+
+from django.core.cache import cache
 from django.test import TestCase
 
-from ..liveness import get_bp_coefficients, liveness_bp, liveness_twoteam
+from breakqual.utils import calculate_liveness, get_liveness, liveness_cache_key
+from tournaments.models import Tournament
+
+from ..liveness import DEAD, get_bp_coefficients, liveness_bp, liveness_twoteam, round_points, SAFE, team_liveness
 
 
 class TestLiveness(TestCase):
@@ -237,3 +244,83 @@ class TestLiveness(TestCase):
                 safe, dead = liveness_bp(False, rd, 8, 314, 9, scores)
                 self.assertGreaterEqual(safe, upper)
                 self.assertLessEqual(dead, lower)
+
+
+class TestTeamLiveness(TestCase):
+    """Checks team_liveness() against every possible outcome of the remaining
+    rounds, for small random tournaments."""
+
+    def check_sound(self, points, eligible, break_size, rounds_remaining, points_per_room):
+        result = team_liveness(points, eligible, break_size, rounds_remaining, points_per_room)
+        self.assertEqual(set(result.keys()), set(eligible))
+        outcomes = set(permutations(round_points(len(points), points_per_room)))
+        teams = list(points.keys())
+        for scenario in product(outcomes, repeat=rounds_remaining):
+            final = {team: points[team] + sum(outcome[i] for outcome in scenario) for i, team in enumerate(teams)}
+            for team, status in result.items():
+                others = [final[other] for other in eligible if other != team]
+                if status == SAFE:
+                    self.assertLess(sum(1 for x in others if x >= final[team]), break_size)
+                elif status == DEAD:
+                    self.assertGreaterEqual(sum(1 for x in others if x > final[team]), break_size)
+
+    def test_sound(self):
+        rng = random.Random(0)
+        for i in range(100):
+            points_per_room = rng.choice([[1, 0], [3, 2, 1, 0]])
+            nteams = rng.choice([len(points_per_room), 6])
+            points = {team: rng.randrange(3 * len(points_per_room)) for team in range(nteams)}
+            eligible = [team for team in points if rng.random() < 0.8]
+            break_size = rng.randrange(1, max(2, len(eligible)))
+            rounds_remaining = rng.randrange(3)
+            with self.subTest(points=points, eligible=eligible, break_size=break_size,
+                              rounds_remaining=rounds_remaining, points_per_room=points_per_room):
+                self.check_sound(points, eligible, break_size, rounds_remaining, points_per_room)
+
+    def test_no_rounds_remaining(self):
+        points = {1: 3, 2: 2, 3: 2, 4: 0}
+        self.assertEqual(team_liveness(points, points.keys(), 2, 0, [1, 0]),
+                         {1: 'safe', 2: 'live', 3: 'live', 4: 'dead'})
+
+    def test_small_break_category(self):
+        points = {1: 0, 2: 0, 3: 5}
+        self.assertEqual(team_liveness(points, [1, 2], 2, 3, [1, 0]), {1: 'safe', 2: 'safe'})
+
+
+class TestLivenessCache(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+        self.key = liveness_cache_key(self.round.id)
+
+    def test_all_eligible_teams_classified(self):
+        liveness = get_liveness(self.round)
+        for category in self.tournament.breakcategory_set.all():
+            self.assertEqual(set(liveness[category.id].keys()),
+                             set(category.team_set.values_list('id', flat=True)))
+        self.assertEqual(cache.get(self.key), liveness)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_liveness(self.round), liveness)
+
+    def test_invalidated_by_earlier_ballot(self):
+        get_liveness(self.round)
+        ballotsub = self.round.prev.debate_set.first().ballotsubmission_set.get(confirmed=True)
+        ballotsub.confirmed = False
+        ballotsub.save()
+        self.assertIsNone(cache.get(self.key))
+        self.assertEqual(get_liveness(self.round), calculate_liveness(self.round))
+
+    def test_not_invalidated_by_later_ballot(self):
+        get_liveness(self.round)
+        self.round.debate_set.first().ballotsubmission_set.get(confirmed=True).save()
+        self.assertIsNotNone(cache.get(self.key))
+
+    def test_invalidated_by_eligibility(self):
+        get_liveness(self.round)
+        category = self.tournament.breakcategory_set.first()
+        category.team_set.remove(category.team_set.first())
+        self.assertIsNone(cache.get(self.key))
@@ -0,0 +1,58 @@
+from time import monotonic
+
+from django.test import TestCase
+
+from breakqual.liveness import DEAD, SAFE
+from breakqual.simulator import BreakSimulator, run_simulations
+from breakqual.utils import calculate_liveness
+from tournaments.models import Tournament
+
+
+class TestBreakSimulator(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=3)
+
+    def test_probabilities(self):
+        simulator = BreakSimulator(self.tournament, round=self.round, iterations=200, processes=1, seed=0)
+        with self.assertNumQueries(0):
+            probabilities = simulator.simulate()
+        self.assertEqual(simulator.nsimulations, 200)
+
+        liveness = calculate_liveness(self.round)
+        for category in self.tournament.breakcategory_set.all():
+            with self.subTest(category=category):
+                probs = probabilities[category.id]
+                self.assertEqual(set(probs), set(category.team_set.values_list('id', flat=True)))
+                for team_id, prob in probs.items():
+                    self.assertGreaterEqual(prob, 0.0)
+                    self.assertLessEqual(prob, 1.0)
+                    if liveness[category.id][team_id] == DEAD:
+                        self.assertEqual(prob, 0.0)
+                    elif liveness[category.id][team_id] == SAFE and category.priority == max(
+                            self.tournament.breakcategory_set.values_list('priority', flat=True)):
+                        self.assertEqual(prob, 1.0)
+
+                # Every simulation fills the break, if there are enough eligible teams
+                expected = min(category.break_size, len(probs))
+                self.assertLessEqual(sum(probs.values()), expected + 1e-9)
+
+    def test_deterministic_with_seed(self):
+        first = BreakSimulator(self.tournament, round=self.round, iterations=20, processes=1, seed=42).simulate()
+        second = BreakSimulator(self.tournament, round=self.round, iterations=20, processes=1, seed=42).simulate()
+        self.assertEqual(first, second)
+
+    def test_process_pool(self):
+        simulator = BreakSimulator(self.tournament, round=self.round, iterations=40, processes=2, seed=0)
+        simulator.simulate()
+        self.assertEqual(simulator.nsimulations, 40)
+
+    def test_respects_time_budget(self):
+        simulator = BreakSimulator(self.tournament, round=self.round, processes=1, seed=0)
+        start = monotonic()
+        n, counts = run_simulations(simulator.state, 10**9, 0.0, 0)
+        self.assertLess(monotonic() - start, 5.0)
+        self.assertEqual(n, 0)
@@ -1,13 +1,16 @@
 import itertools
 import logging
 
+from django.core.cache import cache
 from django.db.models import Count, Max, Q, Sum
 from django.utils.translation import gettext_lazy as _
 
+from results.models import TeamScore
 from standings.teams import TeamStandingsGenerator
 from tournaments.models import Round
 
-from .liveness import liveness_bp, liveness_twoteam
+from .liveness import DEAD, LIVE, liveness_bp, liveness_twoteam, SAFE, team_liveness
+from .models import BreakCategory
 
 logger = logging.getLogger(__name__)
 
@@ -52,32 +55,74 @@ def breakcategories_with_counts(tournament):
     return categories
 
 
-def liveness(self, team, teams_count, prelims, current_round):
-    live_info = {'text': team.wins_count, 'tooltip': ''}
-
-    # The actual calculation should be shifed to be a cached method on
-    # the relevant break category
-    highest_liveness = 3
-    for bc in team.break_categories.all():
-        import random
-        status = random.choice([1, 2, 3])
-        highest_liveness = 3
-        if status == 1:
-            live_info['tooltip'] += 'Definitely in for the %s break<br>test' % bc.name
-            if highest_liveness != 2:
-                highest_liveness = 1  # Live not ins are the most important highlight
-        elif status == 2:
-            live_info['tooltip'] += 'Still live for the %s break<br>test' % bc.name
-            highest_liveness = 2
-        elif status == 3:
-            live_info['tooltip'] += 'Cannot break in %s break<br>test' % bc.name
-
-    if highest_liveness == 1:
-        live_info['class'] = 'bg-success'
-    elif highest_liveness == 2:
-        live_info['class'] = 'bg-warning'
-
-    return live_info
+def liveness_cache_key(round_id):
+    return "round_%d_liveness" % round_id
+
+
+def calculate_liveness(round):
+    """Returns a dict mapping each break category ID to a dict mapping the ID
+    of each team eligible for that category to its liveness (`liveness.SAFE`,
+    `liveness.LIVE` or `liveness.DEAD`) going into `round`, based on the
+    points of every team from confirmed results in preliminary rounds before
+    `round`. This uses a fixed number of queries; see `get_liveness()` for a
+    cached version."""
+
+    tournament = round.tournament
+    points = dict.fromkeys(tournament.team_set.values_list('id', flat=True), 0)
+    points.update(TeamScore.objects.filter(
+        ballot_submission__confirmed=True,
+        debate_team__debate__round__tournament=tournament,
+        debate_team__debate__round__stage=Round.STAGE_PRELIMINARY,
+        debate_team__debate__round__seq__lt=round.seq,
+        points__isnull=False,
+    ).values('debate_team__team_id').annotate(total=Sum('points')).values_list('debate_team__team_id', 'total'))
+
+    rounds_remaining = tournament.prelim_rounds().filter(seq__gte=round.seq).count()
+    points_per_room = [3, 2, 1, 0] if tournament.pref('teams_in_debate') == 'bp' else [1, 0]
+
+    eligible = {}
+    for category_id, team_id in BreakCategory.team_set.through.objects.filter(
+            breakcategory__tournament=tournament).values_list('breakcategory_id', 'team_id'):
+        eligible.setdefault(category_id, []).append(team_id)
+
+    result = {}
+    for category_id, break_size in tournament.breakcategory_set.values_list('id', 'break_size'):
+        result[category_id] = team_liveness(points, eligible.get(category_id, []), break_size,
+                                            rounds_remaining, points_per_room)
+    return result
+
+
+def get_liveness(round):
+    """Cached version of `calculate_liveness()`. The cache is cleared by
+    signals in breakqual/signals.py when anything it depends on changes."""
+    key = liveness_cache_key(round.id)
+    liveness = cache.get(key)
+    if liveness is None:
+        liveness = calculate_liveness(round)
+        cache.set(key, liveness, None)
+        logger.debug("Calculated liveness for %s", round.name)
+    return liveness
+
+
+def overall_liveness(liveness, team_id):
+    """Returns the liveness of a team across all break categories, given
+    `liveness` as returned by `get_liveness()`. A team is safe if it's safe in
+    any category, otherwise live if it's live in any category, otherwise dead
+    (including if it isn't eligible for any category)."""
+    statuses = {category[team_id] for category in liveness.values() if team_id in category}
+    for status in (SAFE, LIVE):
+        if status in statuses:
+            return status
+    return DEAD
+
+
+def invalidate_liveness(tournament_id, after_seq=None):
+    """Clears cached liveness for rounds in the given tournament, or only for
+    rounds after `after_seq` if it is given."""
+    rounds = Round.objects.filter(tournament_id=tournament_id)
+    if after_seq is not None:
+        rounds = rounds.filter(seq__gt=after_seq)
+    cache.delete_many([liveness_cache_key(round_id) for round_id in rounds.values_list('id', flat=True)])
 
 
 def determine_liveness(thresholds, points):
@@ -14,6 +14,7 @@ from actionlog.models import ActionLogEntry
 from participants.models import Team
 from participants.views import EditSpeakerCategoriesView, UpdateEligibilityEditView as BaseUpdateEligibilityEditView
 from tournaments.mixins import PublicTournamentPageMixin, SingleObjectFromTournamentMixin, TournamentMixin
+from tournaments.models import Round
 from utils.misc import reverse_tournament
 from utils.mixins import AdministratorMixin
 from utils.tables import TabbycatTableBuilder
@@ -22,9 +23,10 @@ from utils.views import PostOnlyRedirectView, VueTableTemplateView
 from . import forms
 from .base import BreakGeneratorError
 from .generator import BreakGenerator
+from .liveness import DEAD, LIVE, SAFE
 from .models import BreakCategory, BreakingTeam
 from .serializers import BreakCategorySerializer
-from .utils import auto_make_break_rounds, breakcategories_with_counts, get_breaking_teams
+from .utils import auto_make_break_rounds, breakcategories_with_counts, get_breaking_teams, get_liveness
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,14 @@ class AdminBreakIndexView(AdministratorMixin, TournamentMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         tournament = self.tournament
-        kwargs['categories'] = breakcategories_with_counts(tournament)
+        categories = breakcategories_with_counts(tournament)
+        current_round = tournament.current_round
+        if current_round is not None and current_round.stage == Round.STAGE_PRELIMINARY:
+            liveness = get_liveness(current_round)
+            for category in categories:
+                statuses = list(liveness.get(category.id, {}).values())
+                category.liveness = {status: statuses.count(status) for status in (SAFE, LIVE, DEAD)}
+        kwargs['categories'] = categories
         kwargs['no_teams_eligible'] = not BreakCategory.team_set.through.objects.filter(breakcategory__tournament=tournament).exists()
         kwargs['break_not_generated'] = not BreakingTeam.objects.filter(break_category__tournament=tournament).exists()
         return super().get_context_data(**kwargs)
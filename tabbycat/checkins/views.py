@@ -113,6 +113,7 @@ class AssistantCheckInPeopleStatusView(AssistantMixin, CheckInPeopleStatusView):
 class PublicCheckInPeopleStatusView(PublicTournamentPageMixin, CheckInPeopleStatusView):
     for_admin = False
     public_page_preference = 'public_checkins'
+    cache_versioned = False  # check-ins don't change versions
 
 
 class CheckInVenuesStatusView(BaseCheckInStatusView):
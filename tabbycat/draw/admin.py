@@ -3,6 +3,8 @@ from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy, ngettext
 
 from adjallocation.models import DebateAdjudicator
+from results.utils import refresh_result_status_counts
+from tournaments.versions import bump_versions
 from utils.admin import TabbycatModelAdminFieldsMixin
 
 from .models import Debate, DebateTeam
@@ -63,7 +65,11 @@ class DebateAdmin(admin.ModelAdmin):
 
         def _make_set_result_status(value, verbose_name): # noqa: N805
             def _set_result_status(modeladmin, request, queryset):
+                rounds = set(queryset.values_list('round__tournament_id', 'round_id'))
                 count = queryset.update(result_status=value)
+                for tournament_id, round_id in rounds:
+                    refresh_result_status_counts(round_id)
+                    bump_versions(tournament_id, round_id)
                 message = ngettext("%(count)d debate had its status set to %(status)s.",
                     "%(count)d debates had their statuses set to %(status)s.", count) % {
                         'count': count, 'status': verbose_name}
@@ -78,8 +84,15 @@ class DebateAdmin(admin.ModelAdmin):
         actions.append(_make_set_result_status(value, verbose_name))
     del value, verbose_name  # for fail-fast
 
+    def bump_round_versions(self, rounds):
+        # update() doesn't send the signals that would normally do this
+        for tournament_id, round_id in rounds:
+            bump_versions(tournament_id, round_id)
+
     def mark_as_sides_confirmed(self, request, queryset):
+        rounds = set(queryset.values_list('round__tournament_id', 'round_id'))
         updated = queryset.update(sides_confirmed=True)
+        self.bump_round_versions(rounds)
         message = ngettext(
             "%(count)d debate was marked as having its sides confirmed.",
             "%(count)d debates were marked as having their sides confirmed.",
@@ -88,7 +101,9 @@ class DebateAdmin(admin.ModelAdmin):
         self.message_user(request, message)
 
     def mark_as_sides_not_confirmed(self, request, queryset):
+        rounds = set(queryset.values_list('round__tournament_id', 'round_id'))
         updated = queryset.update(sides_confirmed=False)
+        self.bump_round_versions(rounds)
         message = ngettext(
             "%(count)d debate was marked as having its sides not confirmed.",
             "%(count)d debates were marked as having their sides not confirmed.",
@@ -6,6 +6,7 @@ from channels.generic.websocket import JsonWebsocketConsumer
 from channels.layers import get_channel_layer
 
 from actionlog.models import ActionLogEntry
+from adjallocation.preformed.anticipated import invalidate_anticipated_draws
 from adjallocation.serializers import SimpleDebateAllocationSerializer, SimpleDebateImportanceSerializer
 from tournaments.mixins import RoundWebsocketMixin
 from utils.mixins import SuperuserRequiredWebsocketMixin
@@ -169,6 +170,7 @@ class DebateEditConsumer(BaseAdjudicatorContainerConsumer):
         for debate in debates:
             sent_teams = changes[debate.id]['teams']
             self.modify_debate_teams(debate, sent_teams)
+        invalidate_anticipated_draws(self.tournament.id, after_seq=self.round.seq)
 
         debates = self.get_debates_or_panels(changes)
         serialized = self.teams_serializer(debates, many=True,
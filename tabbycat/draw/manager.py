@@ -3,10 +3,13 @@ import random
 
 from django.utils.translation import gettext as _
 
+from adjallocation.preformed.anticipated import invalidate_anticipated_draws
 from draw.generator.powerpair import PowerPairedDrawGenerator
 from participants.utils import get_side_history
+from results.utils import refresh_result_status_counts
 from standings.teams import TeamStandingsGenerator
 from tournaments.models import Round
+from tournaments.versions import bump_versions
 
 from .generator import BPEliminationResultPairing, DrawGenerator, DrawUserError, ResultPairing
 from .generator.utils import ispow2
@@ -114,6 +117,7 @@ class BaseDrawManager:
             debates[pairing] = debate
 
         Debate.objects.bulk_create(debates.values())
+        refresh_result_status_counts(self.round.id)
         logger.debug("Created %d debates", len(debates))
 
         for pairing, debate in debates.items():
@@ -123,9 +127,12 @@ class BaseDrawManager:
 
         DebateTeam.objects.bulk_create(debateteams)
         logger.debug("Created %d debate teams", len(debateteams))
+        bump_versions(self.round.tournament_id, self.round.id)
+        invalidate_anticipated_draws(self.round.tournament_id, after_seq=self.round.seq)
 
     def delete(self):
         self.round.debate_set.all().delete()
+        invalidate_anticipated_draws(self.round.tournament_id, after_seq=self.round.seq)
 
     def create(self):
         """Generates a draw and populates the database with it."""
@@ -169,6 +169,7 @@ class PublicDrawMixin(PublicTournamentPageMixin):
     """Governs permissions, particularly those relating to draw release."""
 
     empty_table_title = gettext_lazy("The draw for this round hasn't been released.")
+    cache_tables = True
 
     @cached_property
     def draws_available(self):
@@ -793,13 +794,13 @@ class BaseSideAllocationsView(TournamentMixin, VueTableTemplateView):
     page_title = gettext_lazy("Side Pre-Allocations")
 
     def get_table(self):
-        teams = self.tournament.team_set.all()
+        teams = self.tournament.team_set.prefetch_related('speaker_set')
         rounds = self.tournament.prelim_rounds()
 
         tsas = dict()
-        for tsa in TeamSideAllocation.objects.filter(round__in=rounds):
+        for tsa in TeamSideAllocation.objects.filter(round__in=rounds).select_related('round'):
             try:
-                tsas[(tsa.team.id, tsa.round.seq)] = get_side_name(self.tournament, tsa.side, 'abbr')
+                tsas[(tsa.team_id, tsa.round.seq)] = get_side_name(self.tournament, tsa.side, 'abbr')
             except ValueError:
                 pass
 
@@ -828,7 +829,7 @@ class EditDebateTeamsView(DebateDragAndDropMixin, AdministratorMixin, TemplateVi
 
     def get_serialised_allocatable_items(self):
         # TODO: account for shared teams
-        teams = Team.objects.filter(tournament=self.tournament).prefetch_related('speaker_set')
+        teams = Team.objects.filter(tournament=self.tournament).prefetch_related('speaker_set', 'break_categories')
         teams = annotate_availability(teams, self.round)
         populate_win_counts(teams)
         serialized_teams = EditDebateTeamsTeamSerializer(teams, many=True)
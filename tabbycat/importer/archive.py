@@ -52,21 +52,18 @@ class Exporter:
         return self.root
 
     def add_rounds(self):
-        results_prefetch = Prefetch('ballotsubmission_set', queryset=BallotSubmission.objects.filter(confirmed=True).prefetch_related(
-            'speakerscore_set', 'speakerscorebyadj_set', 'teamscore_set'))
         veto_prefetch = Prefetch('debateteammotionpreference_set', queryset=DebateTeamMotionPreference.objects.filter(
             preference=3, ballot_submission__confirmed=True,
         ))
         dt_prefetch = Prefetch('debateteam_set', queryset=DebateTeam.objects.all().select_related(
             'team', 'team__institution',
         ).prefetch_related(veto_prefetch))
-        debate_prefetch = Prefetch('debate_set', queryset=Debate.objects.all().prefetch_related(
-            'debateadjudicator_set', dt_prefetch, results_prefetch,
-        ))
 
-        for round in self.t.round_set.all().prefetch_related(debate_prefetch, 'motion_set').order_by('seq'):
-            populate_confirmed_ballots(round.debate_set.all(), motions=True, results=True)
-            populate_wins(round.debate_set.all())
+        # Load one round at a time, so that only one round's results are in memory at once
+        for round in self.t.round_set.all().prefetch_related('motion_set').order_by('seq'):
+            debates = round.debate_set.all().prefetch_related('debateadjudicator_set', dt_prefetch)
+            populate_confirmed_ballots(debates, motions=True, results=True)
+            populate_wins(debates)
 
             round_tag = SubElement(self.root, 'round', {
                 'name': round.name,
@@ -83,7 +80,7 @@ class Exporter:
 
             motion = round.motion_set.first()
 
-            for debate in round.debate_set.all():
+            for debate in debates:
                 self.add_debates(round_tag, motion, debate)
 
     def add_debates(self, round_tag, motion, debate):
@@ -110,7 +107,7 @@ class Exporter:
             debate_tag.set('motion', MOTION_PREFIX + str(motion.id))
 
         if debate.confirmed_ballot is not None:
-            result = DebateResult(debate.confirmed_ballot, tournament=self.t)
+            result = debate.confirmed_ballot.result
 
             for side in self.t.sides:
                 side_tag = SubElement(debate_tag, 'side', {
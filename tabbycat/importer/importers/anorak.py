@@ -320,7 +320,9 @@ class AnorakTournamentDataImporter(BaseTournamentDataImporter):
             if not line.get('rounds'):
                 return
             motion = motions[lineno]
-            for round_name, seq in zip(line['rounds'].split(";"), line['seq'].split(";")):
+            round_names = line['rounds'].split(";")
+            seqs = line.get('seq', "").split(";")  # seq is optional
+            for round_name, seq in zip(round_names, seqs + [""] * len(round_names)):
                 seq = seq or 1
                 yield {
                     'seq'    : seq,
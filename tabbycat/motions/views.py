@@ -13,6 +13,7 @@ from participants.models import Speaker
 from tournaments.mixins import (CurrentRoundMixin, OptionalAssistantTournamentPageMixin,
                                 PublicTournamentPageMixin, RoundMixin, TournamentMixin)
 from tournaments.models import Round
+from tournaments.versions import bump_versions
 from utils.misc import redirect_round
 from utils.mixins import AdministratorMixin
 from utils.views import ModelFormSetView, PostOnlyRedirectView
@@ -136,6 +137,7 @@ class CopyPreviousMotionsView(AdministratorMixin, LogActionMixin, RoundMixin, Po
             self.log_action(content_object=motion.motion)
 
         RoundMotion.objects.bulk_create(new_motions)
+        bump_versions(self.tournament.id, self.round.id)
         messages.success(request, ngettext(
             "Reused the motion from the previous round.",
             "Reused the %(count)d motions from the previous round.",
@@ -125,6 +125,17 @@ class AdjHistoryPenalty(IntegerPreference):
     default = 10000
 
 
+@tournament_preferences_registry.register
+class AdjAllocationTimeBudget(FloatPreference):
+    help_text = _("Number of seconds the adjudicator auto-allocator may spend improving its allocation after the "
+                  "initial allocation, by swapping adjudicators between panels. Set to 0 to disable.")
+    verbose_name = _("Adjudicator allocation time budget")
+    section = draw_rules
+    name = 'adj_allocation_time_budget'
+    default = 0.0
+    field_kwargs = {'validators': [MinValueValidator(0.0)]}
+
+
 @tournament_preferences_registry.register
 class PreformedPanelMismatchPenalty(IntegerPreference):
     help_text = _("Penality applied by preformed panel auto-allocator for priority mismatch")
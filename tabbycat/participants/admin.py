@@ -12,6 +12,7 @@ from availability.admin import RoundAvailabilityInline
 from breakqual.models import BreakCategory
 from draw.models import TeamSideAllocation
 from tournaments.models import Tournament
+from tournaments.versions import bump_versions
 from venues.admin import VenueConstraintInline
 
 from .emoji import pick_unused_emoji, populate_code_names_from_emoji, set_emoji
@@ -144,6 +145,8 @@ class TeamAdmin(admin.ModelAdmin):
 
     def delete_url_key(self, request, queryset):
         num_speakers = Speaker.objects.filter(team__in=queryset).update(url_key=None)
+        for tournament_id in set(queryset.values_list('tournament_id', flat=True)):
+            bump_versions(tournament_id)  # update() doesn't send signals
         message = ngettext_lazy(
             "%(count)d speaker had their URL key removed.",
             "%(count)d speakers had their URL keys removed.",
@@ -153,6 +156,8 @@ class TeamAdmin(admin.ModelAdmin):
 
     def assign_emoji(self, request, queryset):
         count = queryset.update(emoji=None)
+        for tournament_id in set(queryset.values_list('tournament_id', flat=True)):
+            bump_versions(tournament_id)  # update() doesn't send signals
         for tournament, teams in groupby(queryset.select_related('tournament').order_by('tournament_id'), lambda t: t.tournament):
             set_emoji(teams, tournament)
 
@@ -224,6 +229,8 @@ class AdjudicatorAdmin(admin.ModelAdmin):
 
     def delete_url_key(self, request, queryset):
         updated = queryset.update(url_key=None)
+        for tournament_id in set(queryset.values_list('tournament_id', flat=True)):
+            bump_versions(tournament_id)  # update() doesn't send signals
         message = ngettext(
             "%(count)d adjudicator had their URL key removed.",
             "%(count)d adjudicators had their URL keys removed.",
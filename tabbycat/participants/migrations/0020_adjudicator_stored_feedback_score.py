@@ -0,0 +1,23 @@
+# Generated by Django 3.1.4 on 2026-10-19 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0019_auto_20201216_1415'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adjudicator',
+            name='feedback_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of feedback submissions counted in the feedback score', verbose_name='feedback count'),
+        ),
+        migrations.AddField(
+            model_name='adjudicator',
+            name='stored_feedback_score',
+            field=models.FloatField(blank=True, editable=False, help_text='Average score of confirmed, non-ignored feedback, excluding feedback from trainees', null=True, verbose_name='feedback score'),
+        ),
+    ]
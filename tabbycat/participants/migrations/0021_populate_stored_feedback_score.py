@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_stored_feedback_score(apps, schema_editor):
+
+    Adjudicator = apps.get_model('participants', 'Adjudicator')  # noqa: N806
+    AdjudicatorFeedback = apps.get_model('adjfeedback', 'AdjudicatorFeedback')  # noqa: N806
+
+    counted = AdjudicatorFeedback.objects.filter(
+        adjudicator=OuterRef('pk'), confirmed=True, ignored=False,
+    ).exclude(source_adjudicator__type='T').order_by().values('adjudicator')
+
+    Adjudicator.objects.update(
+        stored_feedback_score=Subquery(counted.annotate(avg=Avg('score')).values('avg')),
+        feedback_count=Coalesce(Subquery(counted.annotate(count=Count('id')).values('count'),
+            output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0020_adjudicator_stored_feedback_score'),
+        ('adjfeedback', '0011_auto_20210102_1337'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_stored_feedback_score,
+            migrations.RunPython.noop,
+            elidable=True),
+    ]
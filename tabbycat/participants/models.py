@@ -354,6 +354,15 @@ class Adjudicator(Person):
     base_score = models.FloatField(default=0,
         verbose_name=_("base score"))
 
+    # Maintained by adjfeedback.utils.update_feedback_scores() whenever feedback
+    # on this adjudicator is added, removed, confirmed, unconfirmed or ignored
+    stored_feedback_score = models.FloatField(null=True, blank=True, editable=False,
+        verbose_name=_("feedback score"),
+        help_text=_("Average score of confirmed, non-ignored feedback, excluding feedback from trainees"))
+    feedback_count = models.PositiveIntegerField(default=0, editable=False,
+        verbose_name=_("feedback count"),
+        help_text=_("Number of feedback submissions counted in the feedback score"))
+
     institution_conflicts = models.ManyToManyField('Institution',
         through='adjallocation.AdjudicatorInstitutionConflict',
         related_name='adj_inst_conflicts',
@@ -414,14 +423,7 @@ class Adjudicator(Person):
         return self.weighted_score(weight)
 
     def _feedback_score(self):
-        try:
-            return self._feedback_score_cache
-        except AttributeError:
-            from adjallocation.models import DebateAdjudicator
-            self._feedback_score_cache = self.adjudicatorfeedback_set.filter(confirmed=True, ignored=False).exclude(
-                source_adjudicator__type=DebateAdjudicator.TYPE_TRAINEE).aggregate(
-                    avg=models.Avg('score'))['avg']
-            return self._feedback_score_cache
+        return self.stored_feedback_score
 
     @property
     def feedback_score(self):
@@ -1,8 +1,4 @@
-from django.db.models import Avg
-
-from adjallocation.models import DebateAdjudicator
-from adjfeedback.models import AdjudicatorFeedback
-from participants.models import Adjudicator, Team
+from participants.models import Team
 from standings.teams import PointsMetricAnnotator, WinsMetricAnnotator
 
 
@@ -26,29 +22,3 @@ def populate_win_counts(teams, round=None):
             team._wins_count = 0
         if getattr(team, '_points', None) is None:
             team._points = 0
-
-
-def populate_feedback_scores(adjudicators):
-    """Populates the `_feedback_score_cache` attribute of the adjudicators
-    in `adjudicators`.
-    Operates in-place."""
-
-    adjs_by_id = {adj.id: adj for adj in adjudicators}
-
-    adjfeedbacks = AdjudicatorFeedback.objects.filter(
-        adjudicator_id__in=adjs_by_id.keys(),
-        confirmed=True,
-        ignored=False,
-    ).exclude(source_adjudicator__type=DebateAdjudicator.TYPE_TRAINEE)
-
-    adjs_annotated = Adjudicator.objects.filter(
-        id__in=adjs_by_id.keys(),
-        adjudicatorfeedback__in=adjfeedbacks,
-    ).annotate(feedback_score_annotation=Avg('adjudicatorfeedback__score'))
-
-    for adj in adjs_annotated:
-        adjs_by_id[adj.id]._feedback_score_cache = adj.feedback_score_annotation
-
-    for adj in adjudicators:
-        if not hasattr(adj, '_feedback_score_cache'):
-            adj._feedback_score_cache = None
@@ -5,9 +5,10 @@ from django.db.models import OuterRef, Prefetch, Subquery
 from django.utils.translation import gettext_lazy as _, ngettext_lazy
 
 from draw.models import DebateTeam
+from tournaments.versions import bump_versions
 from utils.admin import TabbycatModelAdminFieldsMixin
 
-from .models import BallotSubmission, SpeakerScore, SpeakerScoreByAdj, TeamScore, TeamScoreByAdj
+from .models import BallotEntryTiming, BallotSubmission, SpeakerScore, SpeakerScoreByAdj, TeamScore, TeamScoreByAdj
 from .prefetch import populate_results
 
 
@@ -45,12 +46,44 @@ class BallotSubmissionAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
     resave_ballots.short_description = _("Resave results")
 
 
+# ==============================================================================
+# Score models
+# ==============================================================================
+
+class ClearResultHashMixin:
+    """Score rows edited here aren't written through `DebateResult.save()`, so
+    this clears the `result_hash` of the ballot submissions they belong to, to
+    be recomputed when next needed (see `populate_identical_ballotsub_lists()`),
+    and bumps the versions of their rounds."""
+
+    def clear_result_hashes(self, ballotsub_ids):
+        ballotsubs = BallotSubmission.objects.filter(id__in=ballotsub_ids)
+        ballotsubs.exclude(result_hash='').update(result_hash='')
+
+        # Score models aren't versioned, so record the change to the ballots
+        for tournament_id, round_id in set(ballotsubs.values_list('debate__round__tournament_id', 'debate__round_id')):
+            bump_versions(tournament_id, round_id)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self.clear_result_hashes([obj.ballot_submission_id, form.initial.get('ballot_submission')])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.clear_result_hashes([obj.ballot_submission_id])
+
+    def delete_queryset(self, request, queryset):
+        ballotsub_ids = set(queryset.values_list('ballot_submission_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self.clear_result_hashes(ballotsub_ids)
+
+
 # ==============================================================================
 # TeamScore
 # ==============================================================================
 
 @admin.register(TeamScore)
-class TeamScoreAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
+class TeamScoreAdmin(ClearResultHashMixin, TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
     list_display = ('id', 'ballot_submission', 'get_round', 'get_team', 'points', 'win', 'score')
     search_fields = ('debate_team__debate__round__seq', 'debate_team__debate__round__tournament__name',
                      'debate_team__team__reference', 'debate_team__team__institution__name')
@@ -70,7 +103,7 @@ class TeamScoreAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
 # ==============================================================================
 
 @admin.register(TeamScoreByAdj)
-class TeamScoreByAdjAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
+class TeamScoreByAdjAdmin(ClearResultHashMixin, TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
     list_display = ('id', 'ballot_submission', 'get_round', 'get_adj_name', 'get_team', 'win', 'margin', 'score')
     search_fields = ('debate_team__debate__round__seq', 'debate_team__debate__round__tournament__name',
                      'debate_team__team__reference', 'debate_team__team__institution__name')
@@ -93,7 +126,7 @@ class TeamScoreByAdjAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
 # ==============================================================================
 
 @admin.register(SpeakerScore)
-class SpeakerScoreAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
+class SpeakerScoreAdmin(ClearResultHashMixin, TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
     list_display = ('id', 'ballot_submission', 'get_round', 'get_team', 'position',
                     'get_speaker_name', 'score', 'ghost')
     search_fields = ('debate_team__debate__round__abbreviation',
@@ -116,7 +149,7 @@ class SpeakerScoreAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
 # ==============================================================================
 
 @admin.register(SpeakerScoreByAdj)
-class SpeakerScoreByAdjAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
+class SpeakerScoreByAdjAdmin(ClearResultHashMixin, TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
     list_display = ('id', 'ballot_submission', 'get_round', 'get_adj_name', 'get_team',
                     'get_speaker_name', 'position', 'score')
     search_fields = ('debate_team__debate__round__seq',
@@ -142,3 +175,14 @@ class SpeakerScoreByAdjAdmin(TabbycatModelAdminFieldsMixin, admin.ModelAdmin):
             Prefetch('ballot_submission__debate__debateteam_set',
                 queryset=DebateTeam.objects.select_related('team')),
         ).annotate(speaker_name=Subquery(speaker_person.values('speaker__name')))
+
+
+# ==============================================================================
+# Ballot entry timings
+# ==============================================================================
+
+@admin.register(BallotEntryTiming)
+class BallotEntryTimingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'round', 'action', 'submitter_type', 'timestamp')
+    list_filter = ('round__tournament', 'action', 'submitter_type')
+    list_select_related = ('round',)
@@ -15,7 +15,8 @@ from tournaments.utils import get_side_name
 from .consumers import BallotResultConsumer, BallotStatusConsumer
 from .result import (ConsensusDebateResult, ConsensusDebateResultWithScores,
                      DebateResultByAdjudicator, DebateResultByAdjudicatorWithScores)
-from .utils import get_status_meta, side_and_position_names
+from .timing import PhaseTimer
+from .utils import get_result_status_stats, get_status_meta, side_and_position_names
 
 logger = logging.getLogger(__name__)
 
@@ -130,11 +131,12 @@ class BaseResultForm(forms.Form):
     confirmed = forms.BooleanField(required=False)
     discarded = forms.BooleanField(required=False)
 
-    def __init__(self, ballotsub, password=False, *args, **kwargs):
+    def __init__(self, ballotsub, password=False, timer=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.ballotsub = ballotsub
         self.debate = ballotsub.debate
         self.tournament = self.debate.round.tournament
+        self.timer = timer or PhaseTimer()  # see timing.py
 
         self.has_tournament_password = password and self.tournament.pref('public_use_password')
 
@@ -173,6 +175,13 @@ class BaseResultForm(forms.Form):
         return cleaned_data
 
     def save(self):
+        with self.timer.phase('save'):
+            self.save_to_db()
+        with self.timer.phase('broadcast'):
+            self.broadcast()
+        return self.ballotsub
+
+    def save_to_db(self):
 
         # 1. Unconfirm the other, if necessary
         if self.cleaned_data['confirmed']:
@@ -195,6 +204,7 @@ class BaseResultForm(forms.Form):
         self.debate.result_status = self.cleaned_data['debate_result_status']
         self.debate.save()
 
+    def broadcast(self):
         t = self.debate.round.tournament
         # Need to provide a timestamp immediately for BallotStatusConsumer
         # as it will broadcast before the view finishes assigning one
@@ -221,11 +231,10 @@ class BaseResultForm(forms.Form):
                 'sort': meta[2],
                 'ballot': self.ballotsub.serialize(t),
                 'round': self.debate.round_id,
+                'counts': get_result_status_stats(self.debate.round),
             },
         })
 
-        return self.ballotsub
-
     def save_ballot(self):
         raise NotImplementedError
 
@@ -0,0 +1,352 @@
+"""Bulk ingestion of ballots, for importing many ballots at once, for example
+from scanned paper ballots or when replaying a recovered tournament.
+
+Each ballot is a dict of the following form, in which debates, motions,
+adjudicators and speakers are identified by their primary keys:
+
+    {
+        "debate": 12,
+        "motion": 3,                     # optional
+        "confirmed": true,               # optional, defaults to false
+        "discarded": false,              # optional, defaults to false
+        "sheets": [
+            {
+                "adjudicator": 4,        # only if there is a ballot per adjudicator
+                "teams": [
+                    {
+                        "side": "aff",
+                        "win": true,     # only if winners are declared
+                        "speeches": [    # only if speaker scores are used
+                            {"speaker": 56, "score": 75.0, "ghost": false},
+                            ...
+                        ],
+                    },
+                    ...
+                ],
+            },
+            ...
+        ],
+    }
+
+This is the same format as the ballots API uses for results, except that
+related objects are identified by primary key rather than by URL. There must
+be one sheet per voting adjudicator if there is a ballot per adjudicator, and
+exactly one sheet otherwise. As in the ballot entry form, scores must be
+within the limits set in the tournament's preferences, and a speaker can't give
+two substantive speeches for a team unless one is marked as a ghost.
+
+Unlike `DebateResult.save()`, which saves one ballot at a time, the
+`BallotIngester` loads everything it needs to validate a batch of ballots in a
+fixed number of queries, then saves all valid ballots in a single transaction
+using bulk writes. Invalid ballots are reported, and don't stop the valid ones
+from being saved.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from django.utils import timezone
+
+from adjallocation.models import DebateAdjudicator
+from adjallocation.preformed.anticipated import invalidate_anticipated_draws
+from breakqual.utils import invalidate_liveness
+from draw.models import Debate, DebateTeam
+from motions.models import RoundMotion
+from tournaments.versions import bump_versions
+
+from .models import BallotSubmission
+from .result import DebateResult
+from .utils import refresh_result_status_counts
+
+logger = logging.getLogger(__name__)
+
+
+class BallotIngestError(ValueError):
+    pass
+
+
+def _id(value):
+    """Checks that `value` could be a primary key, so that it's safe to look up
+    in a dict, and returns it."""
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise BallotIngestError("%r is not a valid ID" % (value,))
+    return value
+
+
+def _items(value, name):
+    """Checks that `value` is a list of objects, and returns it."""
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise BallotIngestError("%s must be a list of objects" % name)
+    return value
+
+
+class BallotIngester:
+    """Validates and saves ballots in bulk. Usage:
+
+        ingester = BallotIngester(tournament, submitter=user)
+        outcomes = ingester.ingest(ballots)
+
+    `outcomes` has one item for each ballot: the saved BallotSubmission if the
+    ballot was valid, or a BallotIngestError explaining why not otherwise."""
+
+    def __init__(self, tournament, submitter=None, submitter_type=BallotSubmission.SUBMITTER_TABROOM,
+                 ip_address=None):
+        self.tournament = tournament
+        self.submitter = submitter
+        self.submitter_type = submitter_type
+        self.ip_address = ip_address
+
+        # (min, max, step) for substantive and reply scores, as in the ballot form
+        self.score_limits = tuple(tournament.pref(name) for name in ('score_min', 'score_max', 'score_step'))
+        self.reply_score_limits = tuple(tournament.pref(name) for name in (
+            'reply_score_min', 'reply_score_max', 'reply_score_step'))
+
+    def ingest(self, ballots):
+        ballots = list(ballots)
+        self.load(ballots)
+
+        results = []
+        outcomes = []
+        for i, ballot in enumerate(ballots):
+            try:
+                result = self.build_result(ballot)
+            except BallotIngestError as e:
+                logger.info("Ballot %d is invalid: %s", i, e)
+                outcomes.append(e)
+            else:
+                results.append(result)
+                outcomes.append(result.ballotsub)
+
+        if results:
+            with transaction.atomic():
+                self.save(results)
+            self.clear_caches(results)
+            logger.info("Saved %d of %d ballots", len(results), len(ballots))
+
+        return outcomes
+
+    # --------------------------------------------------------------------------
+    # Loading and validation
+    # --------------------------------------------------------------------------
+
+    def load(self, ballots):
+        """Loads all debates referred to by `ballots`, along with their teams,
+        speakers, adjudicators and motions."""
+
+        debate_ids = {ballot.get('debate') for ballot in ballots if isinstance(ballot, dict)}
+        debates = Debate.objects.filter(
+            round__tournament=self.tournament, id__in=[d for d in debate_ids if isinstance(d, int)],
+        ).select_related('round').prefetch_related(
+            Prefetch('debateteam_set', queryset=DebateTeam.objects.select_related(
+                'team').prefetch_related('team__speaker_set')),
+            Prefetch('debateadjudicator_set', queryset=DebateAdjudicator.objects.select_related('adjudicator')),
+        )
+
+        self.debates = {}
+        for debate in debates:
+            debate.round.tournament = self.tournament
+            self.debates[debate.id] = debate
+
+        self.motions = {}
+        for rm in RoundMotion.objects.filter(round__debate__in=self.debates.values()).select_related('motion').distinct():
+            self.motions.setdefault(rm.round_id, {})[rm.motion_id] = rm.motion
+
+    def build_result(self, ballot):
+        """Returns a DebateResult, attached to a new (unsaved) BallotSubmission,
+        for `ballot`. Raises BallotIngestError if the ballot is invalid."""
+
+        if not isinstance(ballot, dict):
+            raise BallotIngestError("Ballot must be an object")
+
+        debate = self.debates.get(_id(ballot.get('debate')))
+        if debate is None:
+            raise BallotIngestError("Debate %r not found in this tournament" % (ballot.get('debate'),))
+
+        ballotsub = BallotSubmission(
+            debate=debate,
+            submitter_type=self.submitter_type,
+            submitter=self.submitter,
+            ip_address=self.ip_address,
+            confirmed=bool(ballot.get('confirmed', False)),
+            discarded=bool(ballot.get('discarded', False)),
+        )
+        if ballotsub.confirmed and ballotsub.discarded:
+            raise BallotIngestError("Ballot can't be both discarded and confirmed")
+        if ballotsub.confirmed:
+            ballotsub.confirmer = self.submitter
+            ballotsub.confirm_timestamp = timezone.now()
+
+        if ballot.get('motion') is not None:
+            ballotsub.motion = self.motions.get(debate.round_id, {}).get(_id(ballot['motion']))
+            if ballotsub.motion is None:
+                raise BallotIngestError("Motion %r isn't in %s" % (ballot['motion'], debate.round.name))
+
+        result = DebateResult(ballotsub, load=False, tournament=self.tournament)
+        result.init_blank_buffer()
+        ballotsub._result = result
+
+        debateteams = {dt.side: dt for dt in debate.debateteam_set.all()}
+        if set(debateteams) != set(result.sides):
+            raise BallotIngestError("Debate has invalid sides")
+        result.debateteams.update(debateteams)
+
+        sheets = _items(ballot.get('sheets'), "Sheets")
+
+        if result.is_voting:
+            result.debateadjs = {da.adjudicator: da for da in debate.debateadjudicator_set.all()
+                                 if da.type != DebateAdjudicator.TYPE_TRAINEE}
+            result.scoresheets = {adj: result.scoresheet_class(positions=getattr(result, 'positions', None))
+                                  for adj in result.debateadjs}
+            adjs_by_id = {adj.id: adj for adj in result.debateadjs}
+            if sorted(_id(sheet.get('adjudicator')) for sheet in sheets) != sorted(adjs_by_id):
+                raise BallotIngestError("Ballot must have exactly one sheet for each voting adjudicator")
+        elif len(sheets) != 1:
+            raise BallotIngestError("Ballot must have exactly one sheet")
+
+        for sheet in sheets:
+            adj = adjs_by_id[sheet['adjudicator']] if result.is_voting else None
+            self.fill_sheet(result, adj, sheet)
+
+        if result.uses_speakers:
+            self.check_speakers(result)
+
+        if not result.is_valid():
+            raise BallotIngestError("Result is incomplete or invalid")
+
+        ballotsub.result_hash = result.fingerprint()
+        return result
+
+    def fill_sheet(self, result, adj, sheet):
+        """Fills in the scoresheet for `adj` (or the only scoresheet, if `adj` is
+        None) in `result` from `sheet`."""
+
+        teams = _items(sheet.get('teams'), "Teams")
+        sides = [team.get('side') for team in teams]
+        if sorted(sides, key=str) != sorted(result.sides):
+            raise BallotIngestError("Sheet must have one team for each of the sides: %s" % ", ".join(result.sides))
+        teams = dict(zip(sides, teams))
+        args = (adj,) if result.is_voting else ()
+
+        if result.uses_declared_winners:
+            result.set_winners(*args, [side for side, team in teams.items() if team.get('win')])
+
+        if not result.uses_speakers:
+            return
+
+        for side, team in teams.items():
+            speeches = _items(team.get('speeches', []), "Speeches")
+            if len(speeches) != len(result.positions):
+                raise BallotIngestError("There must be %d speeches for %s" % (len(result.positions), side))
+            speakers = {speaker.id: speaker for speaker in result.debateteams[side].team.speakers}
+
+            for pos, speech in zip(result.positions, speeches):
+                speaker = speakers.get(_id(speech.get('speaker')))
+                if speaker is None:
+                    raise BallotIngestError("Speaker %r isn't in team %s" % (
+                        speech.get('speaker'), result.debateteams[side].team.short_name))
+                if result.speakers[side][pos] not in [None, speaker]:
+                    raise BallotIngestError("Speakers differ between sheets")
+                try:
+                    score = float(speech.get('score'))
+                except (TypeError, ValueError):
+                    raise BallotIngestError("Score %r is not a number" % (speech.get('score'),))
+                self.check_score(side, pos, score)
+
+                result.set_speaker(side, pos, speaker)
+                result.set_ghost(side, pos, bool(speech.get('ghost', False)))
+                result.set_score(*args, side, pos, score)
+
+    def check_score(self, side, pos, score):
+        """Checks that `score` is within the limits set in the tournament's
+        preferences, as the ballot form does."""
+        is_reply = pos == self.tournament.reply_position
+        min_value, max_value, step_value = self.reply_score_limits if is_reply else self.score_limits
+        if not min_value <= score <= max_value:
+            raise BallotIngestError("Score %g for %s speaker %d isn't between %g and %g" % (
+                score, side, pos, min_value, max_value))
+        if score and step_value and score % step_value != 0:
+            raise BallotIngestError("Score %g for %s speaker %d isn't a multiple of %g" % (
+                score, side, pos, step_value))
+
+    def check_speakers(self, result):
+        """Checks the speaker order in each team, as the ballot form does:
+        substantive speakers (other than duplicate speeches, marked as ghosts)
+        must be unique, and the reply speaker can't be the last substantive
+        speaker."""
+        last_substantive_position = self.tournament.last_substantive_position
+        reply_position = self.tournament.reply_position
+
+        for side in result.sides:
+            speakers = result.speakers[side]
+            ghosts = result.ghosts[side]
+            substantive = [speakers[pos] for pos in range(1, last_substantive_position + 1) if not ghosts[pos]]
+            for speaker in set(substantive):
+                if substantive.count(speaker) > 1:
+                    raise BallotIngestError("%s gave %d substantive speeches for %s" % (
+                        speaker.name, substantive.count(speaker), side))
+
+            if reply_position in result.positions and not ghosts[reply_position]:
+                if speakers[reply_position] == speakers[last_substantive_position]:
+                    raise BallotIngestError("The last substantive speaker and reply speaker for %s can't be the same" % side)
+                if (self.tournament.pref('require_substantive_for_reply') and
+                        speakers[reply_position] not in substantive):
+                    raise BallotIngestError("The reply speaker for %s did not give a substantive speech" % side)
+
+    # --------------------------------------------------------------------------
+    # Saving
+    # --------------------------------------------------------------------------
+
+    def save(self, results):
+        """Saves the ballot submissions and results in `results` using a fixed
+        number of queries. If there are several confirmed ballots for the same
+        debate, the last one stays confirmed."""
+
+        ballotsubs = [result.ballotsub for result in results]
+        debates = {ballotsub.debate_id: ballotsub.debate for ballotsub in ballotsubs}
+
+        with BallotSubmission.save_lock:
+            versions = dict(BallotSubmission.objects.filter(debate_id__in=debates).values(
+                'debate_id').annotate(max_version=Max('version')).values_list('debate_id', 'max_version'))
+
+            confirmed = {}
+            for ballotsub in ballotsubs:
+                ballotsub.version = versions[ballotsub.debate_id] = versions.get(ballotsub.debate_id, 0) + 1
+                if ballotsub.confirmed:
+                    if ballotsub.debate_id in confirmed:
+                        confirmed[ballotsub.debate_id].confirmed = False
+                    confirmed[ballotsub.debate_id] = ballotsub
+
+            BallotSubmission.objects.filter(debate_id__in=confirmed, confirmed=True).update(confirmed=False)
+            BallotSubmission.objects.bulk_create(ballotsubs)
+
+        instances = {}
+        for result in results:
+            for model, objs in result.build_instances().items():
+                instances.setdefault(model, []).extend(objs)
+        for objs in instances.values():
+            type(objs[0]).objects.bulk_create(objs)
+
+        # Update result status (only takes into account marginal effect, as in dbutils.add_result())
+        for ballotsub in ballotsubs:
+            debate = ballotsub.debate
+            debate.sides_confirmed = True
+            if ballotsub.confirmed:
+                debate.result_status = Debate.STATUS_CONFIRMED
+            elif not ballotsub.discarded and debate.result_status != Debate.STATUS_CONFIRMED:
+                debate.result_status = Debate.STATUS_DRAFT
+        Debate.objects.bulk_update(debates.values(), ['sides_confirmed', 'result_status'])
+        for round_id in {debate.round_id for debate in debates.values()}:
+            refresh_result_status_counts(round_id)
+
+    def clear_caches(self, results):
+        """Clears data cached from the debates of the saved `results`. This
+        must be done after the transaction is committed, so that other requests
+        can't cache data again from before it was."""
+        # bulk_create() doesn't send the signals that would normally clear these
+        debates = {result.ballotsub.debate for result in results}
+        seq = min(debate.round.seq for debate in debates)
+        invalidate_liveness(self.tournament.id, after_seq=seq)
+        invalidate_anticipated_draws(self.tournament.id, after_seq=seq)
+        for round_id in {debate.round_id for debate in debates}:
+            bump_versions(self.tournament.id, round_id)
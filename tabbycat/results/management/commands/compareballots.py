@@ -1,9 +1,17 @@
 from draw.models import Debate
+from participants.models import Team
 from results.models import BallotSubmission
+from results.prefetch import populate_results
 from tournaments.models import Round, Tournament
 from utils.management.base import TournamentCommand
 
 
+def natural_key(instance):
+    """Identifies teams, speakers and adjudicators by name, since the check
+    tournament has different objects to the original tournament."""
+    return instance.short_name if isinstance(instance, Team) else instance.name
+
+
 class Command(TournamentCommand):
 
     help = (
@@ -25,16 +33,16 @@ class Command(TournamentCommand):
 
         no_original = 0
         no_check = 0
+        originals = []
+        compares = []
 
         for debate in debates:
             if not debate.confirmed_ballot:
                 no_original += 1
                 continue
 
-            original = debate.confirmed_ballot
-
             try:
-                compare = BallotSubmission.objects.get(
+                compare = BallotSubmission.objects.select_related('debate__round', 'motion').get(
                     debate__round__tournament=compare_tournament,
                     debate__round__seq=debate.round.seq,
                     debate__venue=debate.venue,
@@ -44,43 +52,62 @@ class Command(TournamentCommand):
                 no_check += 1
                 continue
 
-            # Can't use DebateResult.identical(), because this involves different objects
-
-            if original.motion != compare.motion:
-                self.stdout.write("{debate}: original motion={orig}, check motion={check}".format(
-                    debate=debate, orig=original.motion.reference, check=compare.motion.reference))
-
-            for ts in original.teamscore_set.all():
-                cts = compare.teamscore_set.get(debate_team__side=ts.debate_team.side)
-                for field in ['points', 'win', 'margin', 'score', 'votes_given', 'votes_possible']:
-                    if getattr(ts, field) != getattr(cts, field):
-                        self.stdout.write("{dt}: original {field}={orig}, check {field}={check}".format(
-                            dt=ts.debate_team, orig=getattr(ts, field),
-                            check=getattr(cts, field), field=field))
-
-            for ss in original.speakerscore_set.all():
-                css = compare.speakerscore_set.get(debate_team__side=ss.debate_team.side, position=ss.position)
-                for field in ['speaker', 'score', 'ghost']:
-                    if getattr(ss, field) != getattr(css, field):
-                        message = "{dt}, speaker {pos}: original {field}={orig}, check {field}={check}".format(
-                            dt=ss.debate_team, pos=ss.position, orig=getattr(ss, field),
-                            check=getattr(css, field), field=field)
-                        if field == 'speaker':
-                            message += " (original score {})".format(ss.score)
-                        self.stdout.write(message)
-
-            for ssba in original.speakerscorebyadj_set.all():
-                cssba = compare.speakerscorebyadj_set.get(
-                    debate_team__side=ssba.debate_team.side,
-                    debate_adjudicator=ssba.debate_adjudicator,
-                    position=ssba.position,
-                )
-                if ssba.score != cssba.score:
-                    self.stdout.write("{dt}, speaker {pos}, from {adj}: original score={orig}, check score={check}".format(
-                        dt=ssba.debate_team, pos=ssba.position, adj=ssba.debate_adjudicator.adjudicator,
-                        orig=ssba.score, check=cssba.score))
+            originals.append(debate.confirmed_ballot)
+            compares.append(compare)
+
+        populate_results(originals, tournament)
+        populate_results(compares, compare_tournament)
+
+        # Can't use DebateResult.identical(), because this involves different
+        # objects, but fingerprints by name pick out the ballots that match, so
+        # that only the others need to be compared in detail.
+        identical = 0
+        for original, compare in zip(originals, compares):
+            if (getattr(original.motion, 'reference', None) == getattr(compare.motion, 'reference', None) and
+                    original.result.fingerprint(natural_key) == compare.result.fingerprint(natural_key)):
+                identical += 1
+                continue
+            self.compare_ballots(original.debate, original, compare)
+
+        self.stdout.write("{:d} of {:d} ballots identical".format(identical, len(originals)))
 
         if no_original:
             self.stdout.write("WARNING: original ballots for {:d} debates not found".format(no_original))
         if no_check:
             self.stdout.write("WARNING: check ballots for {:d} debates not found".format(no_check))
+
+    def compare_ballots(self, debate, original, compare):
+
+        if original.motion != compare.motion:
+            self.stdout.write("{debate}: original motion={orig}, check motion={check}".format(
+                debate=debate, orig=original.motion.reference, check=compare.motion.reference))
+
+        for ts in original.teamscore_set.all():
+            cts = compare.teamscore_set.get(debate_team__side=ts.debate_team.side)
+            for field in ['points', 'win', 'margin', 'score', 'votes_given', 'votes_possible']:
+                if getattr(ts, field) != getattr(cts, field):
+                    self.stdout.write("{dt}: original {field}={orig}, check {field}={check}".format(
+                        dt=ts.debate_team, orig=getattr(ts, field),
+                        check=getattr(cts, field), field=field))
+
+        for ss in original.speakerscore_set.all():
+            css = compare.speakerscore_set.get(debate_team__side=ss.debate_team.side, position=ss.position)
+            for field in ['speaker', 'score', 'ghost']:
+                if getattr(ss, field) != getattr(css, field):
+                    message = "{dt}, speaker {pos}: original {field}={orig}, check {field}={check}".format(
+                        dt=ss.debate_team, pos=ss.position, orig=getattr(ss, field),
+                        check=getattr(css, field), field=field)
+                    if field == 'speaker':
+                        message += " (original score {})".format(ss.score)
+                    self.stdout.write(message)
+
+        for ssba in original.speakerscorebyadj_set.all():
+            cssba = compare.speakerscorebyadj_set.get(
+                debate_team__side=ssba.debate_team.side,
+                debate_adjudicator=ssba.debate_adjudicator,
+                position=ssba.position,
+            )
+            if ssba.score != cssba.score:
+                self.stdout.write("{dt}, speaker {pos}, from {adj}: original score={orig}, check score={check}".format(
+                    dt=ssba.debate_team, pos=ssba.position, adj=ssba.debate_adjudicator.adjudicator,
+                    orig=ssba.score, check=cssba.score))
@@ -0,0 +1,50 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+
+from results.ingest import BallotIngester, BallotIngestError
+from utils.management.base import TournamentCommand
+
+User = get_user_model()
+
+
+class Command(TournamentCommand):
+
+    help = ("Saves ballots in bulk from a JSON file containing a list of ballots. "
+            "See results/ingest.py for the format of each ballot. Invalid ballots "
+            "are reported and skipped; all valid ballots are saved.")
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("file", type=str, help="JSON file of ballots")
+        parser.add_argument("-u", "--user", type=str, default=None,
+                            help="Username of submitter")
+
+    def handle_tournament(self, tournament, **options):
+        try:
+            with open(options["file"]) as f:
+                ballots = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError("Couldn't read ballots from %s: %s" % (options["file"], e))
+        if not isinstance(ballots, list):
+            raise CommandError("The file must contain a list of ballots")
+
+        user = None
+        if options["user"] is not None:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError("There is no user called {user!r}.".format(user=options["user"]))
+
+        outcomes = BallotIngester(tournament, submitter=user).ingest(ballots)
+
+        saved = 0
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, BallotIngestError):
+                self.stdout.write(self.style.ERROR("Ballot {:d}: {}".format(i, outcome)))
+            else:
+                saved += 1
+
+        self.stdout.write(self.style.SUCCESS("Saved {:d} of {:d} ballots in {}".format(
+            saved, len(outcomes), tournament.short_name)))
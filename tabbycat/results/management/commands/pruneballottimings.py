@@ -0,0 +1,19 @@
+from django.conf import settings
+
+from utils.management.base import TournamentCommand
+
+from ...timing import prune_timings
+
+
+class Command(TournamentCommand):
+
+    help = "Deletes ballot entry timings older than a number of days."
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("--days", type=int, default=settings.BALLOT_ENTRY_TIMING_RETENTION_DAYS,
+                            help="Delete timings older than this many days (default: %(default)s)")
+
+    def handle_tournament(self, tournament, **options):
+        count = prune_timings(tournament, options["days"])
+        self.stdout.write("Deleted {:d} ballot entry timings from {:s}".format(count, tournament.slug))
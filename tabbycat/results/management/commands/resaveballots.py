@@ -1,7 +1,7 @@
 from utils.management.base import TournamentCommand
 
 from ...models import BallotSubmission
-from ...prefetch import populate_results
+from ...prefetch import iterate_results
 
 
 class Command(TournamentCommand):
@@ -14,7 +14,6 @@ class Command(TournamentCommand):
         self.stdout.write("Resaving {:d} ballots in tournament \"{:s}\"...".format(
                 ballotsubs.count(), tournament.name))
 
-        populate_results(ballotsubs)
-        for bsub in ballotsubs:
-            self.stdout.write("Saving: {}".format(bsub))
-            bsub.result.save()
+        for result in iterate_results(ballotsubs, tournament):
+            self.stdout.write("Saving: {}".format(result.ballotsub))
+            result.save()
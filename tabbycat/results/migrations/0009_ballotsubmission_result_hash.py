@@ -0,0 +1,18 @@
+# Generated by Django 3.1.4 on 2026-10-19 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0008_auto_20201126_0037'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ballotsubmission',
+            name='result_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the result, used to find identical ballots', max_length=64, verbose_name='result hash'),
+        ),
+    ]
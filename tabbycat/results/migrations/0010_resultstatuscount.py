@@ -0,0 +1,29 @@
+# Generated by Django 3.1.4 on 2026-10-19 09:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0009_auto_20201126_0037'),
+        ('results', '0009_ballotsubmission_result_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultStatusCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('N', 'none'), ('P', 'postponed'), ('D', 'draft'), ('C', 'confirmed')], max_length=1, verbose_name='result status')),
+                ('count', models.IntegerField(default=0, verbose_name='count')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tournaments.round', verbose_name='round')),
+            ],
+            options={
+                'verbose_name': 'result status count',
+                'verbose_name_plural': 'result status counts',
+                'unique_together': {('round', 'status')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.4 on 2026-10-19 09:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0009_auto_20201126_0037'),
+        ('results', '0010_resultstatuscount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BallotEntryTiming',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='timestamp')),
+                ('action', models.CharField(choices=[('D', 'Display'), ('I', 'Invalid submission'), ('S', 'Save'), ('C', 'Confirm')], max_length=1, verbose_name='action')),
+                ('submitter_type', models.CharField(choices=[('T', 'Tab room'), ('P', 'Public')], max_length=1, verbose_name='submitter type')),
+                ('durations', models.JSONField(default=dict, help_text='Time taken in each phase, in milliseconds', verbose_name='durations')),
+                ('queries', models.JSONField(default=dict, help_text='Number of database queries made in each phase', verbose_name='queries')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tournaments.round', verbose_name='round')),
+            ],
+            options={
+                'verbose_name': 'ballot entry timing',
+                'verbose_name_plural': 'ballot entry timings',
+            },
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from draw.models import Debate
 from utils.misc import badge_datetime_format, reverse_tournament
 
 from .result import DebateResult
@@ -107,6 +108,9 @@ class BallotSubmission(Submission):
         verbose_name=_("motion"))
     discarded = models.BooleanField(default=False,
         verbose_name=_("discarded"))
+    result_hash = models.CharField(max_length=64, blank=True, editable=False,
+        verbose_name=_("result hash"),
+        help_text=_("Fingerprint of the result, used to find identical ballots"))
 
     class Meta:
         unique_together = [('debate', 'version')]
@@ -357,3 +361,64 @@ class SpeakerScore(models.Model):
         if self.ballot_submission.debate != self.debate_team.debate:
             raise ValidationError(_("The ballot submission and debate team must "
                     "relate to the same debate."))
+
+
+class ResultStatusCount(models.Model):
+    """The number of debates in a round with a given result status. These are
+    kept up to date as debates are saved (see signals.py), so that pages that
+    show how many ballots are in don't need to count debates every time."""
+
+    round = models.ForeignKey('tournaments.Round', models.CASCADE,
+        verbose_name=_("round"))
+    status = models.CharField(max_length=1, choices=Debate.STATUS_CHOICES,
+        verbose_name=_("result status"))
+    count = models.IntegerField(default=0,
+        verbose_name=_("count"))
+
+    class Meta:
+        unique_together = [('round', 'status')]
+        verbose_name = _("result status count")
+        verbose_name_plural = _("result status counts")
+
+    def __str__(self):
+        return "[{0.round_id}] {0.status}: {0.count}".format(self)
+
+
+class BallotEntryTiming(models.Model):
+    """The time taken, and number of database queries made, in each phase of
+    handling one request to a ballot entry page. These are recorded by the
+    ballot entry views (see timing.py), to help find where ballot entry is
+    slow."""
+
+    ACTION_DISPLAY = 'D'
+    ACTION_INVALID = 'I'
+    ACTION_SAVE = 'S'
+    ACTION_CONFIRM = 'C'
+    ACTION_CHOICES = (
+        (ACTION_DISPLAY, _("Display")),
+        (ACTION_INVALID, _("Invalid submission")),
+        (ACTION_SAVE, _("Save")),
+        (ACTION_CONFIRM, _("Confirm")),
+    )
+
+    round = models.ForeignKey('tournaments.Round', models.CASCADE,
+        verbose_name=_("round"))
+    timestamp = models.DateTimeField(auto_now_add=True,
+        verbose_name=_("timestamp"))
+    action = models.CharField(max_length=1, choices=ACTION_CHOICES,
+        verbose_name=_("action"))
+    submitter_type = models.CharField(max_length=1, choices=Submission.SUBMITTER_TYPE_CHOICES,
+        verbose_name=_("submitter type"))
+    durations = models.JSONField(default=dict,
+        verbose_name=_("durations"),
+        help_text=_("Time taken in each phase, in milliseconds"))
+    queries = models.JSONField(default=dict,
+        verbose_name=_("queries"),
+        help_text=_("Number of database queries made in each phase"))
+
+    class Meta:
+        verbose_name = _("ballot entry timing")
+        verbose_name_plural = _("ballot entry timings")
+
+    def __str__(self):
+        return "[{0.round_id}] {0.action} @ {0.timestamp}".format(self)
@@ -1,5 +1,7 @@
 """Functions that prefetch data for efficiency."""
 
+from django.db.models import prefetch_related_objects
+
 from adjallocation.models import DebateAdjudicator
 from checkins.utils import get_checkins
 from draw.models import DebateTeam
@@ -171,7 +173,7 @@ def populate_results(ballotsubs, tournament=None):
     teamscoresbyadj = TeamScoreByAdj.objects.filter(
         ballot_submission__in=ballotsubs,
         debate_team__side__in=sides,
-    ).select_related('debate_team')
+    ).select_related('debate_team', 'debate_adjudicator__adjudicator')
 
     for tsba in teamscoresbyadj:
         result = results_by_ballotsub_id[tsba.ballot_submission_id]
@@ -182,3 +184,39 @@ def populate_results(ballotsubs, tournament=None):
 
     for ballotsub in ballotsubs:
         ballotsub.result.assert_loaded()
+
+
+def iterate_results(ballotsubs, tournament=None, chunk_size=200):
+    """Yields a populated DebateResult for each BallotSubmission in the queryset
+    `ballotsubs`, in order of round and then ID.
+
+    Unlike `populate_results()`, which loads everything for all of the ballot
+    submissions at once, this retrieves the ballot submissions using a
+    server-side cursor (where the database supports it) and populates their
+    results `chunk_size` ballot submissions at a time, so that memory use is
+    bounded by the chunk size rather than the size of the tournament. Use this
+    for operations that go through every ballot in a tournament.
+
+    Each result's ballot submission is available as `result.ballotsub`. Results
+    that the caller doesn't keep a reference to are released after their chunk
+    is finished.
+    """
+    ballotsubs = ballotsubs.select_related('debate__round__tournament').order_by('debate__round__seq', 'id')
+
+    chunk = []
+    for ballotsub in ballotsubs.iterator(chunk_size=chunk_size):
+        chunk.append(ballotsub)
+        if len(chunk) >= chunk_size:
+            yield from _populate_results_chunk(chunk, tournament)
+            chunk = []
+
+    if chunk:
+        yield from _populate_results_chunk(chunk, tournament)
+
+
+def _populate_results_chunk(ballotsubs, tournament):
+    # prefetch_related() is ignored by QuerySet.iterator(), so do it here
+    prefetch_related_objects(ballotsubs, 'debate__debateadjudicator_set__adjudicator__institution')
+    populate_results(ballotsubs, tournament or ballotsubs[0].debate.round.tournament)
+    for ballotsub in ballotsubs:
+        yield ballotsub.result
@@ -18,7 +18,7 @@ allows multiple versions of the result to be retained for a single debate, which
 helps avoid data loss when multiple results are (presumably erroneously)
 submitted. However, these classes do not edit or save the BallotSubmission
 instances; the instance passed to it is used only for looking up related
-objects.
+objects, and for recording a fingerprint of the result (`result_hash`).
 
 Notes on terminology:
  - "Position" in this file always means speaker position as a number. Replies
@@ -38,12 +38,16 @@ A few notes on error checking:
    methods specific to classes inheriting `ScoreMixin` (in scoresheet.py).
 """
 
+import hashlib
 import logging
 from functools import wraps
 from statistics import mean
 
+from django.db import models, transaction
+
 from adjallocation.allocation import AdjudicatorAllocation
 from adjallocation.models import DebateAdjudicator
+from tournaments.versions import bump_versions
 
 from .result_info import DebateResultInfo
 from .scoresheet import (BPEliminationScoresheet, BPScoresheet, HighPointWinsRequiredScoresheet, LowPointWinsAllowedScoresheet,
@@ -53,6 +57,16 @@ from .utils import side_and_position_names
 logger = logging.getLogger(__name__)
 
 
+def _raw_value(value):
+    """Returns the primary key of `value` if it's a model instance, or `value`
+    itself otherwise, for comparing against values stored in the database."""
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def _pk(instance):
+    return instance.pk
+
+
 class ResultError(RuntimeError):
     pass
 
@@ -122,7 +136,7 @@ class BaseDebateResult:
         are not. (It does not check for completeness, only form.)
 
     Debate result classes don't edit BallotSubmission instances themselves, only
-    objects related to them. Therefore, when saving, this class does NOT call
+    objects related to them (apart from `result_hash`, see `save_fingerprint()`). Therefore, when saving, this class does NOT call
     `self.ballotsub.save()`. It is the responsibility of the caller to save the
     BallotSubmission. Because this class saves related objects, new
     BallotSubmission instances must have been saved to the database before the
@@ -131,6 +145,12 @@ class BaseDebateResult:
     Subclasses should extend these functions as necessary to accommodate the
     additional buffers they add to the class.
 
+    Saving works similarly: `self.save()` checks that the result is valid, then
+    calls `self.save_to_db()` inside a transaction, which writes the rows
+    returned by `self.get_rows()` using `self.save_rows()`, which writes all
+    instances of a model in bulk. Subclasses should extend `get_rows()` to add
+    the models they're responsible for.
+
     Subclasses should implement a `teamscore_field_<fieldname>` method for each
     field of TeamScore that is relevant to them, for example,
     `teamscore_field_win(side)` or `teamscore_field_margin(side)`. These methods
@@ -231,6 +251,22 @@ class BaseDebateResult:
             return False
         return True
 
+    def canonical_form(self, identify=_pk):
+        """Returns a tuple of plain values that is equal for two results if and
+        only if they are identical. Teams, speakers and adjudicators are
+        represented by `identify(instance)`, which defaults to their primary
+        keys; callers comparing results across tournaments can pass a function
+        returning something else, like names. Subclasses should extend this
+        method to add the information they store."""
+        teams = tuple(self.debateteams[side] and identify(self.debateteams[side].team) for side in self.sides)
+        return (teams,)
+
+    def fingerprint(self, identify=_pk):
+        """Returns a hash of `self.canonical_form()`, so that identical results
+        can be found by grouping on the fingerprint, rather than comparing every
+        pair of results."""
+        return hashlib.sha256(repr(self.canonical_form(identify)).encode()).hexdigest()
+
     # --------------------------------------------------------------------------
     # Load and save methods
     # --------------------------------------------------------------------------
@@ -263,11 +299,90 @@ class BaseDebateResult:
         if not self.is_valid():
             raise ResultError("Tried to save an invalid result.")
 
-        for side in self.sides:
-            dt = self.debateteams[side]
-
-            self.ballotsub.teamscore_set.update_or_create(debate_team=dt,
-                    defaults=self.get_defaults_fields('teamscore', side))
+        with transaction.atomic():
+            self.save_to_db()
+            self.save_fingerprint()
+
+        # save_rows() writes in bulk, which doesn't send signals
+        bump_versions(self.tournament.id, self.debate.round_id)
+
+    def save_to_db(self):
+        """Writes the buffer to the database."""
+        for model, key_fields, rows in self.get_rows():
+            self.save_rows(model, key_fields, rows)
+
+    def get_rows(self):
+        """Returns a list of tuples `(model, key_fields, rows)`, one for each
+        model this result saves, where the arguments are as taken by
+        `self.save_rows()`. Subclasses should extend this method as necessary."""
+        return [('teamscore', ['debate_team'], {
+            (self.debateteams[side],): self.get_defaults_fields('teamscore', side)
+            for side in self.sides
+        })]
+
+    def build_instances(self):
+        """Returns a dict mapping model names (e.g. `'teamscore'`) to lists of
+        new, unsaved instances representing this result. This is for saving
+        results in bulk for ballot submissions that don't have any instances
+        yet; see `results.ingest`. The ballot submission must have been saved."""
+        instances = {}
+        for model, key_fields, rows in self.get_rows():
+            model_class = getattr(self.ballotsub, '%s_set' % model).model
+            instances[model] = [model_class(ballot_submission=self.ballotsub,
+                    **dict(zip(key_fields, key)), **fields) for key, fields in rows.items()]
+        return instances
+
+    def save_fingerprint(self):
+        """Records the fingerprint of this result on the ballot submission. This
+        is the only field of the ballot submission that this class writes, and it
+        does so with an update query, so that it doesn't overwrite changes the
+        caller has yet to save."""
+        self.ballotsub.result_hash = self.fingerprint()
+        type(self.ballotsub).objects.filter(pk=self.ballotsub.pk).update(result_hash=self.ballotsub.result_hash)
+
+    def save_rows(self, model, key_fields, rows):
+        """Saves instances of `model` (e.g. `'teamscore'`) relating to the
+        ballot submission, so that there is exactly one instance for each item
+        in `rows`. `rows` must be a dict mapping tuples of values for the fields
+        in `key_fields`, which identify an instance, to dicts of values for the
+        other fields (as returned by `get_defaults_fields()`).
+
+        Existing instances are loaded in one query, then compared against
+        `rows`. Missing instances are created, changed ones are updated, and
+        those not in `rows` are deleted, each in a single query, so the number
+        of queries doesn't depend on the number of instances."""
+
+        model_class = getattr(self.ballotsub, '%s_set' % model).model
+        opts = model_class._meta
+        key_attnames = [opts.get_field(field).attname for field in key_fields]
+        existing = {tuple(getattr(obj, attname) for attname in key_attnames): obj
+                    for obj in model_class.objects.filter(ballot_submission=self.ballotsub)}
+
+        to_create = []
+        to_update = []
+        update_fields = set()
+
+        for key, fields in rows.items():
+            obj = existing.pop(tuple(_raw_value(value) for value in key), None)
+            if obj is None:
+                to_create.append(model_class(ballot_submission=self.ballotsub,
+                        **dict(zip(key_fields, key)), **fields))
+                continue
+
+            changed = [field for field, value in fields.items()
+                       if getattr(obj, opts.get_field(field).attname) != _raw_value(value)]
+            if changed:
+                for field in changed:
+                    setattr(obj, field, fields[field])
+                to_update.append(obj)
+                update_fields.update(changed)
+
+        if existing:
+            model_class.objects.filter(id__in=[obj.id for obj in existing.values()]).delete()
+        if to_update:
+            model_class.objects.bulk_update(to_update, sorted(update_fields))
+        if to_create:
+            model_class.objects.bulk_create(to_create)
 
     def get_defaults_fields(self, model, *args):
         """Collects fields defined in subclasses"""
@@ -404,6 +519,10 @@ class DebateResultByAdjudicator(BaseDebateResult):
                 return False
         return True
 
+    def canonical_form(self, identify=_pk):
+        sheets = sorted((identify(adj), sheet.canonical_form()) for adj, sheet in self.scoresheets.items())
+        return super().canonical_form(identify) + (tuple(sheets),)
+
     # --------------------------------------------------------------------------
     # Load and save methods
     # --------------------------------------------------------------------------
@@ -428,16 +547,11 @@ class DebateResultByAdjudicator(BaseDebateResult):
         for tsba in teamscorebyadjs:
             self.add_winner(tsba.debate_adjudicator.adjudicator, tsba.debate_team.side)
 
-    def save(self):
-        super().save()
-
-        for adj, sheet in self.scoresheets.items():
-            da = self.debateadjs[adj]
-            for side in self.sides:
-                dt = self.debateteams[side]
-                self.ballotsub.teamscorebyadj_set.update_or_create(
-                    debate_team=dt, debate_adjudicator=da,
-                    defaults=self.get_defaults_fields('teamscorebyadj', adj, side))
+    def get_rows(self):
+        return super().get_rows() + [('teamscorebyadj', ['debate_team', 'debate_adjudicator'], {
+            (self.debateteams[side], self.debateadjs[adj]): self.get_defaults_fields('teamscorebyadj', adj, side)
+            for adj in self.scoresheets for side in self.sides
+        })]
 
     # --------------------------------------------------------------------------
     # Data setting and retrieval
@@ -642,6 +756,11 @@ class DebateResultWithScoresMixin:
             return False
         return True
 
+    def canonical_form(self, identify=_pk):
+        speakers = tuple((self.speakers[side][pos] and identify(self.speakers[side][pos]), self.ghosts[side][pos])
+                for side in self.sides for pos in self.positions)
+        return super().canonical_form(identify) + (speakers,)
+
     # --------------------------------------------------------------------------
     # Load and save methods
     # --------------------------------------------------------------------------
@@ -665,14 +784,11 @@ class DebateResultWithScoresMixin:
             self.speakers[ss.debate_team.side][ss.position] = ss.speaker
             self.ghosts[ss.debate_team.side][ss.position] = ss.ghost
 
-    def save(self):
-        super().save()
-
-        for side in self.sides:
-            dt = self.debateteams[side]
-            for pos in self.positions:
-                self.ballotsub.speakerscore_set.update_or_create(debate_team=dt,
-                    position=pos, defaults=self.get_defaults_fields('speakerscore', side, pos))
+    def get_rows(self):
+        return super().get_rows() + [('speakerscore', ['debate_team', 'position'], {
+            (self.debateteams[side], pos): self.get_defaults_fields('speakerscore', side, pos)
+            for side in self.sides for pos in self.positions
+        })]
 
     # --------------------------------------------------------------------------
     # Data setting and retrieval
@@ -834,6 +950,9 @@ class ConsensusDebateResult(BaseDebateResult):
     def identical(self, other):
         return super().identical(other) and self.scoresheet.identical(other.scoresheet)
 
+    def canonical_form(self, identify=_pk):
+        return super().canonical_form(identify) + (self.scoresheet.canonical_form(),)
+
     # --------------------------------------------------------------------------
     # Team score fields
     # --------------------------------------------------------------------------
@@ -909,17 +1028,12 @@ class DebateResultByAdjudicatorWithScores(DebateResultWithScoresMixin, DebateRes
             self.set_score(ssba.debate_adjudicator.adjudicator,
                            ssba.debate_team.side, ssba.position, ssba.score)
 
-    def save(self):
-        super().save()
-
-        for adj, sheet in self.scoresheets.items():
-            da = self.debateadjs[adj]
-            for side in self.sides:
-                dt = self.debateteams[side]
-                for pos in self.positions:
-                    self.ballotsub.speakerscorebyadj_set.update_or_create(
-                        debate_team=dt, debate_adjudicator=da, position=pos,
-                        defaults=self.get_defaults_fields('speakerscorebyadj', adj, side, pos))
+    def get_rows(self):
+        return super().get_rows() + [('speakerscorebyadj', ['debate_team', 'debate_adjudicator', 'position'], {
+            (self.debateteams[side], self.debateadjs[adj], pos):
+                self.get_defaults_fields('speakerscorebyadj', adj, side, pos)
+            for adj in self.scoresheets for side in self.sides for pos in self.positions
+        })]
 
     def set_score(self, adjudicator, side, position, score):
         self.scoresheets[adjudicator].set_score(side, position, score)
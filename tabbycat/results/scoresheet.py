@@ -8,22 +8,105 @@ the responsiblity of the debate result classes.
 "Position", "side" and "team" take the same meanings as in result.py. However,
 since the scoresheet classes don't know about team identities, the word "team"
 should not appear in any of them.
+
+Scoresheets are created in large numbers when processing many ballots at once,
+so they keep scores in a flat list, and cache derived values like totals and
+winners until the scores or declared winners change. All changes must go
+through methods that call `self._invalidate()`.
 """
 
+from collections.abc import Mapping, MutableMapping
+from itertools import product
+
+_slot_layouts = {}
+
+
+def _slot_layout(sides, positions):
+    """Returns a dict mapping each (side, position) to an index in a flat list
+    of scores, ordered by side then position. Layouts are shared between
+    scoresheets with the same sides and positions, which in practice means all
+    scoresheets in a tournament."""
+    key = (tuple(sides), tuple(positions))
+    layout = _slot_layouts.get(key)
+    if layout is None:
+        layout = {slot: i for i, slot in enumerate(product(*key))}
+        layout = _slot_layouts.setdefault(key, layout)
+    return layout
+
+
+class ScoresView(Mapping):
+    """Read-write view of the scores in a scoresheet, as a mapping of sides to
+    mappings of positions to scores, i.e. `scores[side][position]`."""
+
+    def __init__(self, scoresheet):
+        self.scoresheet = scoresheet
+
+    def __getitem__(self, side):
+        if side not in self.scoresheet.sides:
+            raise KeyError(side)
+        return SideScoresView(self.scoresheet, side)
+
+    def __iter__(self):
+        return iter(self.scoresheet.sides)
+
+    def __len__(self):
+        return len(self.scoresheet.sides)
+
+    def __repr__(self):
+        return repr({side: dict(scores) for side, scores in self.items()})
+
+
+class SideScoresView(MutableMapping):
+    """Read-write view of the scores for one side in a scoresheet."""
+
+    def __init__(self, scoresheet, side):
+        self.scoresheet = scoresheet
+        self.side = side
+
+    def __getitem__(self, position):
+        return self.scoresheet.get_score(self.side, position)
+
+    def __setitem__(self, position, score):
+        self.scoresheet.set_score(self.side, position, score)
+
+    def __delitem__(self, position):
+        raise TypeError("Positions can't be removed from a scoresheet")
+
+    def __iter__(self):
+        return iter(self.scoresheet.positions)
+
+    def __len__(self):
+        return len(self.scoresheet.positions)
+
+    def __repr__(self):
+        return repr(dict(self))
+
 
 class BaseScoresheet:
 
     uses_declared_winners = False
     uses_scores = False
 
+    _winners = None  # cache
+
     def __init__(self, *args, **kwargs):
         """Absorb leftover arguments."""
         pass
 
+    def _invalidate(self):
+        """Clears cached derived values. Subclasses that cache other values
+        should extend this method."""
+        self._winners = None
+
     def is_complete(self):
         """Base implementation. Does nothing."""
         return True
 
+    def canonical_form(self):
+        """Returns a tuple of plain values that is equal for two scoresheets if
+        and only if they are identical. Subclasses should extend this method."""
+        return ()
+
     def is_valid(self):
         return self.is_complete()
 
@@ -34,9 +117,9 @@ class BaseScoresheet:
     def winners(self):
         """Returns {'aff'} is the affirmative team won, and {'neg'} if the negative
         team won. `self._get_winners()` must be implemented by subclasses."""
-        if not self.is_complete():
-            return set()
-        return self._get_winners()
+        if self._winners is None:
+            self._winners = frozenset(self._get_winners()) if self.is_complete() else frozenset()
+        return self._winners
 
 
 class ScoresMixin:
@@ -47,30 +130,57 @@ class ScoresMixin:
 
     uses_scores = True
 
+    _totals = None  # cache
+
     def __init__(self, positions, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.positions = positions
-        self.scores = {side: dict.fromkeys(self.positions, None) for side in self.sides}
+        self._slots = _slot_layout(self.sides, positions)
+        self._scores = [None] * len(self._slots)
+        self._missing = len(self._slots)
+
+    @property
+    def scores(self):
+        """Scores as a nested mapping, `scores[side][position]`. Assigning to
+        this sets the score, but `set_score()` is faster."""
+        return ScoresView(self)
+
+    def _invalidate(self):
+        super()._invalidate()
+        self._totals = None
 
     def is_complete(self):
-        scores_complete = all(self.scores[s][p] is not None for s in self.sides
-                for p in self.positions)
-        return super().is_complete() and scores_complete
+        return super().is_complete() and self._missing == 0
 
     def set_score(self, side, position, score):
-        self.scores[side][position] = score
+        i = self._slots[(side, position)]
+        self._missing += (score is None) - (self._scores[i] is None)
+        self._scores[i] = score
+        self._invalidate()
 
     def get_score(self, side, position):
-        return self.scores[side][position]
+        return self._scores[self._slots[(side, position)]]
 
     def get_total(self, side):
-        scores = [self.scores[side][p] for p in self.positions]
-        if None in scores:
-            return None
-        return sum(scores)
+        if self._totals is None:
+            n = len(self.positions)
+            self._totals = {}
+            for i, s in enumerate(self.sides):
+                scores = self._scores[i*n:(i+1)*n]
+                self._totals[s] = None if None in scores else sum(scores)
+        return self._totals[side]
 
     def identical(self, other):
-        return super().identical(other) and self.scores == other.scores
+        if not super().identical(other):
+            return False
+        if self._slots is other._slots:
+            return self._scores == other._scores
+        return self.scores == other.scores
+
+    def canonical_form(self):
+        # scores might be ints or floats depending on where they came from
+        scores = tuple(None if score is None else float(score) for score in self._scores)
+        return super().canonical_form() + (scores,)
 
 
 class DeclaredWinnersMixin:
@@ -88,15 +198,20 @@ class DeclaredWinnersMixin:
     def add_declared_winner(self, winner):
         assert winner in self.sides or winner is None, "Declared winner must be one of: " + ", ".join(map(repr, self.sides))
         self.declared_winners.add(winner)
+        self._invalidate()
 
     def set_declared_winners(self, winners):
         winners = set(winners)
         assert winners <= set(self.sides) or len(winners) == 0, "Declared winners must be in: " + ", ".join(map(repr, self.sides))
         self.declared_winners = winners
+        self._invalidate()
 
     def identical(self, other):
         return super().identical(other) and set(self.declared_winners) == set(other.declared_winners)
 
+    def canonical_form(self):
+        return super().canonical_form() + (tuple(sorted(self.declared_winners, key=str)),)
+
     def _get_winners(self):
         assert len(self.declared_winners) == self.number_winners, "There can only be this number of winners: %d" % self.number_winners
         return self.declared_winners
@@ -168,26 +283,33 @@ class BaseBPScoresheet(BaseScoresheet):
 
 class BPScoresheet(ScoresMixin, BaseBPScoresheet):
 
+    _ranked_sides = None  # cache
+
+    def _invalidate(self):
+        super()._invalidate()
+        self._ranked_sides = None
+
     def is_valid(self):
         if not super().is_valid():
             return False
         totals = [self.get_total(side) for side in self.sides]
         return len(set(totals)) == len(totals)
 
+    def _get_ranked_sides(self):
+        # Totals are all different if the scoresheet is valid, so there are no ties
+        if self._ranked_sides is None:
+            self._ranked_sides = sorted(self.sides, key=self.get_total, reverse=True)
+        return self._ranked_sides
+
     def rank(self, side):
         if not self.is_valid():
             return None
-        totals = [self.get_total(side) for side in self.sides]
-        totals.sort(reverse=True)
-        side_total = self.get_total(side)
-        return totals.index(side_total) + 1
+        return self._get_ranked_sides().index(side) + 1
 
     def ranked_sides(self):
         if not self.is_valid():
             return None
-        total_by_side = [(self.get_total(side), side) for side in self.sides]
-        total_by_side.sort(reverse=True)
-        return [side for total, side in total_by_side]
+        return list(self._get_ranked_sides())
 
     def winners(self):
         return set()
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from draw.models import Debate
+
+from .utils import adjust_result_status_counts, refresh_result_status_counts
+
+
+@receiver(post_init, sender=Debate)
+def remember_result_status(sender, instance, **kwargs):
+    """Remembers the round and result status of the debate as loaded (or last
+    saved), so that the counts can be adjusted when it's saved."""
+    # use __dict__, since these fields might be deferred
+    instance._counted_result_status = (instance.__dict__.get('round_id'), instance.__dict__.get('result_status'))
+
+
+@receiver(post_save, sender=Debate)
+def update_result_status_counts(sender, instance, created, **kwargs):
+    old_round_id, old_status = instance._counted_result_status
+    new_round_id, new_status = instance.round_id, instance.result_status
+
+    if created:
+        adjust_result_status_counts(new_round_id, None, new_status)
+    elif old_round_id is None or old_status is None:
+        # fields were deferred, so we don't know what changed
+        refresh_result_status_counts(new_round_id)
+    elif old_round_id != new_round_id:
+        adjust_result_status_counts(old_round_id, old_status, None)
+        adjust_result_status_counts(new_round_id, None, new_status)
+    elif old_status != new_status:
+        adjust_result_status_counts(new_round_id, old_status, new_status)
+
+    instance._counted_result_status = (new_round_id, new_status)
+
+
+@receiver(post_delete, sender=Debate)
+def remove_from_result_status_counts(sender, instance, **kwargs):
+    round_id, status = instance._counted_result_status
+    if round_id is not None and status is not None:
+        adjust_result_status_counts(round_id, status, None)
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from draw.models import Debate
+from results.ingest import BallotIngester, BallotIngestError
+from results.models import BallotSubmission
+from results.prefetch import populate_results
+from tournaments.models import Tournament
+
+
+class TestBallotIngester(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+        self.originals = list(BallotSubmission.objects.filter(
+            debate__round=self.round, confirmed=True).select_related('debate__round').order_by('debate_id'))
+        populate_results(self.originals, self.tournament)
+
+    def ballot_from_result(self, ballotsub):
+        """Converts an existing ballot into the ingestion format."""
+        result = ballotsub.result
+        sheets = []
+        for adj, scoresheet in result.scoresheets.items():
+            sheets.append({'adjudicator': adj.id, 'teams': [{
+                'side': side,
+                'speeches': [{'speaker': result.speakers[side][pos].id, 'score': scoresheet.get_score(side, pos),
+                              'ghost': result.ghosts[side][pos]} for pos in result.positions],
+            } for side in result.sides]})
+        return {'debate': ballotsub.debate_id, 'motion': ballotsub.motion_id, 'confirmed': True, 'sheets': sheets}
+
+    def test_ingest(self):
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals]
+        outcomes = BallotIngester(self.tournament).ingest(ballots)
+        self.assertFalse([outcome for outcome in outcomes if isinstance(outcome, BallotIngestError)])
+
+        ingested = list(BallotSubmission.objects.filter(id__in=[b.id for b in outcomes]).order_by('debate_id'))
+        populate_results(ingested, self.tournament)
+        for original, new in zip(self.originals, ingested):
+            self.assertTrue(new.confirmed)
+            self.assertEqual(new.version, original.version + 1)
+            self.assertEqual(new.motion_id, original.motion_id)
+            self.assertTrue(new.result.identical(original.result))
+            self.assertEqual(new.result_hash, new.result.fingerprint())
+            self.assertEqual(new.teamscore_set.get(debate_team__side='aff').win,
+                             original.teamscore_set.get(debate_team__side='aff').win)
+
+        self.assertFalse(BallotSubmission.objects.filter(id__in=[b.id for b in self.originals], confirmed=True).exists())
+        self.assertFalse(Debate.objects.filter(round=self.round).exclude(result_status=Debate.STATUS_CONFIRMED).exists())
+
+    def test_invalid_ballots_reported(self):
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals[:3]]
+        ballots[0]['sheets'].pop()
+        ballots[1]['debate'] = 0
+        outcomes = BallotIngester(self.tournament).ingest(ballots + ["not a ballot"])
+        self.assertIsInstance(outcomes[0], BallotIngestError)
+        self.assertIsInstance(outcomes[1], BallotIngestError)
+        self.assertIsInstance(outcomes[2], BallotSubmission)
+        self.assertIsInstance(outcomes[3], BallotIngestError)
+        self.assertTrue(BallotSubmission.objects.filter(id=outcomes[2].id).exists())
+
+    def test_caches_cleared_after_transaction(self):
+        depth = len(connection.savepoint_ids)
+        depths = []
+
+        def record_depth(*args, **kwargs):
+            depths.append(len(connection.savepoint_ids))
+
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals[:2]]
+        with mock.patch('results.ingest.invalidate_liveness', side_effect=record_depth), \
+                mock.patch('results.ingest.invalidate_anticipated_draws', side_effect=record_depth), \
+                mock.patch('results.ingest.bump_versions', side_effect=record_depth):
+            BallotIngester(self.tournament).ingest(ballots)
+        self.assertEqual(depths, [depth] * 3)
+
+    def test_scores_checked_against_preferences(self):
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals[:3]]
+        ballots[0]['sheets'][0]['teams'][0]['speeches'][0]['score'] = self.tournament.pref('score_max') + 1
+        ballots[1]['sheets'][0]['teams'][0]['speeches'][0]['score'] += self.tournament.pref('score_step') / 2
+        outcomes = BallotIngester(self.tournament).ingest(ballots)
+        self.assertIsInstance(outcomes[0], BallotIngestError)
+        self.assertIsInstance(outcomes[1], BallotIngestError)
+        self.assertIsInstance(outcomes[2], BallotSubmission)
+
+    def test_duplicate_speakers_rejected(self):
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals[:2]]
+        for sheet in ballots[0]['sheets']:
+            speeches = sheet['teams'][0]['speeches']
+            speeches[1]['speaker'] = speeches[0]['speaker']
+        outcomes = BallotIngester(self.tournament).ingest(ballots)
+        self.assertIsInstance(outcomes[0], BallotIngestError)
+        self.assertIn("substantive speeches", str(outcomes[0]))
+        self.assertIsInstance(outcomes[1], BallotSubmission)
+
+        # unless the second speech is marked as a duplicate
+        for sheet in ballots[0]['sheets']:
+            sheet['teams'][0]['speeches'][1]['ghost'] = True
+        outcomes = BallotIngester(self.tournament).ingest(ballots[:1])
+        self.assertIsInstance(outcomes[0], BallotSubmission)
+
+    def test_queries_independent_of_batch_size(self):
+        ballots = [self.ballot_from_result(ballotsub) for ballotsub in self.originals]
+        counts = []
+        for batch in [ballots[:2], ballots]:
+            with CaptureQueriesContext(connection) as context:
+                BallotIngester(self.tournament).ingest(batch)
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
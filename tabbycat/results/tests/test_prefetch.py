@@ -0,0 +1,43 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from results.models import BallotSubmission
+from results.prefetch import iterate_results, populate_results
+from results.result import DebateResult
+from tournaments.models import Tournament
+
+
+class TestIterateResults(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.ballotsubs = BallotSubmission.objects.filter(debate__round__tournament=self.tournament)
+
+    def test_same_as_individual_load(self):
+        results = list(iterate_results(self.ballotsubs, self.tournament, chunk_size=5))
+        self.assertEqual(len(results), self.ballotsubs.count())
+        self.assertEqual([(r.debate.round.seq, r.ballotsub.id) for r in results],
+                         sorted((r.debate.round.seq, r.ballotsub.id) for r in results))
+        for result in results:
+            loaded = DebateResult(BallotSubmission.objects.get(id=result.ballotsub.id))
+            self.assertTrue(result.identical(loaded))
+
+    def test_same_as_populate_results(self):
+        ballotsubs = list(self.ballotsubs.select_related('debate__round'))
+        populate_results(ballotsubs, self.tournament)
+        expected = {b.id: b.result.fingerprint() for b in ballotsubs}
+        streamed = {r.ballotsub.id: r.fingerprint() for r in iterate_results(self.ballotsubs, chunk_size=7)}
+        self.assertEqual(streamed, expected)
+
+    def test_queries_per_chunk(self):
+        counts = []
+        for chunk_size in [8, 16]:
+            with CaptureQueriesContext(connection) as context:
+                for result in iterate_results(self.ballotsubs, self.tournament, chunk_size=chunk_size):
+                    result.fingerprint()
+            counts.append(len(context))
+        # with half as many chunks, there should be (nearly) half as many queries
+        self.assertLessEqual(counts[1] * 2, counts[0] + 2)
@@ -1,11 +1,17 @@
 import logging
+from unittest import mock
 
-from django.test import TestCase
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from draw.models import Debate, DebateTeam
 from participants.models import Adjudicator, Institution, Speaker, Team
+from results.admin import SpeakerScoreByAdjAdmin
 from results.models import BallotSubmission, SpeakerScore, SpeakerScoreByAdj, TeamScore
 from results.result import ConsensusDebateResultWithScores, DebateResultByAdjudicatorWithScores, ResultError    # absolute import to keep logger's name consistent
+from results.utils import populate_identical_ballotsub_lists
 from tournaments.models import Round, Tournament
 from utils.tests import suppress_logs
 from venues.models import Venue
@@ -120,8 +126,7 @@ class BaseTestDebateResult(TestCase):
 
     def set_tournament_preference(self, section, name, value):
         self.tournament.preferences[section + '__' + name] = value
-        if name in self.tournament._prefs:    # clear model-level cache
-            del self.tournament._prefs[name]
+        self.tournament._prefs = None    # clear model-level cache
 
     def get_result(self):
         ballotsub = BallotSubmission.objects.get(debate=self.debate, confirmed=True)
@@ -146,6 +151,11 @@ class BaseTestDebateResult(TestCase):
         return self.debate_result_class(ballotsub)
 
     def save_complete_result(self, testdata, post_create=None):
+        result = self.fill_complete_result(testdata, post_create)
+        with suppress_logs('results.result', logging.WARNING):
+            result.save()
+
+    def fill_complete_result(self, testdata, post_create=None):
 
         nspeakers = testdata['num_speakers_per_team']
 
@@ -161,9 +171,7 @@ class BaseTestDebateResult(TestCase):
             # ghost fields should be False by default
 
         self.save_scores_to_result(testdata, result)
-
-        with suppress_logs('results.result', logging.WARNING):
-            result.save()
+        return result
 
     def _get_speakerscore_in_db(self, side, pos):
         return SpeakerScore.objects.get(
@@ -619,6 +627,64 @@ class TestVotingDebateResultWithScores(GeneralSpeakerTestsMixin, BaseTestDebateR
                 self.assertAlmostEqual(self._get_teamscore_in_db(side).margin, margin)
                 self.assertAlmostEqual(result.teamscore_field_margin(side), margin)
 
+    def test_save_queries_independent_of_adjudicators(self):
+        self.save_complete_result(self.testdata['high'])  # load preferences into cache
+        counts = {}
+        for key in ['solo', 'high']:
+            result = self.fill_complete_result(self.testdata[key])
+            with CaptureQueriesContext(connection) as context:
+                with suppress_logs('results.result', logging.WARNING):
+                    result.save()
+            counts[key] = len(context)
+        self.assertEqual(counts['solo'], counts['high'])
+
+    def test_save_removes_stale_scores(self):
+        self.save_complete_result(self.testdata['high'])
+        ballotsub = BallotSubmission.objects.get(debate=self.debate, confirmed=True)
+        self.assertEqual(ballotsub.speakerscorebyadj_set.count(), 3 * 2 * 4)
+
+        # Remove an adjudicator from the panel and save the result again
+        self.debate.adjudicators.panellists = self.adjs[1:2]
+        with suppress_logs('adjallocation.allocation', logging.INFO):
+            self.debate.adjudicators.save()
+        result = self.get_result()
+        with suppress_logs('results.result', logging.WARNING):
+            result.save()
+
+        self.assertEqual(ballotsub.speakerscorebyadj_set.count(), 2 * 2 * 4)
+        self.assertEqual(ballotsub.teamscorebyadj_set.count(), 2 * 2)
+        self.assertFalse(ballotsub.speakerscorebyadj_set.filter(debate_adjudicator__adjudicator=self.adjs[2]).exists())
+        self.assertEqual(ballotsub.teamscore_set.count(), 2)
+        self.assertEqual(ballotsub.speakerscore_set.count(), 2 * 4)
+
+    def test_identical_ballotsubs(self):
+        for key in ['high', 'low', 'high']:
+            self.save_complete_result(self.testdata[key])
+        ballotsubs = list(self.debate.ballotsubmission_set.order_by('version'))
+        self.assertEqual(ballotsubs[0].result_hash, ballotsubs[2].result_hash)
+        self.assertNotEqual(ballotsubs[0].result_hash, ballotsubs[1].result_hash)
+
+        # ballots saved without a fingerprint should have it filled in
+        self.debate.ballotsubmission_set.filter(version=1).update(result_hash='')
+        ballotsubs = list(self.debate.ballotsubmission_set.order_by('version'))
+        populate_identical_ballotsub_lists(ballotsubs)
+        self.assertEqual([b.identical_ballotsub_versions for b in ballotsubs], [[3], [], [1]])
+        self.assertEqual(self.debate.ballotsubmission_set.get(version=1).result_hash, ballotsubs[2].result_hash)
+
+    def test_identical_ballotsubs_after_admin_edit(self):
+        for key in ['high', 'high']:
+            self.save_complete_result(self.testdata[key])
+
+        ssba = SpeakerScoreByAdj.objects.filter(ballot_submission__version=1, ballot_submission__debate=self.debate).first()
+        ssba.score += 1
+        model_admin = SpeakerScoreByAdjAdmin(SpeakerScoreByAdj, site)
+        form = mock.Mock(initial={'ballot_submission': ssba.ballot_submission_id})
+        model_admin.save_model(RequestFactory().post('/'), ssba, form, True)
+
+        ballotsubs = list(self.debate.ballotsubmission_set.order_by('version'))
+        populate_identical_ballotsub_lists(ballotsubs)
+        self.assertEqual([b.identical_ballotsub_versions for b in ballotsubs], [[], []])
+
     @incomplete_test
     def test_unfilled_scoresheet_score(self, result):
         result.scoresheets[self.adjs[0]].scores["aff"][1] = None
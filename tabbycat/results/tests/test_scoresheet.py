@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from ..scoresheet import (BPScoresheet, HighPointWinsRequiredScoresheet,
@@ -193,3 +194,144 @@ class TestBPScoresheets(unittest.TestCase):
             for position, score in zip(self.positions, scores_for_side):
                 self.assertEqual(scoresheet.get_score(side, position), score)
         self.assertEqual(scoresheet.is_valid(), testdata['ranks'] is not None)
+
+
+class ReferenceScoresheet:
+    """Plain dict-based statement of what each scoresheet class should compute,
+    recalculated from scratch on every call, to check the scoresheet classes
+    (which store scores in flat lists and cache totals and winners) against."""
+
+    def __init__(self, sides, positions):
+        self.sides = sides
+        self.positions = positions
+        self.scores = {side: dict.fromkeys(positions) for side in sides}
+        self.declared_winners = set()
+
+    def total(self, side):
+        scores = list(self.scores[side].values())
+        return None if None in scores else sum(scores)
+
+    def scores_complete(self):
+        return all(score is not None for scores in self.scores.values() for score in scores.values())
+
+    def declared_complete(self):
+        return self.declared_winners <= set(self.sides) and len(self.declared_winners) == 1
+
+    def is_complete(self, cls):
+        if cls is HighPointWinsRequiredScoresheet or cls is BPScoresheet:
+            return self.scores_complete()
+        return self.scores_complete() and self.declared_complete()
+
+    def winners(self, cls):
+        if not self.is_complete(cls) or cls is BPScoresheet:
+            return set()
+        if cls is LowPointWinsAllowedScoresheet:
+            return self.declared_winners
+        aff, neg = self.total('aff'), self.total('neg')
+        if cls is HighPointWinsRequiredScoresheet:
+            return {'aff'} if aff > neg else {'neg'} if neg > aff else set()
+        if aff >= neg and 'aff' in self.declared_winners:
+            return {'aff'}
+        if neg >= aff and 'neg' in self.declared_winners:
+            return {'neg'}
+        return set()
+
+    def is_valid(self, cls):
+        if cls is BPScoresheet:
+            totals = [self.total(side) for side in self.sides]
+            return self.is_complete(cls) and len(set(totals)) == len(totals)
+        return self.is_complete(cls) and len(self.winners(cls)) == 1
+
+    def ranked_sides(self):
+        return sorted(self.sides, key=self.total, reverse=True)
+
+    def build(self, cls):
+        scoresheet = cls(self.positions)
+        for side in self.sides:
+            for position, score in self.scores[side].items():
+                scoresheet.set_score(side, position, score)
+        if scoresheet.uses_declared_winners:
+            scoresheet.set_declared_winners(self.declared_winners)
+        return scoresheet
+
+
+class TestScoresheetsAgainstReference(unittest.TestCase):
+    """Applies random sequences of changes to scoresheets, checking after each
+    change that everything the scoresheet reports agrees with the reference."""
+
+    # few distinct scores, so that tied totals are common
+    score_choices = [None, 70, 70.5, 71, 72, 75.0]
+    number_of_sequences = 200
+    sequence_length = 20
+
+    def check(self, scoresheet, reference, cls):
+        for side in reference.sides:
+            self.assertEqual(scoresheet.get_total(side), reference.total(side))
+            for position in reference.positions:
+                self.assertEqual(scoresheet.get_score(side, position), reference.scores[side][position])
+        self.assertEqual(scoresheet.scores, reference.scores)
+        self.assertEqual(scoresheet.is_complete(), reference.is_complete(cls))
+        self.assertEqual(scoresheet.winners(), reference.winners(cls))
+        self.assertEqual(scoresheet.is_valid(), reference.is_valid(cls))
+
+        if cls is BPScoresheet:
+            expected = reference.ranked_sides() if reference.is_valid(cls) else None
+            self.assertEqual(scoresheet.ranked_sides(), expected)
+            for side in reference.sides:
+                self.assertEqual(scoresheet.rank(side), expected and expected.index(side) + 1)
+        elif reference.is_valid(cls):
+            for side in reference.sides:
+                self.assertEqual(scoresheet.rank(side), 1 if side in reference.winners(cls) else 2)
+
+        rebuilt = reference.build(cls)
+        self.assertTrue(scoresheet.identical(rebuilt))
+        self.assertEqual(scoresheet.canonical_form(), rebuilt.canonical_form())
+
+    def change(self, rng, scoresheet, reference):
+        side = rng.choice(reference.sides)
+        if scoresheet.uses_declared_winners and rng.random() < 0.3:
+            if rng.random() < 0.5:
+                scoresheet.add_declared_winner(side)
+                reference.declared_winners.add(side)
+            else:
+                winners = set(rng.sample(reference.sides, rng.randint(0, 2)))
+                scoresheet.set_declared_winners(winners)
+                reference.declared_winners = winners
+            return
+
+        position = rng.choice(reference.positions)
+        score = rng.choice(self.score_choices)
+        if rng.random() < 0.5:
+            scoresheet.set_score(side, position, score)
+        else:
+            scoresheet.scores[side][position] = score
+        reference.scores[side][position] = score
+
+    def run_sequences(self, cls, sides, positions):
+        rng = random.Random(cls.__name__)
+        for i in range(self.number_of_sequences):
+            scoresheet = cls(positions)
+            reference = ReferenceScoresheet(sides, positions)
+            self.check(scoresheet, reference, cls)
+            for j in range(self.sequence_length):
+                self.change(rng, scoresheet, reference)
+                with self.subTest(sequence=i, step=j):
+                    self.check(scoresheet, reference, cls)
+
+    def test_high_points_required(self):
+        self.run_sequences(HighPointWinsRequiredScoresheet, ['aff', 'neg'], [1, 2, 4])
+
+    def test_tied_points_allowed(self):
+        self.run_sequences(TiedPointWinsAllowedScoresheet, ['aff', 'neg'], [1, 2, 4])
+
+    def test_low_points_allowed(self):
+        self.run_sequences(LowPointWinsAllowedScoresheet, ['aff', 'neg'], [1, 2, 4])
+
+    def test_bp(self):
+        self.run_sequences(BPScoresheet, ['og', 'oo', 'cg', 'co'], [1, 2])
+
+    def test_unknown_slot(self):
+        scoresheet = BPScoresheet([1, 2])
+        self.assertRaises(KeyError, scoresheet.set_score, 'aff', 1, 75)
+        self.assertRaises(KeyError, scoresheet.set_score, 'og', 3, 75)
+        self.assertRaises(KeyError, scoresheet.get_total, 'aff')
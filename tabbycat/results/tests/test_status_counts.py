@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from draw.models import Debate
+from results.utils import count_result_statuses, get_result_status_stats
+from tournaments.models import Tournament
+
+
+class TestResultStatusCounts(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+
+    def assertCountsCorrect(self):  # noqa: N802
+        self.assertEqual(get_result_status_stats(self.round), count_result_statuses(self.round.id))
+
+    def test_counts(self):
+        self.assertCountsCorrect()
+        with self.assertNumQueries(1):
+            stats = get_result_status_stats(self.round)
+        self.assertEqual(sum(stats.values()), self.round.debate_set.count())
+
+    def test_save_updates_counts(self):
+        get_result_status_stats(self.round)
+        debates = list(self.round.debate_set.all())
+        debates[0].result_status = Debate.STATUS_POSTPONED
+        debates[0].save()
+        self.assertCountsCorrect()
+        debates[0].save()  # no change
+        self.assertCountsCorrect()
+        debates[1].result_status = Debate.STATUS_DRAFT
+        debates[1].save()
+        debates[1].result_status = Debate.STATUS_NONE
+        debates[1].save()
+        self.assertCountsCorrect()
+
+    def test_create_and_delete_update_counts(self):
+        get_result_status_stats(self.round)
+        debate = Debate.objects.create(round=self.round, result_status=Debate.STATUS_DRAFT)
+        self.assertCountsCorrect()
+        self.round.debate_set.exclude(id=debate.id).first().delete()
+        self.assertCountsCorrect()
+        debate.round = self.tournament.round_set.get(seq=3)
+        debate.save()
+        self.assertCountsCorrect()
+        self.assertEqual(get_result_status_stats(debate.round), count_result_statuses(debate.round_id))
+
+    def test_deferred_status(self):
+        get_result_status_stats(self.round)
+        debate = self.round.debate_set.only('id', 'round').first()
+        debate.result_status = Debate.STATUS_POSTPONED
+        debate.save()
+        self.assertCountsCorrect()
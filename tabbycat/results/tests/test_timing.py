@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings, TestCase
+from django.utils import timezone
+
+from results.models import BallotEntryTiming, BallotSubmission
+from results.timing import percentile
+from utils.tests import CompletedTournamentTestMixin
+
+
+class TestPercentile(TestCase):
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 90), 5)
+        self.assertEqual(percentile(values, 100), 5)
+        self.assertIsNone(percentile([], 50))
+
+
+class TestBallotEntryTiming(CompletedTournamentTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # motions are left out so that the form data below is simpler
+        self.tournament.preferences['motions__enable_motions'] = False
+        user = get_user_model().objects.create(username='test_admin', is_superuser=True)
+        self.client.force_login(user)
+        self.ballotsub = BallotSubmission.objects.filter(debate__round__seq=4, confirmed=True).first()
+
+    @override_settings(BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE=1)
+    def test_timings_recorded(self):
+        url = self.reverse_url('results-ballotset-edit', pk=self.ballotsub.pk)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        timing = BallotEntryTiming.objects.get()
+        self.assertEqual(timing.action, BallotEntryTiming.ACTION_DISPLAY)
+        self.assertEqual(timing.round, self.ballotsub.debate.round)
+        self.assertEqual(set(timing.durations), {'form', 'total'})
+
+        form = response.context['form']
+        data = {field.html_name: field.value() for field in form if field.value() is not None}
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        timing = BallotEntryTiming.objects.latest('id')
+        self.assertEqual(timing.action, BallotEntryTiming.ACTION_CONFIRM)
+        self.assertEqual(set(timing.durations), {'form', 'validation', 'save', 'broadcast', 'total'})
+        self.assertEqual(set(timing.queries), set(timing.durations))
+        self.assertGreater(timing.queries['save'], 0)
+        self.assertGreaterEqual(timing.queries['total'], sum(n for phase, n in timing.queries.items() if phase != 'total'))
+
+        data['debate_result_status'] = 'nonexistent'
+        self.client.post(url, data)
+        self.assertEqual(BallotEntryTiming.objects.latest('id').action, BallotEntryTiming.ACTION_INVALID)
+
+    @override_settings(BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE=0)
+    def test_page_loads_sampled(self):
+        url = self.reverse_url('results-ballotset-edit', pk=self.ballotsub.pk)
+        response = self.client.get(url)
+        self.assertFalse(BallotEntryTiming.objects.exists())
+
+        form = response.context['form']
+        data = {field.html_name: field.value() for field in form if field.value() is not None}
+        self.client.post(url, data)
+        self.assertEqual(BallotEntryTiming.objects.get().action, BallotEntryTiming.ACTION_CONFIRM)
+
+    def test_prune(self):
+        for days in [1, 40]:
+            timing = BallotEntryTiming.objects.create(round=self.ballotsub.debate.round,
+                action=BallotEntryTiming.ACTION_SAVE, submitter_type=BallotSubmission.SUBMITTER_TABROOM)
+            BallotEntryTiming.objects.filter(id=timing.id).update(timestamp=timezone.now() - timedelta(days=days))
+        call_command('pruneballottimings', '-t', self.tournament.slug, '--days', '30', stdout=StringIO())
+        self.assertEqual(BallotEntryTiming.objects.count(), 1)
+
+    def test_timings_view(self):
+        for action in [BallotEntryTiming.ACTION_SAVE, BallotEntryTiming.ACTION_CONFIRM]:
+            BallotEntryTiming.objects.create(round=self.ballotsub.debate.round, action=action,
+                submitter_type=BallotSubmission.SUBMITTER_TABROOM,
+                durations={'save': 10.0, 'total': 20.0}, queries={'save': 5, 'total': 8})
+        response = self.client.get(self.reverse_url('results-entry-timings'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['tables_count'], [0])
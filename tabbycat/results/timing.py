@@ -0,0 +1,96 @@
+"""Timing of ballot entry requests.
+
+The ballot entry views record how long each phase of handling a request takes,
+and how many database queries it makes, in a BallotEntryTiming. The phases are:
+
+- "form": constructing the ballot set form
+- "validation": validating the submitted form
+- "save": saving the ballot submission and result, and logging the action
+- "broadcast": notifying consumers (websockets) and queueing email receipts
+- "total": the whole request, including rendering the page
+
+Every submission is recorded, but only a sample of page loads (set by the
+`BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE` setting), since there are many more
+of them, including from the public. Timings older than
+`BALLOT_ENTRY_TIMING_RETENTION_DAYS` are removed by `prune_timings()`, which the
+`pruneballottimings` command runs.
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from math import ceil
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import BallotEntryTiming
+
+PHASES = (
+    ('form', _("Form construction")),
+    ('validation', _("Validation")),
+    ('save', _("Save")),
+    ('broadcast', _("Broadcast")),
+    ('total', _("Total")),
+)
+
+
+class PhaseTimer:
+    """Accumulates the time taken and the number of database queries made in
+    each phase. Phases can be nested, and a phase can be entered more than
+    once, in which case the times and counts are added together."""
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = {}
+
+    @contextmanager
+    def phase(self, name):
+        count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                yield
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+            self.durations[name] = self.durations.get(name, 0) + elapsed
+            self.queries[name] = self.queries.get(name, 0) + count
+
+    def save(self, round, action, submitter_type):
+        return BallotEntryTiming.objects.create(round=round, action=action, submitter_type=submitter_type,
+            durations=self.durations, queries=self.queries)
+
+
+def should_record(action):
+    """Returns whether a request with the given action should be recorded."""
+    if action == BallotEntryTiming.ACTION_DISPLAY:
+        return random.random() < settings.BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE
+    return True
+
+
+def prune_timings(tournament, days=None):
+    """Deletes timings in `tournament` older than `days` days (by default, the
+    `BALLOT_ENTRY_TIMING_RETENTION_DAYS` setting). Returns the number deleted."""
+    if days is None:
+        days = settings.BALLOT_ENTRY_TIMING_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    count, _ = BallotEntryTiming.objects.filter(round__tournament=tournament, timestamp__lt=cutoff).delete()
+    return count
+
+
+def percentile(values, p):
+    """Returns the `p`th percentile of `values` using the nearest-rank method,
+    or None if there are no values."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(ceil(p / 100 * len(values)), 1) - 1]
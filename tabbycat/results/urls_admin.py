@@ -8,6 +8,10 @@ urlpatterns = [
         views.AdminResultsEntryForRoundView.as_view(),
         name='results-round-list'),
 
+    path('timings/',
+        views.BallotEntryTimingsView.as_view(),
+        name='results-entry-timings'),
+
     # Inline Actions
     path('round/<int:round_seq>/postpone/<int:debate_id>/',
         views.PostponeDebateView.as_view(),
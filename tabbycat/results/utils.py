@@ -1,8 +1,8 @@
 import logging
-from itertools import combinations
 
 from django.contrib.humanize.templatetags.humanize import ordinal
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, F
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy
 
@@ -86,15 +86,13 @@ def set_float_or_int(number, step_value):
         return number
 
 
-def get_result_status_stats(round):
-    """Returns a dict where keys are result statuses of debates; values are the
-    number of debates in the round with that status.
-
-    There is also an additional key 'B' that denotes those with ballots checked
-    in, but whose results are not entered."""
+def count_result_statuses(round_id):
+    """Counts the debates in the round with each result status, returning a dict
+    where keys are result statuses and values are counts."""
 
     # query looks like: [{'result_status': 'C', 'result_status__count': 8}, ...]
-    query = round.debate_set.values('result_status').annotate(Count('result_status')).order_by()
+    query = Debate.objects.filter(round_id=round_id).values('result_status').annotate(
+        Count('result_status')).order_by()
 
     # The query doesn't return zeroes where appropriate - for statuses with no
     # debates, it just omits the item altogether. So initialize a dict:
@@ -106,27 +104,86 @@ def get_result_status_stats(round):
     return stats
 
 
+def get_result_status_stats(round):
+    """Returns a dict where keys are result statuses of debates; values are the
+    number of debates in the round with that status.
+
+    This reads the counts kept in ResultStatusCount, so takes one query, unless
+    the round's counts haven't been stored yet, in which case it counts them."""
+
+    from .models import ResultStatusCount
+    stats = dict(ResultStatusCount.objects.filter(round=round).values_list('status', 'count'))
+    if not stats:
+        return refresh_result_status_counts(round.id)
+
+    choices = [code for code, name in Debate.STATUS_CHOICES]
+    return {status: stats.get(status, 0) for status in choices}
+
+
+def refresh_result_status_counts(round_id):
+    """Recounts and stores the number of debates in the round with each result
+    status. This must be called after changing result statuses in bulk (e.g.
+    using `QuerySet.update()` or `bulk_create()`), since those don't send the
+    signals that keep the counts up to date. Returns the counts."""
+
+    from .models import ResultStatusCount
+    with transaction.atomic():
+        stats = count_result_statuses(round_id)
+        ResultStatusCount.objects.filter(round_id=round_id).delete()
+        ResultStatusCount.objects.bulk_create([ResultStatusCount(round_id=round_id, status=status, count=count)
+                for status, count in stats.items()], ignore_conflicts=True)
+    return stats
+
+
+def adjust_result_status_counts(round_id, old_status, new_status):
+    """Moves one debate in the round from `old_status` to `new_status` in the
+    stored counts. `old_status` is None for new debates, and `new_status` is
+    None for deleted debates. This is called by signals whenever a debate is
+    saved, in the same transaction, so that the counts stay consistent."""
+
+    from .models import ResultStatusCount
+    counts = ResultStatusCount.objects.filter(round_id=round_id)
+    if new_status is not None:
+        if not counts.filter(status=new_status).update(count=F('count') + 1):
+            # Counts haven't been stored for this round yet, so count them now,
+            # which takes this change into account.
+            refresh_result_status_counts(round_id)
+            return
+    if old_status is not None:
+        counts.filter(status=old_status).update(count=F('count') - 1)
+
+
 def populate_identical_ballotsub_lists(ballotsubs):
     """Sets an attribute `identical_ballotsub_versions` on each BallotSubmission
     in `ballotsubs` to a list of version numbers of the other BallotSubmissions
     that are identical to it.
 
     Two ballot submissions are identical if they share the same debate, motion,
-    speakers and all speaker scores."""
+    speakers and all speaker scores. Rather than comparing every pair of
+    results, this groups ballot submissions by their debate, motion and result
+    fingerprint. Fingerprints are saved with the result; any ballot submissions
+    without one (e.g. from before fingerprints existed) have it computed and
+    saved here."""
 
+    from .models import BallotSubmission
     from .prefetch import populate_results
-    populate_results(ballotsubs)
 
-    for ballotsub in ballotsubs:
-        ballotsub.identical_ballotsub_versions = []
-
-    for ballotsub1, ballotsub2 in combinations(ballotsubs, 2):
-        if ballotsub1.result.identical(ballotsub2.result):
-            ballotsub1.identical_ballotsub_versions.append(ballotsub2.version)
-            ballotsub2.identical_ballotsub_versions.append(ballotsub1.version)
+    ballotsubs = list(ballotsubs)
+    missing = [ballotsub for ballotsub in ballotsubs if not ballotsub.result_hash]
+    if missing:
+        populate_results(missing)
+        for ballotsub in missing:
+            ballotsub.result_hash = ballotsub.result.fingerprint()
+        BallotSubmission.objects.bulk_update(missing, ['result_hash'])
 
+    groups = {}
     for ballotsub in ballotsubs:
-        ballotsub.identical_ballotsub_versions.sort()
+        key = (ballotsub.debate_id, ballotsub.motion_id, ballotsub.result_hash)
+        groups.setdefault(key, []).append(ballotsub)
+
+    for group in groups.values():
+        for ballotsub in group:
+            ballotsub.identical_ballotsub_versions = sorted(other.version for other in group if other is not ballotsub)
 
 
 _BP_POSITION_NAMES = [
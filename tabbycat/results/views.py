@@ -1,3 +1,4 @@
+import json
 import logging
 
 from asgiref.sync import async_to_sync
@@ -34,11 +35,12 @@ from utils.views import PostOnlyRedirectView, VueTableTemplateView
 from .consumers import BallotStatusConsumer
 from .forms import (PerAdjudicatorBallotSetForm, PerAdjudicatorEliminationBallotSetForm, SingleBallotSetForm,
                     SingleEliminationBallotSetForm)
-from .models import BallotSubmission, TeamScore
+from .models import BallotEntryTiming, BallotSubmission, TeamScore
 from .prefetch import populate_confirmed_ballots
 from .result import get_class_name
 from .tables import ResultsTableBuilder
-from .utils import get_status_meta, populate_identical_ballotsub_lists
+from .timing import percentile, PHASES, PhaseTimer, should_record
+from .utils import get_result_status_stats, get_status_meta, populate_identical_ballotsub_lists
 
 logger = logging.getLogger(__name__)
 
@@ -96,8 +98,9 @@ class BaseResultsEntryForRoundView(RoundMixin, VueTableTemplateView):
         return iron_speeches
 
     def get_context_data(self, **kwargs):
-        kwargs["incomplete_ballots"] = self._get_draw().filter(
-            Q(result_status=Debate.STATUS_NONE) | Q(result_status=Debate.STATUS_DRAFT)).exists()
+        counts = get_result_status_stats(self.round)
+        kwargs["status_counts"] = json.dumps(counts)
+        kwargs["incomplete_ballots"] = counts[Debate.STATUS_NONE] + counts[Debate.STATUS_DRAFT] > 0
         kwargs["iron_speeches"] = self.get_irons_list()
         return super().get_context_data(**kwargs)
 
@@ -231,11 +234,15 @@ class PublicResultsForRoundView(RoundMixin, PublicTournamentPageMixin, VueTableT
 # ==============================================================================
 
 class BaseBallotSetView(LogActionMixin, TournamentMixin, FormView):
-    """Base class for views displaying ballot set entry forms."""
+    """Base class for views displaying ballot set entry forms.
+
+    Each submission that gets as far as the form, and a sample of page loads,
+    records how long it took in a BallotEntryTiming (see timing.py)."""
 
     action_log_content_object_attr = 'ballotsub'
     tabroom = False
     for_admin = False
+    timing_action = None
 
     def get_context_data(self, **kwargs):
         kwargs['ballotsub'] = self.ballotsub
@@ -281,9 +288,14 @@ class BaseBallotSetView(LogActionMixin, TournamentMixin, FormView):
             'ConsensusDebateResultWithScores': SingleBallotSetForm,
         }[get_class_name(self.debate.round, self.tournament)]
 
+    def get_form(self, form_class=None):
+        with self.timer.phase('form'):
+            return super().get_form(form_class)
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['ballotsub'] = self.ballotsub
+        kwargs['timer'] = self.timer
         return kwargs
 
     def add_success_message(self):
@@ -308,24 +320,32 @@ class BaseBallotSetView(LogActionMixin, TournamentMixin, FormView):
     def form_valid(self, form):
         self.ballotsub = form.save()
         if self.ballotsub.confirmed:
-            self.ballotsub.confirmer = self.request.user
-            self.ballotsub.confirm_timestamp = timezone.now()
-            self.ballotsub.save()
+            with self.timer.phase('save'):
+                self.ballotsub.confirmer = self.request.user
+                self.ballotsub.confirm_timestamp = timezone.now()
+                self.ballotsub.save()
 
             if self.should_send_email_receipts():
-                async_to_sync(get_channel_layer().send)("notifications", {
-                    "type": "email",
-                    "message": BulkNotification.EVENT_TYPE_BALLOT_CONFIRMED,
-                    "extra": {"debate_id": self.debate.id},
-                    "subject": self.tournament.pref("ballot_email_subject"),
-                    "body": self.tournament.pref("ballot_email_message"),
-                    "send_to": None,
-                })
+                with self.timer.phase('broadcast'):
+                    async_to_sync(get_channel_layer().send)("notifications", {
+                        "type": "email",
+                        "message": BulkNotification.EVENT_TYPE_BALLOT_CONFIRMED,
+                        "extra": {"debate_id": self.debate.id},
+                        "subject": self.tournament.pref("ballot_email_subject"),
+                        "body": self.tournament.pref("ballot_email_message"),
+                        "send_to": None,
+                    })
 
         self.add_success_message()
         self.round = self.ballotsub.debate.round  # for LogActionMixin
+        self.timing_action = BallotEntryTiming.ACTION_CONFIRM if self.ballotsub.confirmed else BallotEntryTiming.ACTION_SAVE
 
-        return super().form_valid(form)
+        with self.timer.phase('save'):  # action log entry
+            return super().form_valid(form)
+
+    def form_invalid(self, form):
+        self.timing_action = BallotEntryTiming.ACTION_INVALID
+        return super().form_invalid(form)
 
     def populate_objects(self):
         """Subclasses must implement this method to set `self.ballotsub` and
@@ -334,17 +354,34 @@ class BaseBallotSetView(LogActionMixin, TournamentMixin, FormView):
         rendering."""
         raise NotImplementedError
 
+    def dispatch(self, request, *args, **kwargs):
+        self.timer = PhaseTimer()
+        with self.timer.phase('total'):
+            response = super().dispatch(request, *args, **kwargs)
+            if not getattr(response, 'is_rendered', True):
+                response.render()  # include template rendering in the total
+        if self.timing_action is not None and should_record(self.timing_action):
+            self.timer.save(self.debate.round, self.timing_action, self.ballotsub.submitter_type)
+        return response
+
     def get(self, request, *args, **kwargs):
         error_response = self.populate_objects()
         if error_response:
             return error_response
+        self.timing_action = BallotEntryTiming.ACTION_DISPLAY
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         error_response = self.populate_objects()
         if error_response:
             return error_response
-        return super().post(request, *args, **kwargs)
+        form = self.get_form()
+        with self.timer.phase('validation'):
+            valid = form.is_valid()
+        if valid:
+            return self.form_valid(form)
+        else:
+            return self.form_invalid(form)
 
 
 class AdministratorBallotSetMixin(AdministratorMixin):
@@ -736,6 +773,55 @@ class PublicBallotSubmissionIndexView(PublicTournamentPageMixin, RoundMixin, Vue
         return table
 
 
+class BallotEntryTimingsView(AdministratorMixin, TournamentMixin, VueTableTemplateView):
+    """Shows percentiles of the time taken by each phase of ballot entry
+    requests, for each round, to help find where ballot entry is slow."""
+
+    page_title = gettext_lazy("Ballot Entry Timings")
+    page_emoji = '⏱'
+    tables_orientation = 'rows'
+
+    def get_tables(self):
+        timings = BallotEntryTiming.objects.filter(round__tournament=self.tournament).values_list(
+            'round_id', 'action', 'durations', 'queries')
+
+        # {round_id: {action: {phase: ([durations], [queries])}}}
+        collected = {}
+        for round_id, action, durations, queries in timings:
+            by_phase = collected.setdefault(round_id, {}).setdefault(action, {})
+            for phase, duration in durations.items():
+                values = by_phase.setdefault(phase, ([], []))
+                values[0].append(duration)
+                values[1].append(queries.get(phase, 0))
+
+        tables = []
+        for r in self.tournament.round_set.filter(id__in=collected).order_by('seq'):
+            table = TabbycatTableBuilder(view=self, title=r.name)
+            rows = []
+            for action, action_name in BallotEntryTiming.ACTION_CHOICES:
+                by_phase = collected[r.id].get(action, {})
+                for phase, phase_name in PHASES:
+                    if phase in by_phase:
+                        rows.append((action_name, phase_name, *by_phase[phase]))
+
+            table.add_column({'key': 'action', 'title': _("Action")}, [row[0] for row in rows])
+            table.add_column({'key': 'phase', 'title': _("Phase")}, [row[1] for row in rows])
+            table.add_column({'key': 'count', 'title': _("Requests")}, [len(row[2]) for row in rows])
+            for p in [50, 90, 99]:
+                # Translators: e.g. "p90 (ms)", for the 90th percentile in milliseconds
+                table.add_column({'key': 'p%d' % p, 'title': _("p%(percentile)d (ms)") % {'percentile': p}},
+                                 [round(percentile(row[2], p), 1) for row in rows])
+            table.add_column({'key': 'max', 'title': _("Max (ms)")}, [round(max(row[2]), 1) for row in rows])
+            table.add_column({'key': 'queries-p50', 'title': _("p50 queries")}, [percentile(row[3], 50) for row in rows])
+            table.add_column({'key': 'queries-max', 'title': _("Max queries")}, [max(row[3]) for row in rows])
+            tables.append(table)
+
+        if not tables:
+            tables.append(TabbycatTableBuilder(view=self, title=_("Ballot Entry Timings"),
+                empty_title=_("No ballots have been entered yet.")))
+        return tables
+
+
 class PostponeDebateView(AdministratorMixin, RoundMixin, PostOnlyRedirectView):
 
     round_redirect_pattern_name = 'results-round-list'
@@ -757,6 +843,7 @@ class PostponeDebateView(AdministratorMixin, RoundMixin, PostOnlyRedirectView):
                 'sort': meta[2],
                 'ballot': None,
                 'round': debate.round_id,
+                'counts': get_result_status_stats(debate.round),
             },
         })
 
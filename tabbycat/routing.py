@@ -8,6 +8,7 @@ from checkins.consumers import CheckInEventConsumer
 from draw.consumers import DebateEditConsumer
 from notifications.consumers import NotificationQueueConsumer
 from results.consumers import BallotResultConsumer, BallotStatusConsumer
+from tournaments.consumers import CacheWarmingConsumer
 from venues.consumers import VenuesWorkerConsumer
 
 
@@ -40,5 +41,6 @@ application = ProtocolTypeRouter({
         "notifications":  NotificationQueueConsumer, # Email sending
         "adjallocation": AdjudicatorAllocationWorkerConsumer,
         "venues": VenuesWorkerConsumer,
+        "cachewarming": CacheWarmingConsumer, # Rendering public pages after releases
     }),
 })
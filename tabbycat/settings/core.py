@@ -197,6 +197,21 @@ TEMPLATES = [
 PUBLIC_FAST_CACHE_TIMEOUT = int(os.environ.get('PUBLIC_FAST_CACHE_TIMEOUT', 60 * 1))
 PUBLIC_SLOW_CACHE_TIMEOUT = int(os.environ.get('PUBLIC_SLOW_CACHE_TIMEOUT', 60 * 3.5))
 TAB_PAGES_CACHE_TIMEOUT = int(os.environ.get('TAB_PAGES_CACHE_TIMEOUT', 60 * 120))
+# Versioned pages are replaced as soon as the tournament changes, but writes that
+# bypass the version bumps would otherwise leave them stale, so this defaults to
+# no longer than the slow cache
+PUBLIC_VERSIONED_CACHE_TIMEOUT = int(os.environ.get('PUBLIC_VERSIONED_CACHE_TIMEOUT', PUBLIC_SLOW_CACHE_TIMEOUT))
+
+# Directory to which static snapshots of public pages are exported (see tournaments/snapshot.py)
+PUBLIC_SNAPSHOT_ROOT = os.environ.get('PUBLIC_SNAPSHOT_ROOT', os.path.join(BASE_DIR, 'snapshot'))
+
+# Address of the public site, used to render public pages into the cache after
+# releases (see tournaments/warming.py); if not set, pages aren't pre-rendered
+PUBLIC_CACHE_WARMING_URL = os.environ.get('PUBLIC_CACHE_WARMING_URL', '')
+
+# Languages, other than LANGUAGE_CODE, in which to pre-render public pages, as a
+# comma-separated list of codes in LANGUAGES (each one adds a full rendering)
+PUBLIC_CACHE_WARMING_LANGUAGES = [code for code in os.environ.get('PUBLIC_CACHE_WARMING_LANGUAGES', '').split(',') if code]
 
 # Default non-heroku cache is to use local memory
 CACHES = {
@@ -262,6 +277,11 @@ for app in TABBYCAT_APPS:
         'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
     }
 
+# Fraction of ballot entry page loads (not submissions) whose timings are
+# recorded, and how long timings are kept (see results/timing.py)
+BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE = float(os.environ.get('BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE', 0.1))
+BALLOT_ENTRY_TIMING_RETENTION_DAYS = int(os.environ.get('BALLOT_ENTRY_TIMING_RETENTION_DAYS', 30))
+
 # ==============================================================================
 # Messages
 # ==============================================================================
@@ -326,6 +346,7 @@ DYNAMIC_PREFERENCES = {
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
+        'api.renderers.NDJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -333,5 +354,5 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.TabbycatPagination',
 }
@@ -134,6 +134,7 @@ class BaseStandingsView(RoundMixin, VueTableTemplateView):
 class PublicTabMixin(PublicTournamentPageMixin):
     """Mixin for views that should only be allowed when the tab is released publicly."""
     cache_timeout = settings.TAB_PAGES_CACHE_TIMEOUT
+    cache_tables = True
 
     def get_page_subtitle(self):
         return None
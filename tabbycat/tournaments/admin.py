@@ -1,6 +1,11 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext_lazy
 
 from .models import Round, Tournament
+from .warming import WORKER_CHANNEL
 
 
 # ==============================================================================
@@ -11,6 +16,23 @@ from .models import Round, Tournament
 class TournamentAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'seq', 'short_name', 'current_round', 'active')
     ordering = ('seq', )
+    actions = ['export_snapshot']
+
+    def export_snapshot(self, request, queryset):
+        # Exporting renders every public page, so leave it to the worker
+        tournament_ids = list(queryset.values_list('id', flat=True))
+        async_to_sync(get_channel_layer().send)(WORKER_CHANNEL, {
+            "type": "export_snapshot",
+            "tournaments": tournament_ids,
+            "base_url": request.build_absolute_uri("/"),
+        })
+
+        message = ngettext_lazy(
+            "The public snapshot of %(count)d tournament will be exported in the background.",
+            "The public snapshots of %(count)d tournaments will be exported in the background.",
+            len(tournament_ids)) % {'count': len(tournament_ids)}
+        self.message_user(request, message)
+    export_snapshot.short_description = _("Export public snapshot")
 
 
 # ==============================================================================
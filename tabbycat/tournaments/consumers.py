@@ -0,0 +1,17 @@
+from channels.consumer import SyncConsumer
+from django.conf import settings
+
+from .models import Tournament
+from .snapshot import SnapshotExporter
+from .warming import warm_cache
+
+
+class CacheWarmingConsumer(SyncConsumer):
+
+    def warm_cache(self, event):
+        warm_cache(event['tournament'])
+
+    def export_snapshot(self, event):
+        exporter = SnapshotExporter(settings.PUBLIC_SNAPSHOT_ROOT, base_url=event['base_url'])
+        for tournament in Tournament.objects.filter(id__in=event['tournaments']):
+            exporter.export(tournament)
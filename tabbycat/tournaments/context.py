@@ -0,0 +1,76 @@
+"""Request-scoped loading of a tournament and its rounds.
+
+Most pages need the tournament, the round in the URL, the current round or
+rounds, and often the rounds before and after a round. Loaded through the model
+properties (`Tournament.current_round`, `Round.prev` and so on), each of these
+is another query, and they aren't shared between the middleware, views and
+templates, which each load their own instances.
+
+`TournamentContext` loads all of a tournament's rounds at once, caching them
+until anything in the tournament changes (see tournaments/versions.py), and
+fills in those properties from the list, so that they don't need queries of
+their own. `DebateMiddleware` attaches one to each request for a tournament
+page, as `request.tournament_context`, and sets `request.tournament` and
+`request.round` from it; the tournament and round view mixins and the context
+processor then use the same instances."""
+
+from django.db.models import Count
+
+from .models import Round
+from .versions import cache_versioned, get_tournament_versions
+
+
+class TournamentContext:
+
+    def __init__(self, tournament):
+        self.tournament = tournament
+        self.rounds = cache_versioned("tournament_rounds_%d" % tournament.id,
+            get_tournament_versions(tournament.id), self._load_rounds)
+        self.rounds_by_seq = {r.seq: r for r in self.rounds}
+        self._populate()
+
+    def _load_rounds(self):
+        return list(Round.objects.filter(tournament=self.tournament).select_related(None).select_related(
+            'break_category').annotate(Count('debate')).order_by('seq'))
+
+    def get_round(self, seq):
+        """Returns the round with sequence number `seq`, or None if there isn't
+        one."""
+        return self.rounds_by_seq.get(int(seq))
+
+    def _populate(self):
+        # These should be kept consistent with the properties they fill in, in
+        # tournaments/models.py.
+        t = self.tournament
+
+        for r in self.rounds:
+            r.tournament = t
+            if r.is_break_round:
+                sequence = [s for s in self.rounds if s.stage == Round.STAGE_PRELIMINARY or
+                            s.break_category_id == r.break_category_id]
+            else:
+                sequence = self.rounds
+            r.prev = next((s for s in reversed(sequence) if s.seq < r.seq), None)
+            r.next = next((s for s in sequence if s.seq > r.seq), None)
+            r.is_last = r.next is None
+            earlier_uncompleted = any(s.seq < r.seq and not s.completed for s in sequence)
+            r._is_current = not (r.completed or earlier_uncompleted or (r.is_break_round and r.debate__count == 0))
+
+        # Tournament.current_round
+        uncompleted = [r for r in self.rounds if not r.completed]
+        if uncompleted:
+            t.current_round = uncompleted[0]
+        else:
+            t.current_round = self.rounds[-1] if self.rounds else None
+
+        # Tournament.current_rounds
+        t.current_rounds = self._current_rounds(uncompleted)
+
+    def _current_rounds(self, uncompleted):
+        current_elim_rounds = {}
+        for r in uncompleted:
+            if not r.is_break_round:
+                return [r]
+            elif r.debate__count > 0 and r.break_category_id is not None:
+                current_elim_rounds.setdefault(r.break_category_id, r)
+        return sorted(current_elim_rounds.values(), key=lambda r: r.break_category.seq)
@@ -16,6 +16,7 @@ from options.presets import all_presets, get_preferences_data, presets_for_form,
 from .models import Round, Tournament
 from .signals import update_tournament_cache
 from .utils import auto_make_rounds
+from .versions import bump_versions
 
 
 class TournamentStartForm(ModelForm):
@@ -167,6 +168,7 @@ class RoundWithCompleteOptionField(RoundField):
 def clear_all_round_caches(tournament):
     cache.delete_many(["%s_%s_%s" % (tournament.slug, r.seq, 'object') for r in tournament.round_set.all()])
     update_tournament_cache(Tournament, tournament)
+    bump_versions(tournament.id)
 
 
 class SetCurrentRoundSingleBreakCategoryForm(Form):
@@ -0,0 +1,27 @@
+from django.conf import settings
+
+from utils.management.base import TournamentCommand
+
+from ...snapshot import SnapshotExporter
+
+
+class Command(TournamentCommand):
+
+    help = "Exports the enabled public pages of a tournament as static HTML and JSON files, which " \
+           "can be served directly by a web server. Only tournaments that have changed since they " \
+           "were last exported are exported, and only files that have changed are written."
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("-d", "--directory", type=str, default=settings.PUBLIC_SNAPSHOT_ROOT,
+                            help="Directory to export to (default: %(default)s)")
+        parser.add_argument("--base-url", type=str, default="http://localhost",
+                            help="Scheme and host of the site, used in links in API responses (default: %(default)s)")
+        parser.add_argument("--force", action="store_true",
+                            help="Export even if the tournament hasn't changed since it was last exported")
+
+    def handle_tournament(self, tournament, **options):
+        exporter = SnapshotExporter(options["directory"], base_url=options["base_url"], force=options["force"])
+        written, removed = exporter.export(tournament)
+        self.stdout.write("Exported {slug} to {directory}: {written:d} files written, {removed:d} removed".format(
+            slug=tournament.slug, directory=options["directory"], written=len(written), removed=len(removed)))
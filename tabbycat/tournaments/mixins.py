@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 
@@ -7,11 +8,12 @@ from django.contrib import messages
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.db.models import Prefetch, Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import NoReverseMatch, reverse
 from django.utils.encoding import force_str
-from django.utils.translation import gettext as _
+from django.utils.translation import get_language, gettext as _
 from django.views.generic.base import ContextMixin
 from django.views.generic.detail import SingleObjectMixin
 
@@ -28,6 +30,7 @@ from utils.mixins import AssistantMixin, CacheMixin, TabbycatPageTitlesMixin
 from utils.serializers import django_rest_json_render
 
 from .models import Round, Tournament
+from .versions import cache_versioned, get_tournament_versions
 
 logger = logging.getLogger(__name__)
 
@@ -57,8 +60,14 @@ class TournamentFromUrlMixin:
         if hasattr(self, "_tournament_from_url"):
             return self._tournament_from_url
 
-        # then look in cache,
+        # then in the request (see DebateMiddleware),
         slug = self.get_url_kwargs()[self.tournament_slug_url_kwarg]
+        request_tournament = getattr(getattr(self, 'request', None), 'tournament', None)
+        if request_tournament is not None and request_tournament.slug == slug:
+            self._tournament_from_url = request_tournament
+            return request_tournament
+
+        # then look in cache,
         key = self.tournament_cache_key.format(slug=slug)
         cached_tournament = cache.get(key)
         if cached_tournament:
@@ -199,8 +208,17 @@ class RoundFromUrlMixin(TournamentFromUrlMixin):
         if hasattr(self, "_round_from_url"):
             return self._round_from_url
 
-        # then look in cache,
+        # then in the request (see DebateMiddleware),
         seq = self.get_url_kwargs()[self.round_seq_url_kwarg]
+        context = getattr(getattr(self, 'request', None), 'tournament_context', None)
+        if context is not None and context.tournament is self.tournament:
+            round = context.get_round(seq)
+            if round is None:
+                raise Http404("No round %s in %s" % (seq, self.tournament.slug))
+            self._round_from_url = round
+            return round
+
+        # then look in cache,
         key = self.round_cache_key.format(slug=self.tournament.slug, seq=seq)
         cached_round = cache.get(key)
         if cached_round:
@@ -332,9 +350,45 @@ class PublicTournamentPageMixin(PersonalizablePublicTournamentPageMixin, CacheMi
     message can be overridden through the `disabled_message` class attribute or,
     if it needs to be generated dynamically, by overriding the
     `get_disabled_message()` method.
+
+    Pages are cached until anything in the tournament changes (see
+    tournaments/versions.py). Views showing anything that doesn't change the
+    tournament's versions, like check-ins, should set `cache_versioned` to
+    False, so that they're cached for `cache_timeout` instead. Views that set
+    `cache_tables` also cache their tables' data separately, so that it's
+    shared between users whose pages are cached separately. Messages added
+    while building the tables are cached with them, and added again whenever
+    the cached tables are used.
     """
 
-    pass
+    cache_versioned = True
+    cache_tables = False
+
+    def get_cache_versions(self):
+        if not self.cache_versioned:
+            return None
+        return get_tournament_versions(self.tournament.id)
+
+    def get_tables_data(self):
+        if not self.cache_tables or not self.cache_versioned:
+            return super().get_tables_data()
+        params = (type(self).__name__, self.request.get_full_path(), get_language())
+        key = "tables_data_%s" % hashlib.md5(repr(params).encode()).hexdigest()
+        computed = []
+
+        def compute():
+            queued = messages.get_messages(self.request)._queued_messages
+            start = len(queued)
+            tables_data = super(PublicTournamentPageMixin, self).get_tables_data()
+            computed.append(True)
+            return tables_data, [(m.level, str(m.message), m.extra_tags) for m in queued[start:]]
+
+        tables_data, added_messages = cache_versioned(key, get_tournament_versions(self.tournament.id),
+                                                      compute, self.versioned_cache_timeout)
+        if not computed:
+            for level, message, extra_tags in added_messages:
+                messages.add_message(self.request, level, message, extra_tags=extra_tags)
+        return tables_data
 
 
 class OptionalAssistantTournamentPageMixin(AssistantMixin, TournamentAccessControlledPageMixin):
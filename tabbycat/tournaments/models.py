@@ -10,6 +10,8 @@ from django.utils.translation import gettext_lazy as _
 from participants.models import Person
 from utils.managers import LookupByNameFieldsMixin
 
+from .versions import cache_versioned, get_preferences_version
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,7 +51,7 @@ class Tournament(models.Model):
         ordering = ['seq']
 
     def __init__(self, *args, **kwargs):
-        self._prefs = {}
+        self._prefs = None
         return super().__init__(*args, **kwargs)
 
     def __str__(self):
@@ -66,12 +68,29 @@ class Tournament(models.Model):
         """Keep a record in this instance, to avoid hitting the cache
         unnecessarily. Note that this means that, if a tournament preference is
         changed, an instance of the Tournament (Python) object that has already
-        queries that preference value won't pick up on the change."""
+        queried its preferences won't pick up on the change."""
+        if self._prefs is None:
+            self._prefs = self.preferences_snapshot()
         try:
             return self._prefs[name]
         except KeyError:
-            self._prefs[name] = self.preferences.get_by_name(name)
-            return self._prefs[name]
+            return self.preferences.get_by_name(name)  # raises the usual error
+
+    def preferences_snapshot(self):
+        """Returns a dict mapping the names of all of the tournament's
+        preferences to their values. The dict is cached as a single entry until
+        any of them changes, so that reading preferences doesn't take a cache
+        hit (or query) each."""
+        return cache_versioned("prefs_snapshot_%d" % self.id, get_preferences_version(self.id),
+                               self._load_preferences)
+
+    def _load_preferences(self):
+        # Preferences not in the database have their default values, as in
+        # dynamic_preferences, but aren't created here.
+        values = {pref.preference.name: pref.value for pref in self.preferences.queryset}
+        for preference in self.preferences.registry.preferences():
+            values.setdefault(preference.name, preference.get('default'))
+        return values
 
     @property
     def sides(self):
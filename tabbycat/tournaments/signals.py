@@ -1,11 +1,17 @@
 import logging
 
+from django.apps import apps
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
+from dynamic_preferences.models import BasePreferenceModel
 
+from options.models import TournamentPreferenceModel
 from tournaments.models import Round, Tournament
 
+from .versions import bump_versions_for, VERSIONED_MODELS
+from .warming import request_cache_warming
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,3 +34,44 @@ def update_round_cache(sender, instance, **kwargs):
         logger.debug("Cleared %s tournament cache because the current round is %s" %
                 (instance.tournament.slug, instance if current_round_id == instance.id else current_round_id))
         update_tournament_cache(sender, instance.tournament, **kwargs)
+
+
+def update_versions(sender, instance, created=False, **kwargs):
+    # Preferences are saved with their default values when first read, which
+    # isn't a change
+    if created and isinstance(instance, BasePreferenceModel) and instance.value == instance.preference.get('default'):
+        return
+    bump_versions_for(instance)
+
+
+for label in VERSIONED_MODELS:
+    post_save.connect(update_versions, sender=apps.get_model(label), dispatch_uid="update_versions_save_" + label)
+    post_delete.connect(update_versions, sender=apps.get_model(label), dispatch_uid="update_versions_delete_" + label)
+
+
+@receiver(m2m_changed)
+def update_versions_m2m(sender, instance, action, **kwargs):
+    """Records changes to many-to-many relationships, like break and speaker
+    category eligibility, if the instance is of a versioned model."""
+    if action.startswith('post_') and instance._meta.label in VERSIONED_MODELS:
+        bump_versions_for(instance)
+
+
+# Preference sections that control what's released on the public site
+RELEASE_PREFERENCE_SECTIONS = {'public_features', 'tab_release'}
+
+
+@receiver(post_save, sender=Round)
+def warm_cache_after_round_change(sender, instance, **kwargs):
+    """Renders public pages after draws and motions are released and rounds
+    are completed, which change what's shown on them."""
+    request_cache_warming(instance.tournament_id)
+
+
+@receiver(post_save, sender=TournamentPreferenceModel)
+def warm_cache_after_release(sender, instance, created=False, **kwargs):
+    if instance.section not in RELEASE_PREFERENCE_SECTIONS:
+        return
+    if created and instance.value == instance.preference.get('default'):
+        return
+    request_cache_warming(instance.instance_id)
@@ -0,0 +1,260 @@
+"""Exports the public pages of a tournament as static files, so that a web
+server (like nginx) can serve them directly, without Tabbycat having to handle
+each request.
+
+Pages are rendered through the usual middleware and views, as they would be for
+an anonymous user, so the files are exactly what a user would see on the live
+site. Pages that aren't enabled (that return anything other than a 200
+response) aren't exported. HTML pages are written to `<path>/index.html` and
+API responses to `<path>/index.json`, under the export directory; see the
+documentation on scaling for how to serve them.
+
+Exports are incremental: a tournament is exported again only if something in it
+has changed since it was last exported (see tournaments/versions.py), only files
+whose contents changed are written, and files for pages that are no longer
+enabled are removed. What was exported is recorded in a manifest file in the
+export directory.
+
+Exports can be run by the worker (from the admin action) and by the
+`exportsnapshot` command at the same time, so each export holds a lock on the
+export directory, and files are written to a temporary file and then moved into
+place, so that neither a web server nor another export sees a partly written
+file. Locking uses `fcntl`, so isn't available on Windows."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.core.handlers.base import BaseHandler
+from django.test import RequestFactory
+from django.urls import reverse
+
+from utils.misc import reverse_round, reverse_tournament
+
+from .versions import get_tournament_versions
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".snapshot.json"
+LOCK_FILENAME = ".snapshot.lock"
+
+# Public pages that don't depend on a round or category
+TOURNAMENT_PAGES = [
+    'tournament-public-index',
+    'draw-public-current-rounds',
+    'draw-public-side-allocations',
+    'results-public-index',
+    'motions-public',
+    'motions-public-statistics',
+    'participants-public-list',
+    'participants-public-institutions-list',
+    'breakqual-public-index',
+    'breakqual-public-adjs',
+    'standings-public-teams-current',
+    'standings-public-tab-team',
+    'standings-public-tab-speaker',
+    'standings-public-tab-replies',
+    'standings-public-adjudicators-tab',
+    'standings-public-diversity',
+]
+
+# API endpoints for standings, which are cached (see api/views.py)
+STANDINGS_API_ENDPOINTS = [
+    'api-team-standings',
+    'api-substantive-speaker-standings',
+    'api-reply-speaker-standings',
+]
+
+# API endpoints that don't depend on a round
+API_ENDPOINTS = [
+    'api-round-list',
+    'api-motion-list',
+    'api-breakcategory-list',
+    'api-speakercategory-list',
+    'api-institution-list',
+    'api-team-list',
+    'api-adjudicator-list',
+] + STANDINGS_API_ENDPOINTS
+
+
+def public_paths(tournament):
+    """Returns the paths of the public pages and API endpoints that might be
+    enabled in `tournament`."""
+    return public_page_paths(tournament) + public_api_paths(tournament)
+
+
+def public_page_paths(tournament, records=True):
+    """Returns the paths of the public pages that might be enabled in
+    `tournament`. If `records` is False, team and adjudicator record pages are
+    left out."""
+    paths = [reverse_tournament(name, tournament) for name in TOURNAMENT_PAGES]
+
+    for r in tournament.round_set.order_by('seq'):
+        paths.append(reverse_round('draw-public-for-round', r))
+        paths.append(reverse_round('results-public-round', r))
+
+    for category in tournament.breakcategory_set.order_by('seq'):
+        kwargs = {'category': category.slug}
+        paths.append(reverse_tournament('breakqual-public-teams', tournament, kwargs=kwargs))
+        paths.append(reverse_tournament('standings-public-tab-break-category', tournament, kwargs=kwargs))
+
+    for category in tournament.speakercategory_set.order_by('seq'):
+        paths.append(reverse_tournament('standings-public-tab-speaker-category', tournament,
+                                        kwargs={'category': category.slug}))
+
+    # There are many of these, so don't try them unless they're enabled
+    if records and tournament.pref('public_record'):
+        for team in tournament.team_set.order_by('id'):
+            paths.append(reverse_tournament('participants-public-team-record', tournament, kwargs={'pk': team.pk}))
+        for adj in tournament.adjudicator_set.order_by('id'):
+            paths.append(reverse_tournament('participants-public-adjudicator-record', tournament, kwargs={'pk': adj.pk}))
+
+    return paths
+
+
+def public_api_paths(tournament, standings_only=False):
+    """Returns the paths of the API endpoints that might be enabled in
+    `tournament`. If `standings_only` is True, only the standings endpoints are
+    included."""
+    kwargs = {'tournament_slug': tournament.slug}
+    if standings_only:
+        return [reverse(name, kwargs=kwargs) for name in STANDINGS_API_ENDPOINTS]
+
+    paths = [reverse(name, kwargs=kwargs) for name in API_ENDPOINTS]
+    for r in tournament.round_set.order_by('seq'):
+        paths.append(reverse('api-pairing-list', kwargs=dict(kwargs, round_seq=r.seq)))
+    return paths
+
+
+class PublicRequester:
+    """Makes anonymous GET requests to the site at `base_url`, which must be
+    allowed by the `ALLOWED_HOSTS` setting. Requests are passed through the
+    middleware and views directly, in this process, rather than over HTTP."""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.factory = RequestFactory(HTTP_HOST=url.netloc, HTTP_ACCEPT="text/html,application/json")
+        self.secure = url.scheme == "https"
+        self.handler = BaseHandler()
+        self.handler.load_middleware()
+
+    def get(self, path, **extra):
+        """Returns the response to a request for `path`. Errors in views are
+        returned as error responses, as they would be to a visitor."""
+        request = self.factory.get(path, secure=self.secure, **extra)
+        return self.handler.get_response(request)
+
+
+def file_path(path, content_type):
+    """Returns the file path, relative to the export directory, to which the
+    page at `path` is exported."""
+    extension = "json" if content_type.startswith("application/json") else "html"
+    return os.path.join(*path.strip("/").split("/"), "index." + extension)
+
+
+class SnapshotExporter:
+    """Exports the public pages of tournaments into `directory`. Usage:
+
+        exporter = SnapshotExporter("/var/www/snapshot", base_url="https://example.com")
+        written, removed = exporter.export(tournament)
+
+    `base_url` is used for the host and scheme of links in API responses, and
+    must be allowed by the `ALLOWED_HOSTS` setting. If `force` is True,
+    tournaments are exported even if they haven't changed."""
+
+    def __init__(self, directory, base_url="http://localhost", force=False):
+        self.directory = directory
+        self.force = force
+        self.requester = PublicRequester(base_url)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_FILENAME)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_manifest(self, manifest):
+        content = json.dumps(manifest, indent=2, sort_keys=True).encode()
+        self.write(MANIFEST_FILENAME, content)
+
+    @contextmanager
+    def lock(self):
+        """Holds an exclusive lock on the export directory, waiting for any
+        other export to finish first."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILENAME), 'w') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def export(self, tournament):
+        """Exports the public pages of `tournament`, if it has changed since it
+        was last exported. Returns a tuple `(written, removed)` of lists of file
+        paths, relative to the export directory."""
+        with self.lock():
+            return self._export(tournament)
+
+    def _export(self, tournament):
+        manifest = self.load_manifest()
+        previous = manifest.get(tournament.slug, {'versions': None, 'files': {}})
+
+        # Get these first, so that anything that changes during the export is
+        # picked up next time
+        versions = list(get_tournament_versions(tournament.id))
+        if not self.force and previous['versions'] == versions:
+            logger.info("%s hasn't changed since it was last exported", tournament.slug)
+            return [], []
+
+        files = {}
+        written = []
+        for path in public_paths(tournament):
+            response = self.requester.get(path)
+            if response.status_code != 200:
+                logger.debug("Skipping %s, which returned %d", path, response.status_code)
+                continue
+            filename = file_path(path, response.get('Content-Type', ''))
+            digest = hashlib.md5(response.content).hexdigest()
+            files[filename] = digest
+            if previous['files'].get(filename) != digest:
+                self.write(filename, response.content)
+                written.append(filename)
+
+        removed = [filename for filename in previous['files'] if filename not in files]
+        for filename in removed:
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+
+        manifest[tournament.slug] = {'versions': versions, 'files': files}
+        self.save_manifest(manifest)
+        logger.info("Exported %s: %d files written, %d unchanged, %d removed", tournament.slug,
+                    len(written), len(files) - len(written), len(removed))
+        return written, removed
+
+    def write(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.chmod(temp_path, 0o644)  # mkstemp() makes files readable only by their owner
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from participants.models import Speaker
+from tournaments.models import Tournament
+from utils.misc import reverse_tournament
+
+
+class TestVersionedPageCache(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.first()
+        self.tournament.preferences['public_features__public_participants'] = True
+        self.url = reverse_tournament('participants-public-list', self.tournament)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_page_cached(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in context.captured_queries if 'participants_speaker' in q['sql']])
+
+    def test_page_updated_after_save(self):
+        speaker = Speaker.objects.filter(team__tournament=self.tournament).first()
+        self.assertContains(self.client.get(self.url), speaker.name)
+        speaker.name = "Renamed Speaker"
+        speaker.save()
+        self.assertContains(self.client.get(self.url), "Renamed Speaker")
+
+    def test_table_messages_kept(self):
+        self.tournament.preferences['tab_release__adjudicators_tab_released'] = True
+        url = reverse_tournament('standings-public-adjudicators-tab', self.tournament)
+        self.assertContains(self.client.get(url), "customisable mix")
+
+        # Logged-in users' pages are cached separately, but share the tables
+        user = get_user_model().objects.create(username='test_user')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertFalse([q for q in context.captured_queries if 'adjfeedback_adjudicatorfeedback' in q['sql']])
+        self.assertContains(response, "customisable mix")
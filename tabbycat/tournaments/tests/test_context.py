@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from tournaments.context import TournamentContext
+from tournaments.models import Round, Tournament
+
+
+class BaseTournamentContextTests:
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def assertContextConsistent(self):  # noqa: N802
+        expected = Tournament.objects.get()
+        context = TournamentContext(Tournament.objects.get())
+        self.assertEqual(context.tournament.current_round, expected.current_round)
+        self.assertEqual(context.tournament.current_rounds, expected.current_rounds)
+
+        for r in expected.round_set.all():
+            loaded = context.get_round(r.seq)
+            with self.subTest(round=r.abbreviation):
+                self.assertEqual(loaded, r)
+                self.assertEqual(loaded.prev, r.prev)
+                self.assertEqual(loaded.next, r.next)
+                self.assertEqual(loaded.is_last, r.is_last)
+                self.assertEqual(loaded.is_current, r.is_current)
+
+    def test_consistent(self):
+        self.assertContextConsistent()
+
+    def test_consistent_after_completing_rounds(self):
+        for r in Round.objects.order_by('seq'):
+            r.completed = True
+            r.save()
+            self.assertContextConsistent()
+
+    def test_no_queries_when_cached(self):
+        TournamentContext(Tournament.objects.get())
+        tournament = Tournament.objects.get()
+        with self.assertNumQueries(0):
+            context = TournamentContext(tournament)
+            tournament.current_round
+            tournament.current_rounds
+            for r in context.rounds:
+                r.prev
+                r.is_current
+
+
+class TestTournamentContextPrelims(BaseTournamentContextTests, TestCase):
+    fixtures = ['after_round_4.json']
+
+
+class TestTournamentContextElims(BaseTournamentContextTests, TestCase):
+    fixtures = ['before_oqf_ssf.json']
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from tournaments.models import Tournament
+
+
+class TestPreferencesSnapshot(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.create(slug="preftest", name="Preferences Test")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_defaults(self):
+        self.assertEqual(self.tournament.pref('substantive_speakers'), 3)
+        self.assertEqual(self.tournament.pref('teams_in_debate'), 'two')
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            self.tournament.pref('substantive_speakers')
+            self.tournament.pref('teams_in_debate')
+            self.tournament.pref('public_draw')
+
+        tournament = Tournament.objects.get(id=self.tournament.id)
+        with self.assertNumQueries(0):
+            tournament.pref('substantive_speakers')
+            tournament.pref('teams_in_debate')
+
+    def test_updated_after_change(self):
+        self.assertEqual(self.tournament.pref('substantive_speakers'), 3)
+        self.tournament.preferences['debate_rules__substantive_speakers'] = 2
+        tournament = Tournament.objects.get(id=self.tournament.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(tournament.pref('substantive_speakers'), 2)
@@ -0,0 +1,146 @@
+from django.test import override_settings, TestCase
+
+from results.models import BallotSubmission
+from utils.misc import reverse_round, reverse_tournament
+from utils.tests import QueryCountTestMixin
+
+
+def tournament_url(view_name, **kwargs):
+    return lambda t: reverse_tournament(view_name, t, kwargs=kwargs)
+
+
+def round_url(view_name, seq=1):
+    return lambda t: reverse_round(view_name, t.round_set.get(seq=seq))
+
+
+def object_url(view_name, get_object):
+    return lambda t: reverse_tournament(view_name, t, kwargs={'pk': get_object(t).pk})
+
+
+def category_url(view_name, seq=None):
+    def get_url(t):
+        kwargs = {'category': t.breakcategory_set.order_by('seq').first().slug}
+        if seq is not None:
+            kwargs['round_seq'] = seq
+        return reverse_tournament(view_name, t, kwargs=kwargs)
+    return get_url
+
+
+def first_ballot(t):
+    return BallotSubmission.objects.filter(debate__round__tournament=t, confirmed=True).order_by('id').first()
+
+
+ADMIN_VIEWS = [
+    ('tournament-admin-home', tournament_url('tournament-admin-home')),
+    ('tournament-assistant-home', tournament_url('tournament-assistant-home')),
+    ('participants-list', tournament_url('participants-list')),
+    ('participants-institutions-list', tournament_url('participants-institutions-list')),
+    ('participants-code-names-list', tournament_url('participants-code-names-list')),
+    ('participants-speaker-eligibility', tournament_url('participants-speaker-eligibility')),
+    ('participants-team-record', object_url('participants-team-record', lambda t: t.team_set.order_by('id').first())),
+    ('participants-adjudicator-record', object_url('participants-adjudicator-record',
+                                                   lambda t: t.adjudicator_set.order_by('id').first())),
+    ('adjallocation-conflicts-adj-team', tournament_url('adjallocation-conflicts-adj-team')),
+    ('adjallocation-conflicts-adj-adj', tournament_url('adjallocation-conflicts-adj-adj')),
+    ('adjallocation-conflicts-adj-inst', tournament_url('adjallocation-conflicts-adj-inst')),
+    ('adjallocation-conflicts-team-inst', tournament_url('adjallocation-conflicts-team-inst')),
+    ('adjfeedback-overview', tournament_url('adjfeedback-overview')),
+    ('adjfeedback-progress', tournament_url('adjfeedback-progress')),
+    ('adjfeedback-view-latest', tournament_url('adjfeedback-view-latest')),
+    ('adjfeedback-view-by-source', tournament_url('adjfeedback-view-by-source')),
+    ('adjfeedback-view-by-target', tournament_url('adjfeedback-view-by-target')),
+    ('adjfeedback-add-index', tournament_url('adjfeedback-add-index')),
+    ('breakqual-index', tournament_url('breakqual-index')),
+    ('breakqual-teams', category_url('breakqual-teams')),
+    ('breakqual-adjudicators', tournament_url('breakqual-adjudicators')),
+    ('breakqual-edit-eligibility', tournament_url('breakqual-edit-eligibility')),
+    ('admin-people-statuses', tournament_url('admin-people-statuses')),
+    ('admin-venues-statuses', tournament_url('admin-venues-statuses')),
+    ('admin-checkin-identifiers', tournament_url('admin-checkin-identifiers')),
+    ('privateurls-list', tournament_url('privateurls-list')),
+    ('draw-side-allocations', tournament_url('draw-side-allocations')),
+    ('motions-statistics', tournament_url('motions-statistics')),
+    ('venues-constraints', tournament_url('venues-constraints')),
+    ('results-entry-timings', tournament_url('results-entry-timings')),
+    ('results-ballotset-edit', object_url('results-ballotset-edit', first_ballot)),
+    ('availability-index', round_url('availability-index')),
+    ('availability-teams', round_url('availability-teams')),
+    ('availability-adjudicators', round_url('availability-adjudicators')),
+    ('availability-venues', round_url('availability-venues')),
+    ('draw', round_url('draw')),
+    ('draw-details', round_url('draw-details')),
+    ('draw-position-balance', round_url('draw-position-balance', seq=2)),
+    ('draw-display-specific-round-by-venue', round_url('draw-display-specific-round-by-venue')),
+    ('draw-display-specific-round-by-team', round_url('draw-display-specific-round-by-team')),
+    ('edit-debate-teams', round_url('edit-debate-teams')),
+    ('edit-debate-adjudicators', round_url('edit-debate-adjudicators')),
+    ('edit-debate-venues', round_url('edit-debate-venues')),
+    ('motions-edit', round_url('motions-edit')),
+    ('results-round-list', round_url('results-round-list')),
+    ('standings-index', round_url('standings-index', seq=3)),
+    ('standings-team', round_url('standings-team', seq=3)),
+    ('standings-break-category', category_url('standings-break-category', seq=3)),
+    ('standings-speaker', round_url('standings-speaker', seq=3)),
+    ('standings-reply', round_url('standings-reply', seq=3)),
+    ('standings-diversity', round_url('standings-diversity', seq=3)),
+    ('printing-scoresheets', round_url('printing-scoresheets')),
+    ('printing-feedback', round_url('printing-feedback')),
+]
+
+PUBLIC_VIEWS = [
+    ('tournament-public-index', tournament_url('tournament-public-index')),
+    ('participants-public-list', tournament_url('participants-public-list')),
+    ('participants-public-institutions-list', tournament_url('participants-public-institutions-list')),
+    ('participants-public-team-record', object_url('participants-public-team-record',
+                                                   lambda t: t.team_set.order_by('id').first())),
+    ('draw-public-for-round', round_url('draw-public-for-round')),
+    ('results-public-index', tournament_url('results-public-index')),
+    ('results-public-round', round_url('results-public-round')),
+    ('motions-public', tournament_url('motions-public')),
+    ('motions-public-statistics', tournament_url('motions-public-statistics')),
+    ('standings-public-teams-current', tournament_url('standings-public-teams-current')),
+    ('standings-public-tab-team', tournament_url('standings-public-tab-team')),
+    ('standings-public-tab-speaker', tournament_url('standings-public-tab-speaker')),
+    ('standings-public-tab-break-category', category_url('standings-public-tab-break-category')),
+    ('public_feedback_progress', tournament_url('public_feedback_progress')),
+    ('checkins-public-status', tournament_url('checkins-public-status')),
+]
+
+PUBLIC_PREFERENCES = [
+    'public_features__public_participants',
+    'public_features__public_institutions_list',
+    'public_features__public_results',
+    'public_features__public_motions',
+    'public_features__public_team_standings',
+    'public_features__public_record',
+    'public_features__public_checkins',
+    'public_features__feedback_progress',
+    'tab_release__team_tab_released',
+    'tab_release__speaker_tab_released',
+    'tab_release__motion_tab_released',
+    'tab_release__break_category_tabs_released',
+]
+
+
+# Page load timings are sampled at random, which would make query counts vary
+@override_settings(BALLOT_ENTRY_TIMING_DISPLAY_SAMPLE_RATE=1)
+class ViewQueryCountTests(QueryCountTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for t in (cls.small, cls.large, cls.australs):
+            for pref in PUBLIC_PREFERENCES:
+                t.preferences[pref] = True
+            t.preferences['public_features__public_draw'] = 'all-released'
+
+    def test_admin_views(self):
+        for name, get_url in ADMIN_VIEWS:
+            with self.subTest(view=name):
+                self.assertQueryCountBounded(get_url)
+
+    def test_public_views(self):
+        self.request_user = None
+        for name, get_url in PUBLIC_VIEWS:
+            with self.subTest(view=name):
+                self.assertQueryCountBounded(get_url)
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from participants.models import Speaker
+from tournaments.admin import TournamentAdmin
+from tournaments.models import Tournament
+from tournaments.snapshot import file_path, public_paths, SnapshotExporter
+from utils.misc import reverse_tournament
+
+
+class TestSnapshotExport(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.tournament = Tournament.objects.first()
+        self.tournament.preferences['public_features__public_participants'] = True
+        self.tournament.preferences['public_features__public_results'] = True
+        self.tournament.preferences['public_features__public_motions'] = True
+        self.tournament.preferences['public_features__public_draw'] = 'all-released'
+        self.participants_path = reverse_tournament('participants-public-list', self.tournament)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        cache.clear()
+
+    def export(self, **kwargs):
+        return SnapshotExporter(self.directory, base_url="http://testserver", **kwargs).export(self.tournament)
+
+    def read(self, path, content_type="text/html"):
+        with open(os.path.join(self.directory, file_path(path, content_type)), 'rb') as f:
+            return f.read()
+
+    def test_matches_live_pages(self):
+        written, removed = self.export()
+        self.assertIn(file_path(self.participants_path, "text/html"), written)
+        self.assertEqual(removed, [])
+
+        for path in public_paths(self.tournament):
+            response = self.client.get(path, HTTP_ACCEPT="text/html,application/json")
+            with self.subTest(path=path):
+                filename = file_path(path, response.get('Content-Type', ''))
+                if response.status_code == 200:
+                    self.assertIn(filename, written)
+                    self.assertEqual(self.read(path, response['Content-Type']), response.content)
+                else:
+                    self.assertNotIn(filename, written)
+
+    def test_unchanged_not_rewritten(self):
+        self.export()
+        self.assertEqual(self.export(), ([], []))
+        self.assertEqual(self.export(force=True), ([], []))
+
+    def test_changed_page_rewritten(self):
+        self.export()
+        speaker = Speaker.objects.filter(team__tournament=self.tournament).first()
+        speaker.name = "Renamed Speaker"
+        speaker.save()
+
+        written, removed = self.export()
+        self.assertIn(file_path(self.participants_path, "text/html"), written)
+        self.assertIn(b"Renamed Speaker", self.read(self.participants_path))
+        self.assertEqual(removed, [])
+
+    def test_disabled_page_removed(self):
+        self.export()
+        self.tournament.preferences['public_features__public_participants'] = False
+
+        written, removed = self.export()
+        self.assertIn(file_path(self.participants_path, "text/html"), removed)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, file_path(self.participants_path, "text/html"))))
+
+    def test_no_temporary_files_left(self):
+        self.export()
+        for root, dirs, files in os.walk(self.directory):
+            self.assertFalse([f for f in files if f.startswith(".tmp")])
+
+    @mock.patch.object(SnapshotExporter, '_export', return_value=([], []))
+    def test_export_waits_for_lock(self, _export):
+        exporter = SnapshotExporter(self.directory, base_url="http://testserver")
+        with exporter.lock():
+            thread = threading.Thread(target=exporter.export, args=(self.tournament,))
+            thread.start()
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+            _export.assert_not_called()
+        thread.join()
+        _export.assert_called_once_with(self.tournament)
+
+
+class TestSnapshotAdminAction(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    @mock.patch('tournaments.admin.get_channel_layer')
+    def test_export_sent_to_worker(self, get_channel_layer):
+        send = get_channel_layer.return_value.send = mock.AsyncMock()
+        model_admin = TournamentAdmin(Tournament, site)
+        with mock.patch.object(model_admin, 'message_user'):
+            model_admin.export_snapshot(RequestFactory().post('/'), Tournament.objects.all())
+        send.assert_called_once_with("cachewarming", {
+            "type": "export_snapshot",
+            "tournaments": list(Tournament.objects.values_list('id', flat=True)),
+            "base_url": "http://testserver/",
+        })
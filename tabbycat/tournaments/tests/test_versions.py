@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from tournaments.models import Tournament
+from tournaments.versions import bump_versions, get_tournament_versions
+
+
+class TestVersionsInTransaction(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.create(slug="versions", name="Versions")
+
+    def tearDown(self):
+        cache.clear()
+
+    @mock.patch('tournaments.versions.time.time')
+    def test_bumped_again_on_commit(self, time):
+        time.return_value = 1.0
+        get_tournament_versions(self.tournament.id)
+
+        with transaction.atomic():
+            time.return_value = 2.0
+            bump_versions(self.tournament.id)
+            during = get_tournament_versions(self.tournament.id)
+            time.return_value = 3.0
+
+        after = get_tournament_versions(self.tournament.id)
+        self.assertEqual(during[1], 2.0)
+        self.assertEqual(after[1], 3.0)
+
+    @mock.patch('tournaments.versions.time.time')
+    def test_not_bumped_again_on_rollback(self, time):
+        time.return_value = 1.0
+        get_tournament_versions(self.tournament.id)
+
+        try:
+            with transaction.atomic():
+                time.return_value = 2.0
+                bump_versions(self.tournament.id)
+                time.return_value = 3.0
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(get_tournament_versions(self.tournament.id)[1], 2.0)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from participants.models import Speaker
+from tournaments.models import Tournament
+from tournaments.snapshot import PublicRequester
+from tournaments.warming import pending_key, send_warming_request, warm_cache, warming_languages
+from utils.misc import reverse_tournament
+
+
+@override_settings(PUBLIC_CACHE_WARMING_URL="http://testserver", PUBLIC_CACHE_WARMING_LANGUAGES=['fr'])
+class TestCacheWarming(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.first()
+        self.tournament.preferences['public_features__public_participants'] = True
+        self.url = reverse_tournament('participants-public-list', self.tournament)
+
+    def tearDown(self):
+        cache.clear()
+
+    def assertPageCached(self, language='en'):  # noqa: N802
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, HTTP_ACCEPT_LANGUAGE=language)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in context.captured_queries if 'participants_speaker' in q['sql']])
+        return response
+
+    def test_pages_cached(self):
+        self.assertGreater(warm_cache(self.tournament.id), 0)
+        self.assertPageCached()
+        self.assertPageCached('fr')
+
+    @mock.patch.object(PublicRequester, 'get')
+    def test_only_cached_paths_requested(self, get):
+        warm_cache(self.tournament.id)
+        paths = {call[0][0] for call in get.call_args_list}
+        self.assertIn(self.url, paths)
+        self.assertIn(reverse('api-team-standings', kwargs={'tournament_slug': self.tournament.slug}), paths)
+        self.assertNotIn(reverse('api-team-list', kwargs={'tournament_slug': self.tournament.slug}), paths)
+        self.assertFalse([path for path in paths if '/pairings' in path])
+        languages = [call[1].get('HTTP_ACCEPT_LANGUAGE') for call in get.call_args_list if call[0][0] == self.url]
+        self.assertEqual(languages, ['en', 'fr'])
+
+    def test_unchanged_not_warmed_again(self):
+        warm_cache(self.tournament.id)
+        self.assertEqual(warm_cache(self.tournament.id), 0)
+
+    def test_changed_warmed_again(self):
+        warm_cache(self.tournament.id)
+        speaker = Speaker.objects.filter(team__tournament=self.tournament).first()
+        speaker.name = "Renamed Speaker"
+        speaker.save()
+        self.assertGreater(warm_cache(self.tournament.id), 0)
+        self.assertContains(self.assertPageCached(), "Renamed Speaker")
+
+    def test_languages(self):
+        self.assertEqual(warming_languages(), ['en', 'fr'])
+        with self.settings(PUBLIC_CACHE_WARMING_LANGUAGES=[]):
+            self.assertEqual(warming_languages(), ['en'])
+        with self.settings(PUBLIC_CACHE_WARMING_LANGUAGES=['tzl', 'en', 'xx', 'ja']):
+            self.assertEqual(warming_languages(), ['en', 'ja'])
+
+    @mock.patch('tournaments.warming.get_channel_layer')
+    def test_requests_coalesced(self, get_channel_layer):
+        send = get_channel_layer.return_value.send = mock.AsyncMock()
+        send_warming_request(self.tournament.id)
+        send_warming_request(self.tournament.id)
+        send.assert_called_once_with("cachewarming", {"type": "warm_cache", "tournament": self.tournament.id})
+
+        # Once the worker has started, new changes need another warming
+        warm_cache(self.tournament.id)
+        self.assertIsNone(cache.get(pending_key(self.tournament.id)))
+        send_warming_request(self.tournament.id)
+        self.assertEqual(send.call_count, 2)
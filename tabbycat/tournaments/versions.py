@@ -0,0 +1,196 @@
+"""Change versions, which say cheaply whether anything in a tournament or round
+has changed, for conditional requests and cached data.
+
+A version is the time at which something last changed, as a timestamp, so that
+it can also be used as a last-modified time. Versions are kept in the cache,
+under these kinds:
+
+- "tournament": changes when anything in the tournament changes,
+- "base": changes when anything in the tournament that isn't specific to a
+  round changes, like participants, venues, categories and preferences,
+- "round": one for each round, changes when anything about that round changes,
+  like its draw, allocations, motions and results,
+- "global": changes when anything that isn't in any tournament changes, like
+  institutions and global preferences,
+- "preferences": one for each tournament, changes only when its preferences
+  change, for the preferences snapshot (see `Tournament.preferences_snapshot()`).
+
+Signal receivers (in tournaments/signals.py) update versions when the models
+registered in `VERSIONED_MODELS` are saved or deleted. Code that writes with
+`bulk_create()`, `bulk_update()` or `QuerySet.update()`, which don't send
+signals, must call `bump_versions()` itself.
+
+Inside a transaction, versions are set when the change is made, and again when
+the transaction is committed. Requests running at the same time can't see the
+change until it's committed, so anything they cache under the first version is
+replaced once it is.
+
+If a version isn't in the cache (say, the cache was cleared), it's taken to be
+the current time, so it can only seem newer than it is, never older.
+
+Public pages (see `CacheMixin` in utils/mixins.py) and some of their tables are
+cached with the versions of their tournament, so they can be cached for a long
+time but still update as soon as anything changes.
+"""
+
+import logging
+import time
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def version_key(kind, id=None):
+    if id is None:
+        return "version_%s" % kind
+    return "version_%s_%d" % (kind, id)
+
+
+def _get_many(keys):
+    """Returns a dict mapping each key in `keys` to its version, setting any
+    that aren't in the cache to now."""
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def get_tournament_versions(tournament_id):
+    """Returns a tuple of versions that changes whenever anything in the given
+    tournament changes."""
+    keys = [version_key('global'), version_key('tournament', tournament_id)]
+    versions = _get_many(keys)
+    return tuple(versions[key] for key in keys)
+
+
+def get_round_versions(tournament_id, round_id):
+    """Returns a tuple of versions that changes whenever anything in the given
+    round, or anything in its tournament that isn't specific to a round,
+    changes. It doesn't change when other rounds change."""
+    keys = [version_key('global'), version_key('base', tournament_id), version_key('round', round_id)]
+    versions = _get_many(keys)
+    return tuple(versions[key] for key in keys)
+
+
+def cache_versioned(key, versions, compute, timeout=None):
+    """Returns the value cached under `key` if it was cached with the same
+    `versions`, otherwise calls `compute()` and caches what it returns, with
+    `versions`, for `timeout` seconds (forever if None)."""
+    cached = cache.get(key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    value = compute()
+    cache.set(key, (versions, value), timeout)
+    return value
+
+
+def get_preferences_version(tournament_id):
+    """Returns a version that changes whenever any of the given tournament's
+    preferences change."""
+    key = version_key('preferences', tournament_id)
+    return _get_many([key])[key]
+
+
+def _set_now(keys):
+    cache.set_many(dict.fromkeys(keys, time.time()), timeout=None)
+
+
+def _set_now_and_on_commit(keys):
+    _set_now(keys)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_now(keys))
+
+
+def bump_versions(tournament_id=None, round_id=None):
+    """Records a change to the given round, or to the given tournament but no
+    particular round if `round_id` is None, or to something outside any
+    tournament if `tournament_id` is also None."""
+    if tournament_id is None:
+        keys = [version_key('global')]
+    elif round_id is None:
+        keys = [version_key('tournament', tournament_id), version_key('base', tournament_id)]
+    else:
+        keys = [version_key('tournament', tournament_id), version_key('round', round_id)]
+    _set_now_and_on_commit(keys)
+    logger.debug("Bumped versions: %s", ", ".join(keys))
+
+
+# ------------------------------------------------------------------------------
+# Finding the tournament and round of an instance
+# ------------------------------------------------------------------------------
+
+@lru_cache(maxsize=8192)
+def _lookup(model_label, id, *fields):
+    # Relationships used here don't change, so they're memoized, to save a query
+    # on each save when many related objects are saved one by one. Objects that
+    # aren't found raise DoesNotExist, which isn't memoized.
+    return apps.get_model(model_label).objects.values_list(*fields).get(id=id)
+
+
+def _via(model_label, *fields):
+    """Returns a function that looks up (tournament_id, round_id) from the ID of
+    an instance of `model_label`, using `fields`. If it isn't found, the change
+    is treated as a global change."""
+    def resolve(id):
+        try:
+            values = _lookup(model_label, id, *fields)
+        except ObjectDoesNotExist:
+            return None, None
+        return values if len(values) == 2 else (values[0], None)
+    return resolve
+
+
+_round = _via('tournaments.Round', 'tournament_id', 'id')
+_debate = _via('draw.Debate', 'round__tournament_id', 'round_id')
+_team = _via('participants.Team', 'tournament_id')
+_adjudicator = _via('participants.Adjudicator', 'tournament_id')
+_break_category = _via('breakqual.BreakCategory', 'tournament_id')
+
+
+# Maps model labels to functions returning (tournament_id, round_id) for an
+# instance, as taken by bump_versions().
+VERSIONED_MODELS = {
+    'tournaments.Tournament': lambda obj: (obj.id, None),
+    'tournaments.Round': lambda obj: (obj.tournament_id, obj.id),
+    'participants.Region': lambda obj: (None, None),
+    'participants.Institution': lambda obj: (None, None),
+    'participants.Team': lambda obj: (obj.tournament_id, None),
+    'participants.Speaker': lambda obj: _team(obj.team_id),
+    'participants.Adjudicator': lambda obj: (obj.tournament_id, None),
+    'participants.SpeakerCategory': lambda obj: (obj.tournament_id, None),
+    'adjallocation.AdjudicatorTeamConflict': lambda obj: _adjudicator(obj.adjudicator_id),
+    'adjallocation.AdjudicatorAdjudicatorConflict': lambda obj: _adjudicator(obj.adjudicator1_id),
+    'adjallocation.AdjudicatorInstitutionConflict': lambda obj: _adjudicator(obj.adjudicator_id),
+    'adjallocation.TeamInstitutionConflict': lambda obj: _team(obj.team_id),
+    'breakqual.BreakCategory': lambda obj: (obj.tournament_id, None),
+    'breakqual.BreakingTeam': lambda obj: _break_category(obj.break_category_id),
+    'venues.Venue': lambda obj: (obj.tournament_id, None),
+    'venues.VenueCategory': lambda obj: (obj.tournament_id, None),
+    'motions.Motion': lambda obj: (obj.tournament_id, None),
+    'motions.RoundMotion': lambda obj: _round(obj.round_id),
+    'draw.Debate': lambda obj: _round(obj.round_id),
+    'draw.DebateTeam': lambda obj: _debate(obj.debate_id),
+    'draw.TeamSideAllocation': lambda obj: _round(obj.round_id),
+    'adjallocation.DebateAdjudicator': lambda obj: _debate(obj.debate_id),
+    'results.BallotSubmission': lambda obj: _debate(obj.debate_id),
+    'adjfeedback.AdjudicatorFeedback': lambda obj: _adjudicator(obj.adjudicator_id),
+    'adjfeedback.AdjudicatorFeedbackQuestion': lambda obj: (obj.tournament_id, None),
+    'options.TournamentPreferenceModel': lambda obj: (obj.instance_id, None),
+    'dynamic_preferences.GlobalPreferenceModel': lambda obj: (None, None),
+}
+
+
+def bump_versions_for(instance):
+    """Records a change to `instance`, which must be of one of the models in
+    `VERSIONED_MODELS`."""
+    tournament_id, round_id = VERSIONED_MODELS[instance._meta.label](instance)
+    bump_versions(tournament_id, round_id)
+    if instance._meta.label == 'options.TournamentPreferenceModel':
+        _set_now_and_on_commit([version_key('preferences', tournament_id)])
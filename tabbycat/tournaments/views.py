@@ -33,6 +33,7 @@ from .forms import (SetCurrentRoundMultipleBreakCategoriesForm,
 from .mixins import RoundMixin, TournamentMixin
 from .models import Tournament
 from .utils import get_side_name
+from .versions import get_tournament_versions
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -69,6 +70,9 @@ class PublicSiteInactiveTournamentsView(ListView):
 class TournamentPublicHomeView(CacheMixin, TournamentMixin, TemplateView):
     template_name = 'public_tournament_index.html'
 
+    def get_cache_versions(self):
+        return get_tournament_versions(self.tournament.id)
+
 
 class BaseTournamentDashboardHomeView(TournamentMixin, WarnAboutDatabaseUseMixin, TemplateView):
 
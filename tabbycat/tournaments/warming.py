@@ -0,0 +1,121 @@
+"""Renders the public pages of a tournament into the cache after a release, so
+that visitors don't all wait on (and compete to render) the same uncached pages
+the moment a draw, results or tab are released.
+
+Public pages and their tables are cached until anything in their tournament
+changes (see tournaments/versions.py). When a release-type preference or a round
+changes (see tournaments/signals.py), `request_cache_warming()` asks the
+"cachewarming" worker to request each public page of the tournament and its
+standings API endpoints, as an anonymous visitor would, which caches them. Other
+API endpoints aren't cached, so requesting them wouldn't help.
+
+Pages are cached per language, so each language warmed costs a full rendering
+of every page. Only `LANGUAGE_CODE` is warmed, plus any languages listed in the
+`PUBLIC_CACHE_WARMING_LANGUAGES` setting; pages in other languages are cached
+when they're first visited.
+
+Requests are coalesced: while warming is pending for a tournament, further
+requests for it are dropped, since the pending warming will pick up their
+changes. The worker also skips tournaments that haven't changed since they were
+last warmed.
+
+Pages are cached under the address they were requested at, so warming is only
+done if the `PUBLIC_CACHE_WARMING_URL` setting is set to the public address of
+the site."""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Tournament
+from .snapshot import public_api_paths, public_page_paths, PublicRequester
+from .versions import get_tournament_versions
+
+logger = logging.getLogger(__name__)
+
+WORKER_CHANNEL = "cachewarming"
+
+# If the worker isn't running, requests are dropped until this expires
+PENDING_TIMEOUT = 10 * 60
+
+
+def pending_key(tournament_id):
+    return "cache_warming_pending_%d" % tournament_id
+
+
+def warmed_key(tournament_id):
+    return "cache_warming_versions_%d" % tournament_id
+
+
+def request_cache_warming(tournament_id):
+    """Asks the worker to warm the cache for the given tournament, once the
+    current transaction (if any) is committed."""
+    if not settings.PUBLIC_CACHE_WARMING_URL:
+        return
+    transaction.on_commit(lambda: send_warming_request(tournament_id))
+
+
+def send_warming_request(tournament_id):
+    # cache.add() only succeeds if there isn't already a request pending
+    if not cache.add(pending_key(tournament_id), True, PENDING_TIMEOUT):
+        logger.debug("Cache warming already pending for tournament %d", tournament_id)
+        return
+
+    try:
+        async_to_sync(get_channel_layer().send)(WORKER_CHANNEL, {
+            "type": "warm_cache",
+            "tournament": tournament_id,
+        })
+    except ChannelFull:
+        cache.delete(pending_key(tournament_id))
+        logger.warning("Couldn't request cache warming for tournament %d, the channel is full", tournament_id)
+
+
+def warming_languages():
+    """Returns the codes of the languages in which to warm pages. The
+    translators' pseudo-language is never included."""
+    available = {code for code, name in settings.LANGUAGES} - {'tzl'}
+    codes = [settings.LANGUAGE_CODE] + list(settings.PUBLIC_CACHE_WARMING_LANGUAGES)
+    return [code for i, code in enumerate(codes) if code in available and code not in codes[:i]]
+
+
+def warm_cache(tournament_id, base_url=None):
+    """Requests every public page and standings API endpoint of the given
+    tournament, unless it hasn't changed since it was last warmed. Returns the
+    number of requests made."""
+    # Changes from now on need another warming, so let them request one
+    cache.delete(pending_key(tournament_id))
+
+    try:
+        tournament = Tournament.objects.get(id=tournament_id)
+    except Tournament.DoesNotExist:
+        return 0
+
+    versions = get_tournament_versions(tournament_id)
+    if cache.get(warmed_key(tournament_id)) == versions:
+        logger.debug("%s hasn't changed since its cache was last warmed", tournament.slug)
+        return 0
+
+    requester = PublicRequester(base_url or settings.PUBLIC_CACHE_WARMING_URL)
+    count = 0
+
+    # Record pages are per team and adjudicator, and rarely all visited at once
+    paths = public_page_paths(tournament, records=False)
+    for code in warming_languages():
+        for path in paths:
+            requester.get(path, HTTP_ACCEPT_LANGUAGE=code)
+            count += 1
+
+    # Standings responses are cached regardless of language
+    for path in public_api_paths(tournament, standings_only=True):
+        requester.get(path)
+        count += 1
+
+    cache.set(warmed_key(tournament_id), versions, None)
+    logger.info("Warmed cache for %s: made %d requests", tournament.slug, count)
+    return count
@@ -1,7 +1,9 @@
 from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
-from tournaments.models import Round, Tournament
+from tournaments.context import TournamentContext
+from tournaments.models import Tournament
 
 
 class DebateMiddleware(object):
@@ -26,17 +28,13 @@ class DebateMiddleware(object):
                     slug=view_kwargs['tournament_slug'])
                 cache.set(cached_key, request.tournament, None)
 
+            # Loads the rounds, and fills in the current round(s), for the
+            # whole request (see tournaments/context.py)
+            request.tournament_context = TournamentContext(request.tournament)
+
             if 'round_seq' in view_kwargs:
-                cached_key = "%s_%s_%s" % (view_kwargs['tournament_slug'],
-                                           view_kwargs['round_seq'], 'object')
-                cached_round_object = cache.get(cached_key)
-                if cached_round_object:
-                    request.round = cached_round_object
-                else:
-                    request.round = get_object_or_404(
-                        Round,
-                        tournament=request.tournament,
-                        seq=view_kwargs['round_seq'])
-                    cache.set(cached_key, request.round, None)
+                request.round = request.tournament_context.get_round(view_kwargs['round_seq'])
+                if request.round is None:
+                    raise Http404("No round %s in %s" % (view_kwargs['round_seq'], request.tournament.slug))
 
         return None
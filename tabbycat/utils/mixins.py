@@ -1,10 +1,10 @@
+import hashlib
 import logging
 import os
 
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db import connection
-from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.generic.base import ContextMixin
 
@@ -120,10 +120,24 @@ class WarnAboutDatabaseUseMixin(ContextMixin):
 
 
 class CacheMixin:
-    """Mixin for views that cache the page and need to update quickly."""
+    """Mixin for views that cache the page.
+
+    If `get_cache_versions()` returns change versions (see
+    tournaments/versions.py), the page is cached until they change, for up to
+    `versioned_cache_timeout` seconds. Otherwise, it's cached for
+    `cache_timeout` seconds."""
 
     cache_timeout = settings.PUBLIC_FAST_CACHE_TIMEOUT
+    versioned_cache_timeout = settings.PUBLIC_VERSIONED_CACHE_TIMEOUT
+
+    def get_cache_versions(self):
+        return None
 
-    @method_decorator(cache_page(cache_timeout))
-    def dispatch(self, *args, **kwargs):
-        return super().dispatch(*args, **kwargs)
+    def dispatch(self, request, *args, **kwargs):
+        versions = self.get_cache_versions()
+        if versions is None:
+            decorator = cache_page(self.cache_timeout)
+        else:
+            key_prefix = "v" + hashlib.md5(repr(versions).encode()).hexdigest()
+            decorator = cache_page(self.versioned_cache_timeout, key_prefix=key_prefix)
+        return decorator(super().dispatch)(request, *args, **kwargs)
@@ -1,19 +1,28 @@
 import json
 import logging
 from contextlib import contextmanager
+from io import StringIO
 from unittest import expectedFailure
 
 from django.contrib.auth import get_user, get_user_model
 from django.contrib.staticfiles.testing import StaticLiveServerTestCase
 from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import Client, tag, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 
+from adjallocation.models import (AdjudicatorAdjudicatorConflict, AdjudicatorInstitutionConflict,
+                                  AdjudicatorTeamConflict, TeamInstitutionConflict)
+from checkins.models import PersonIdentifier, VenueIdentifier
+from checkins.utils import create_identifiers
 from draw.models import DebateTeam
 from participants.models import Adjudicator, Institution, Speaker, Team
-from tournaments.models import Tournament
+from privateurls.utils import populate_url_keys
+from tournaments.models import Round, Tournament
 from utils.misc import add_query_string_parameter, reverse_tournament
 from venues.models import Venue
 
@@ -269,6 +278,142 @@ class BaseMinimalTournamentTestCase(TestCase):
         self.tournament.delete()
 
 
+def build_tournament(data_dir, slug, nrounds, scale=1):
+    """Imports the sample tournament in `data_dir` (relative to the data
+    directory) as `slug`, copies its participants and venues so that there are
+    `scale` times as many, then simulates draws, allocations and results for
+    the first `nrounds` rounds, and feedback for them. Returns the tournament."""
+    # Institutions aren't specific to tournaments, so keep any already imported
+    tournament = Tournament.objects.create(slug=slug, name=slug, short_name=slug)
+    call_command('importtournament', data_dir, slug=slug, keep_existing=True, verbosity=0, stdout=StringIO())
+    if scale > 1:
+        scale_tournament(tournament, scale)
+
+    rounds = [str(seq) for seq in range(1, nrounds + 1)]
+    call_command('simulaterounds', *rounds, '--tournament', slug, '--confirmed', '--user', 'simulator',
+                 '--create-user', '--confirm', *rounds, verbosity=0, stdout=StringIO())
+    call_command('generatefeedback', *rounds, '--tournament', slug, '--confirmed', '--user', 'simulator',
+                 verbosity=0, stdout=StringIO())
+
+    speakers = Speaker.objects.filter(team__tournament=tournament)
+    adjudicators = tournament.adjudicator_set.all()
+    for people in [speakers, adjudicators]:
+        create_identifiers(PersonIdentifier, people)
+        populate_url_keys(people)
+    create_identifiers(VenueIdentifier, tournament.venue_set.all())
+
+    tournament.round_set.filter(seq__lte=nrounds).update(draw_status=Round.STATUS_RELEASED)
+    tournament.current_round = tournament.round_set.get(seq=nrounds)
+    tournament.save()
+    return tournament
+
+
+def scale_tournament(tournament, factor):
+    """Adds copies of the teams (with their speakers), adjudicators and venues
+    in `tournament`, each copy with copies of their institutions and conflicts,
+    so that there are `factor` times as many."""
+    teams = list(tournament.team_set.prefetch_related('speaker_set__categories', 'break_categories'))
+    adjudicators = list(tournament.adjudicator_set.all())
+    venues = list(tournament.venue_set.prefetch_related('venuecategory_set'))
+    institutions = {person.institution for person in teams + adjudicators if person.institution is not None}
+    team_insts = list(TeamInstitutionConflict.objects.filter(team__tournament=tournament))
+    adj_insts = list(AdjudicatorInstitutionConflict.objects.filter(adjudicator__tournament=tournament))
+    adj_teams = list(AdjudicatorTeamConflict.objects.filter(adjudicator__tournament=tournament))
+    adj_adjs = list(AdjudicatorAdjudicatorConflict.objects.filter(adjudicator1__tournament=tournament))
+
+    for i in range(2, factor + 1):
+        inst_copies = {inst.id: Institution.objects.create(name="%s %d" % (inst.name, i), code="%s%d" % (inst.code, i),
+                                                           region=inst.region) for inst in institutions}
+        team_copies = {}
+        adj_copies = {}
+
+        for team in teams:
+            copy = Team.objects.create(tournament=tournament, institution=inst_copies.get(team.institution_id),
+                reference=team.reference, short_reference=team.short_reference,
+                use_institution_prefix=team.use_institution_prefix)
+            copy.break_categories.set(team.break_categories.all())
+            for speaker in team.speaker_set.all():
+                speaker_copy = Speaker.objects.create(team=copy, name="%s %d" % (speaker.name, i), gender=speaker.gender)
+                speaker_copy.categories.set(speaker.categories.all())
+            team_copies[team.id] = copy
+
+        for adj in adjudicators:
+            adj_copies[adj.id] = Adjudicator.objects.create(tournament=tournament,
+                institution=inst_copies.get(adj.institution_id), name="%s %d" % (adj.name, i),
+                base_score=adj.base_score, trainee=adj.trainee)
+
+        for venue in venues:
+            copy = Venue.objects.create(tournament=tournament, name="%s %d" % (venue.name, i), priority=venue.priority)
+            copy.venuecategory_set.set(venue.venuecategory_set.all())
+
+        TeamInstitutionConflict.objects.bulk_create([TeamInstitutionConflict(
+            team=team_copies[c.team_id], institution=inst_copies.get(c.institution_id, c.institution))
+            for c in team_insts])
+        AdjudicatorInstitutionConflict.objects.bulk_create([AdjudicatorInstitutionConflict(
+            adjudicator=adj_copies[c.adjudicator_id], institution=inst_copies.get(c.institution_id, c.institution))
+            for c in adj_insts])
+        AdjudicatorTeamConflict.objects.bulk_create([AdjudicatorTeamConflict(
+            adjudicator=adj_copies[c.adjudicator_id], team=team_copies[c.team_id]) for c in adj_teams])
+        AdjudicatorAdjudicatorConflict.objects.bulk_create([AdjudicatorAdjudicatorConflict(
+            adjudicator1=adj_copies[c.adjudicator1_id], adjudicator2=adj_copies[c.adjudicator2_id])
+            for c in adj_adjs])
+
+
+class QueryCountTestMixin:
+    """Mixin for checking that the number of database queries a view makes
+    doesn't grow with the size of the tournament, to catch N+1 query patterns
+    (like accessing a related object for each item in a list without
+    `select_related()` or `prefetch_related()`).
+
+    The tournaments are built once for the test case, from the sample data:
+    `small` from minimal8team, `large` from minimal8team with `scale` times as
+    many participants and venues, and `australs` from australs24team. Each has
+    draws and results for the first `nrounds` rounds.
+
+    `assertQueryCountBounded()` loads a URL in each tournament (with an empty
+    cache, after loading it once to avoid counting one-off queries) and checks
+    that the large tournament takes no more queries than the small one, and that
+    australs24team, which has more categories, motions and other things of which
+    every tournament has only a few, takes at most `max_extra_queries` more.
+
+    Subclasses must inherit from TestCase separately."""
+
+    nrounds = 3
+    scale = 4
+    max_extra_queries = 15
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.small = build_tournament('minimal8team', 'small', cls.nrounds)
+        cls.large = build_tournament('minimal8team', 'large', cls.nrounds, scale=cls.scale)
+        cls.australs = build_tournament('australs24team', 'australs', cls.nrounds)
+        cls.user = get_user_model().objects.create_superuser('query_admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        super().setUp()
+        self.request_user = self.user
+
+    def count_queries(self, url):
+        self.client.get(url)
+        cache.clear()
+        if self.request_user is not None:
+            self.client.force_login(self.request_user)  # sessions are in the cache
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, "%s returned %d" % (url, response.status_code))
+        return len(context.captured_queries)
+
+    def assertQueryCountBounded(self, get_url):  # noqa: N802
+        """`get_url` is a function that takes a tournament and returns the URL
+        to check in that tournament."""
+        small, large, australs = [self.count_queries(get_url(t)) for t in (self.small, self.large, self.australs)]
+        self.assertLessEqual(large, small, "%s: %d queries for %d teams, but %d for %d teams" % (
+            get_url(self.large), small, self.small.team_set.count(), large, self.large.team_set.count()))
+        self.assertLessEqual(australs, small + self.max_extra_queries,
+            "%s: %d queries, but %d for minimal8team" % (get_url(self.australs), australs, small))
+
+
 @tag('selenium') # Tagged so we can exclude from CI
 class SeleniumTestCase(StaticLiveServerTestCase):
     """Used to verify rendered html and javascript functionality on the site as
@@ -60,15 +60,17 @@ class VueTableTemplateView(TemplateView):
     tables_orientation = 'columns' # Layout option: tables as rows or as columns
 
     def get_context_data(self, **kwargs):
-        tables = self.get_tables()
-
-        tables_dicts = [tb.jsondict() for tb in tables if tb is not None]
+        tables_dicts = self.get_tables_data()
         kwargs["tables_data"] = json.dumps(tables_dicts)
 
-        kwargs["tables_count"] = list(range(len(tables)))
+        kwargs["tables_count"] = list(range(len(tables_dicts)))
         kwargs["tables_orientation"] = self.tables_orientation
         return super().get_context_data(**kwargs)
 
+    def get_tables_data(self):
+        """Returns the data for the tables, as a list of dicts."""
+        return [tb.jsondict() for tb in self.get_tables() if tb is not None]
+
     def get_table(self):
         raise NotImplementedError("subclasses must implement get_table()")
 
@@ -1,10 +1,16 @@
-import itertools
 import logging
 import random
 
-from draw.models import Debate
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from munkres import Munkres
 
-from .models import VenueConstraint
+from adjallocation.models import DebateAdjudicator
+from draw.models import Debate, DebateTeam
+from participants.models import Adjudicator, Institution, Team
+from tournaments.versions import bump_versions
+
+from .models import VenueCategory, VenueConstraint
 
 logger = logging.getLogger(__name__)
 
@@ -18,156 +24,165 @@ class VenueAllocator:
     """Allocates venues in a draw to satisfy, as best it can, applicable venue
     constraints.
 
-    The algorithm naïvely allocates from the debate with the highest-priority
-    constraint to the debate with the lowest-priority constraint, choosing at
-    random if more than one is available. This isn't guaranteed to be optimal,
-    since a flexible high-priority debate might randomly choose a room demanded
-    by a picky low-priority room.
+    The allocation is formulated as an assignment problem between debates and
+    venues, and solved optimally using the Hungarian algorithm. The cost of
+    putting a debate in a venue is the cost of the constraints that venue
+    violates, where higher-priority constraints take absolute precedence over
+    lower-priority constraints: no number of lower-priority violations is worth
+    one higher-priority violation. For each subject (team, adjudicator or
+    institution), only its best-satisfied constraint counts, so a subject with
+    several constraints is satisfied if it gets any of its highest-priority
+    categories. As a tie-breaker, debates are placed in the highest-priority
+    venues where possible.
+
+    Debates without constraints can go in any venue, so only debates with
+    constraints are included in the assignment problem. The remaining debates
+    are then allocated the remaining venues, in descending order of venue
+    priority, at random.
     """
 
     def allocate(self, round, debates=None):
         if debates is None:
-            debates = round.debate_set_with_prefetches(speakers=False, institutions=True)
-        self._all_venues = list(round.active_venues.order_by('-priority'))
-        self._preferred_venues = self._all_venues[:len(debates)]
+            debates = round.debate_set.all()
+        debates = list(debates)
+        venues = list(round.active_venues.order_by('-priority'))
 
-        # take note of how many venues we expect to be short by (for error checking)
-        self._venue_shortage = max(0, len(debates) - len(self._all_venues))
+        if len(debates) > len(venues):
+            logger.warning("There are %d debates but only %d venues", len(debates), len(venues))
 
         debate_constraints = self.collect_constraints(debates)
-        debate_venues = self.allocate_constrained_venues(debate_constraints)
+        debate_venues = self.allocate_constrained_venues(debate_constraints, venues[:len(debates)], venues)
 
-        unconstrained_debates = [d for d in debates if d not in debate_venues]
-        unconstrained_venues = self.allocate_unconstrained_venues(unconstrained_debates)
-        debate_venues.update(unconstrained_venues)
+        remaining_debates = [d for d in debates if d not in debate_venues]
+        random.shuffle(remaining_debates)
+        used_venues = set(debate_venues.values())
+        remaining_venues = [v for v in venues if v not in used_venues]
+        debate_venues.update(zip(remaining_debates, remaining_venues))
 
         # this set is only non-empty if there were too few venues overall
-        debates_without_venues = [d for d in debates if d not in debate_venues]
-        if len(debates_without_venues) != self._venue_shortage:
-            logger.error("Expected venue shortage %d, but %d debates without venues",
-                self._venue_shortage, len(debates_without_venues))
-        debate_venues.update({debate: None for debate in debates_without_venues})
+        debate_venues.update({debate: None for debate in remaining_debates[len(remaining_venues):]})
 
         self.save_venues(debate_venues)
+        bump_versions(round.tournament_id, round.id)
 
     def collect_constraints(self, debates):
-        """Returns a list of tuples `(debate, constraints)`, where `constraints`
-        is a list of constraints. Each list of constraints is sorted by
-        descending order of priority. Debates with no constraints are omitted
-        from the dict, so each list of constraints is guaranteed not to be
-        empty.
+        """Returns a dict mapping each debate that has one or more constraints
+        on it to a list of "subject constraints", one for each team,
+        adjudicator or institution in the debate that has constraints. Each
+        subject constraint is a list of tuples `(priority, venue_ids)`, where
+        `venue_ids` is the set of IDs of venues in categories to which the
+        subject has a constraint of that priority, sorted by descending order of
+        priority.
+
+        The constraints for each debate are all of the venue constraints
+        relating to the teams, adjudicators, and institutions of the teams in
+        the debate. This uses a fixed number of queries, regardless of the
+        number of debates."""
+
+        content_types = ContentType.objects.get_for_models(Team, Adjudicator, Institution)
+        team_ct, adj_ct, inst_ct = (content_types[model].id for model in (Team, Adjudicator, Institution))
+
+        debates_by_id = {debate.id: debate for debate in debates}
+        subjects = {debate: set() for debate in debates}
+        for debate_id, team_id, institution_id in DebateTeam.objects.filter(
+                debate_id__in=debates_by_id).values_list('debate_id', 'team_id', 'team__institution_id'):
+            subjects[debates_by_id[debate_id]].add((team_ct, team_id))
+            if institution_id is not None:
+                subjects[debates_by_id[debate_id]].add((inst_ct, institution_id))
+        for debate_id, adj_id in DebateAdjudicator.objects.filter(
+                debate_id__in=debates_by_id).values_list('debate_id', 'adjudicator_id'):
+            subjects[debates_by_id[debate_id]].add((adj_ct, adj_id))
+
+        subject_ids = {ct: set() for ct in (team_ct, adj_ct, inst_ct)}
+        for ct, subject_id in set().union(*subjects.values()):
+            subject_ids[ct].add(subject_id)
+        constraints = VenueConstraint.objects.filter(
+            Q(subject_content_type_id=team_ct, subject_id__in=subject_ids[team_ct]) |
+            Q(subject_content_type_id=adj_ct, subject_id__in=subject_ids[adj_ct]) |
+            Q(subject_content_type_id=inst_ct, subject_id__in=subject_ids[inst_ct]),
+        ).values_list('subject_content_type_id', 'subject_id', 'priority', 'category_id')
+        constraints = list(constraints)
+
+        category_venues = {}
+        for category_id, venue_id in VenueCategory.venues.through.objects.filter(
+                venuecategory_id__in={c[3] for c in constraints}).values_list('venuecategory_id', 'venue_id'):
+            category_venues.setdefault(category_id, set()).add(venue_id)
+
+        subject_constraints = {}
+        for ct, subject_id, priority, category_id in constraints:
+            by_priority = subject_constraints.setdefault((ct, subject_id), {})
+            by_priority.setdefault(priority, set()).update(category_venues.get(category_id, set()))
+
+        debate_constraints = {}
+        for debate in debates:
+            constraints = [sorted(subject_constraints[subject].items(), reverse=True)
+                for subject in subjects[debate] if subject in subject_constraints]
+            if constraints:
+                debate_constraints[debate] = constraints
+                logger.debug("Constraints on %s: %s", debate, constraints)
 
-        The constraints for each debate are just all of the venue constraints
-        relating to the teams, adjudicators, and institutions of the debate."""
+        return debate_constraints
 
-        all_constraints = {}
-        for vc in VenueConstraint.objects.filter_for_debates(debates).prefetch_related('subject'):
-            all_constraints.setdefault(vc.subject, []).append(vc)
+    def constraint_weights(self, debate_constraints):
+        """Returns a dict mapping each priority to the cost of violating a
+        constraint of that priority. Each weight is greater than the cost of
+        violating every constraint of lower priority, so that higher-priority
+        constraints take absolute precedence."""
+        counts = {}
+        for constraints in debate_constraints.values():
+            for subject_constraints in constraints:
+                for priority, _ in subject_constraints:
+                    counts[priority] = counts.get(priority, 0) + 1
+
+        weights = {}
+        total = 0
+        for priority in sorted(counts):
+            weights[priority] = total + 1
+            total += counts[priority] * weights[priority]
+        return weights
+
+    def constraint_cost(self, constraints, venue, weights):
+        """Returns the cost of the constraints in `constraints` (a list of
+        subject constraints, as returned by `collect_constraints()`) violated
+        by placing the debate in `venue`."""
+        cost = 0
+        for subject_constraints in constraints:
+            for priority, venue_ids in subject_constraints:
+                if venue.id in venue_ids:
+                    break  # lower-priority constraints on this subject don't count
+                cost += weights[priority]
+        return cost
+
+    def allocate_constrained_venues(self, debate_constraints, preferred_venues, venues):
+        """Allocates venues for debates that have one or more constraints on
+        them, by solving the assignment problem between those debates and all
+        venues. Returns a dict mapping debates to venues."""
 
-        debate_constraints = []
+        if not debate_constraints or not venues:
+            return {}
 
-        for debate in debates:
-            subjects = itertools.chain(
-                debate.teams,
-                debate.adjudicators.all(),
-                [team.institution for team in debate.teams],
-            )
-            constraints = [vc for subject in subjects for vc in all_constraints.get(subject, [])]
+        debates = list(debate_constraints.keys())
+        weights = self.constraint_weights(debate_constraints)
+        preferred_venues = set(preferred_venues)
 
-            if len(constraints) > 0:
-                constraints.sort(key=lambda x: x.priority, reverse=True)
-                debate_constraints.append((debate, constraints))
-                logger.info("Constraints on %s: %s", debate, constraints)
+        # Using a non-preferred venue must cost less than any constraint
+        # violation. At most one non-preferred venue is used for each debate.
+        scale = len(debates) + 1
+        cost_matrix = [[self.constraint_cost(debate_constraints[debate], venue, weights) * scale +
+                        (venue not in preferred_venues) for venue in venues] for debate in debates]
 
-        debate_constraints.sort(key=lambda x: x[1][0].priority, reverse=True)
+        indices = Munkres().compute(cost_matrix)
 
-        return debate_constraints
-
-    def allocate_constrained_venues(self, debate_constraints):
-        """Allocates venues for debates that have one or more constraints on
-        them. `debate_constraints` should be
-
-        For each debate, it finds the set of venues that meet all its
-        constraints, or if that set is empty, then it satisfies as many
-        constraints as it can, with higher-priority constraints taking absolute
-        precedence over lower-priority constraints. It then chooses a random
-        venue from the preferred venues in that set, or if there are no
-        preferred venues, then from all venues in that set.
-
-        It runs through debates in descending order of priority, where the
-        priority of a debate is the priority of its highest-priority constraint.
-        """
-
-        debate_venues = dict()
-
-        while len(debate_constraints) > 0:
-            debate, constraints = debate_constraints.pop(0)
-
-            highest_constraint = constraints.pop(0)
-            eligible_venues = set(highest_constraint.category.venues.all()) & set(self._all_venues)
-
-            # If we can't fulfil the highest constraint, bump it down the list.
-            if len(eligible_venues) == 0:
-                logger.debug("Unfulfilled (highest): %s", highest_constraint)
-                if len(constraints) == 0:
-                    logger.debug("%s is now unconstrained", debate)
-                    continue  # Failed all constraints, debate is now unconstrained
-                new_priority = constraints[0].priority
-                for i, dc in enumerate(debate_constraints):
-                    if new_priority >= dc[1][0].priority:
-                        break
-                else:
-                    i = 0
-                debate_constraints.insert(i, (debate, constraints))
-                continue
-
-            # If we get this far, we have at least one eligible venue.
-
-            # Find the set of eligible venues satisfying the best set of constraints.
-            satisified_constraints = []
-            for constraint in constraints:
-                if any(sc.subject == constraint.subject for sc in satisified_constraints):
-                    continue  # Skip if we've already done a constraint for this subject
-                constraint_venues = set(constraint.category.venues.all())
-                if eligible_venues.isdisjoint(constraint_venues):
-                    logger.debug("Unfilfilled: %s", constraint)
-                else:
-                    eligible_venues &= constraint_venues
-                    satisified_constraints.append(constraint)
-
-            # If no eligible venues are preferred venues, drop the last preferred venue.
-            preferred_venues = set(self._preferred_venues)
-            if eligible_venues.isdisjoint(preferred_venues):
-                logger.debug("No preferred venues available: %s", debate)
-                self._preferred_venues = self._preferred_venues[:-1]
-            else:
-                eligible_venues &= preferred_venues
-
-            # Finally, assign the venue.
-            venue = random.choice(list(eligible_venues))
+        debate_venues = {}
+        for i, j in indices:
+            debate, venue = debates[i], venues[j]
             debate_venues[debate] = venue
-            self._all_venues.remove(venue)
-            if venue in self._preferred_venues:
-                self._preferred_venues.remove(venue)
+            if cost_matrix[i][j] >= scale:
+                logger.info("Unfulfilled constraints on %s in %s", debate, venue)
             logger.debug("Assigning %s to %s", venue, debate)
 
         return debate_venues
 
-    def allocate_unconstrained_venues(self, debates):
-        """Allocates unconstrained venues by randomly shuffling the remaining
-        preferred venues."""
-
-        if len(debates) - len(self._preferred_venues) != self._venue_shortage:
-            logger.error("preferred venues to unconstrained debates mismatch: "
-                "%s preferred venues, %d debates", len(self._preferred_venues), len(debates))
-            # we'll still keep going, since zip() stops at the end of the shorter list
-        elif len(debates) != len(self._preferred_venues):
-            logger.warning("%s preferred venues, %d debates, matches expected venue shortage %s",
-                len(self._preferred_venues), len(debates), self._venue_shortage)
-
-        random.shuffle(debates)
-        return {debate: venue for debate, venue in zip(debates, self._preferred_venues)}
-
     def save_venues(self, debate_venues):
         for debate, venue in debate_venues.items():
             debate.venue = venue
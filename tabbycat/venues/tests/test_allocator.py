@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from availability.models import RoundAvailability
+from tournaments.models import Tournament
+from venues.allocator import VenueAllocator
+from venues.models import VenueCategory, VenueConstraint
+
+
+class TestVenueAllocator(TestCase):
+
+    fixtures = ['after_round_4.json']
+
+    def setUp(self):
+        self.tournament = Tournament.objects.first()
+        self.round = self.tournament.round_set.get(seq=4)
+        self.debates = list(self.round.debate_set.order_by('id'))
+        for venue in self.tournament.relevant_venues.all():
+            RoundAvailability.objects.create(content_object=venue, round=self.round)
+        self.venues = list(self.round.active_venues.order_by('-priority'))
+
+    def add_category(self, name, venues):
+        category = VenueCategory.objects.create(name=name, tournament=self.tournament)
+        category.venues.set(venues)
+        return category
+
+    def add_constraint(self, subject, category, priority):
+        return VenueConstraint.objects.create(subject=subject, category=category, priority=priority)
+
+    def test_all_debates_get_distinct_venues(self):
+        VenueAllocator().allocate(self.round)
+        venues = [d.venue_id for d in self.round.debate_set.all()]
+        self.assertNotIn(None, venues)
+        self.assertEqual(len(set(venues)), len(venues))
+
+    def test_constraints_satisfied_jointly(self):
+        # The greedy allocator could give the high-priority team the only venue
+        # in the narrow category, leaving the low-priority team unsatisfied.
+        narrow = self.add_category("Narrow", self.venues[:1])
+        broad = self.add_category("Broad", self.venues[:2])
+        team1 = self.debates[0].debateteam_set.first().team
+        team2 = self.debates[1].debateteam_set.first().team
+        self.add_constraint(team1, broad, 10)
+        self.add_constraint(team2, narrow, 5)
+
+        for _ in range(5):
+            VenueAllocator().allocate(self.round)
+            self.assertEqual(self.round.debate_set.get(debateteam__team=team1).venue, self.venues[1])
+            self.assertEqual(self.round.debate_set.get(debateteam__team=team2).venue, self.venues[0])
+
+    def test_higher_priority_takes_precedence(self):
+        category = self.add_category("Only", self.venues[:1])
+        adj1 = self.debates[0].debateadjudicator_set.first().adjudicator
+        team2 = self.debates[1].debateteam_set.first().team
+        team3 = self.debates[2].debateteam_set.first().team
+        self.add_constraint(adj1, category, 10)
+        self.add_constraint(team2, category, 5)
+        self.add_constraint(team3, category, 5)
+
+        VenueAllocator().allocate(self.round)
+        self.assertEqual(self.round.debate_set.get(debateadjudicator__adjudicator=adj1).venue, self.venues[0])
+
+    def test_constant_queries(self):
+        category = self.add_category("Some", self.venues[::2])
+        for debate in self.debates:
+            self.add_constraint(debate.debateteam_set.first().team, category, 1)
+
+        allocator = VenueAllocator()
+        allocator.allocate(self.round)  # populate content type cache
+        with self.assertNumQueries(7):
+            # debates, venues, debate teams, debate adjudicators, constraints,
+            # category venues, update
+            allocator.allocate(self.round)